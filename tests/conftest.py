@@ -0,0 +1,125 @@
+import itertools
+import sys
+from typing import Callable, List
+
+import pandas as pd
+import pytest
+
+from vidur.config import SimulationConfig
+
+# the repo ships no attention profiling data, a synthetic profile of Llama-3-8B
+# (32 query heads, 8 kv heads) lets the sklearn predictors train in the tests
+BATCH_SIZES = [1, 2, 4, 8, 16, 32, 64, 128]
+KV_CACHE_SIZES = list(range(0, 4097, 256))
+PREFILL_CHUNK_SIZES = [1, 16, 64, 128, 256, 512, 1024, 2048, 4096]
+
+
+def _get_attention_rows(
+    num_tensor_parallel_workers: int, block_size: int
+) -> List[dict]:
+    rows = []
+    shape = {
+        "n_embd": 4096,
+        "n_q_head": 32,
+        "n_kv_head": 8,
+        "block_size": block_size,
+        "num_tensor_parallel_workers": num_tensor_parallel_workers,
+    }
+    for batch_size, kv_cache_size in itertools.product(BATCH_SIZES, KV_CACHE_SIZES):
+        rows.append(
+            {
+                **shape,
+                "batch_size": batch_size,
+                "kv_cache_size": kv_cache_size,
+                "prefill_chunk_size": 0,
+                "is_prefill": False,
+                "time_stats.attn_decode.median": (
+                    0.01 + 5e-6 * batch_size * kv_cache_size
+                )
+                / num_tensor_parallel_workers,
+                "time_stats.attn_kv_cache_save.median": 0.001 + 1e-6 * batch_size,
+            }
+        )
+    for kv_cache_size, prefill_chunk_size in itertools.product(
+        KV_CACHE_SIZES[::2], PREFILL_CHUNK_SIZES
+    ):
+        rows.append(
+            {
+                **shape,
+                "batch_size": 1,
+                "kv_cache_size": kv_cache_size,
+                "prefill_chunk_size": prefill_chunk_size,
+                "is_prefill": True,
+                "time_stats.attn_prefill.median": (
+                    0.02
+                    + 3e-8 * prefill_chunk_size * prefill_chunk_size
+                    + 2e-6 * prefill_chunk_size * kv_cache_size
+                )
+                / num_tensor_parallel_workers,
+                "time_stats.attn_kv_cache_save.median": 0.001
+                + 1e-6 * prefill_chunk_size,
+            }
+        )
+    return rows
+
+
+@pytest.fixture(scope="session")
+def attention_input_file(tmp_path_factory) -> str:
+    path = tmp_path_factory.mktemp("profiling") / "attention.csv"
+    # LightLLM runs with a block size of 1
+    rows = []
+    for num_tensor_parallel_workers, block_size in itertools.product([1, 2], [1, 16]):
+        rows += _get_attention_rows(num_tensor_parallel_workers, block_size)
+    pd.DataFrame(rows).to_csv(path, index=False)
+    return str(path)
+
+
+@pytest.fixture(scope="session")
+def predictor_cache_dir(tmp_path_factory) -> str:
+    # the trained models are shared by all the tests of a session
+    return str(tmp_path_factory.mktemp("cache"))
+
+
+@pytest.fixture(scope="session")
+def simulation_args(attention_input_file, predictor_cache_dir) -> List[str]:
+    """CLI args of Llama-3-8B replicas with a linear regression predictor."""
+    prefix = "--linear_regression_execution_time_predictor_config"
+    return [
+        "--replica_config_model_name",
+        "meta-llama/Meta-Llama-3-8B",
+        "--replica_config_tensor_parallel_size",
+        "1",
+        "--execution_time_predictor_config_type",
+        "linear_regression",
+        f"{prefix}_attention_input_file",
+        attention_input_file,
+        f"{prefix}_polynomial_degree",
+        "1",
+        "2",
+        "3",
+        f"{prefix}_polynomial_include_bias",
+        "True",
+        f"{prefix}_fit_intercept",
+        "True",
+        f"{prefix}_k_fold_cv_splits",
+        "3",
+        # the autoscaler only tunes at the start of the simulation
+        "--inferline_autoscaler_config_tune_interval",
+        "1000000",
+        "--metrics_config_cache_dir",
+        predictor_cache_dir,
+        "--no-metrics_config_store_plots",
+        "--no-metrics_config_store_minimal_request_metrics",
+    ]
+
+
+@pytest.fixture
+def create_config(simulation_args, monkeypatch) -> Callable[..., SimulationConfig]:
+    def _create_config(*args: str) -> SimulationConfig:
+        monkeypatch.setattr(sys, "argv", ["vidur", *simulation_args, *args])
+        config = SimulationConfig.create_from_cli_args()
+        # the autoscaler config has no min_replicas flag, the cluster keeps its size
+        config.autoscaler_config.min_replicas = config.cluster_config.num_replicas
+        return config
+
+    return _create_config
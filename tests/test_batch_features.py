@@ -0,0 +1,90 @@
+import atexit
+
+import pytest
+
+from vidur.entities import Batch, BatchFeatures, Request
+from vidur.simulator import Simulator
+from vidur.types import ReplicaSchedulerType
+from vidur.utils.random import set_seeds
+
+
+def _get_values(features: BatchFeatures) -> list:
+    return [getattr(features, slot) for slot in BatchFeatures.__slots__]
+
+
+def test_features_match_the_requests():
+    prefill_request = Request(0, 1000, 16)
+    chunked_prefill_request = Request(0, 2048, 16)
+    chunked_prefill_request.on_batch_end(0, 512)
+    decode_requests = [Request(0, n, 16) for n in (100, 3000)]
+    for request in decode_requests:
+        request.on_batch_end(0, request.num_prefill_tokens)
+
+    requests = [prefill_request, chunked_prefill_request, *decode_requests]
+    num_tokens = [1000, 256, 1, 1]
+    features = BatchFeatures.from_requests(requests, num_tokens)
+
+    decode_kv_cache_sizes = [
+        request.num_processed_tokens for request in decode_requests
+    ]
+    assert features.total_num_tokens == 1258
+    assert features.num_prefill_tokens == 1256
+    assert features.num_decodes == 2
+    assert features.decode_kv_cache_size_sum == sum(decode_kv_cache_sizes)
+    assert features.decode_kv_cache_size_sq_sum == sum(
+        n * n for n in decode_kv_cache_sizes
+    )
+    assert features.prefill_chunks == [(0, 1000), (512, 256)]
+    assert features.attention_work == (
+        2 + sum(decode_kv_cache_sizes) + 1000 * 1000 + 256 * (512 + 256)
+    )
+
+    batch = Batch(0, requests, num_tokens)
+    assert batch.total_num_tokens == 1258
+    assert batch.num_prefill_tokens == 1256
+    assert batch.num_decode_tokens == 2
+
+
+@pytest.mark.parametrize(
+    "scheduler_type", [str(scheduler_type) for scheduler_type in ReplicaSchedulerType]
+)
+def test_schedulers_accumulate_the_features_of_their_batches(
+    scheduler_type, create_config, tmp_path, monkeypatch
+):
+    num_batches = 0
+    batch_init = Batch.__init__
+
+    def __init__(self, replica_id, requests, num_tokens, features=None, *args):
+        nonlocal num_batches
+        num_batches += 1
+        # the features as computed from the requests when the batch is formed
+        assert features is not None
+        assert _get_values(features) == _get_values(
+            BatchFeatures.from_requests(requests, num_tokens)
+        )
+        batch_init(self, replica_id, requests, num_tokens, features, *args)
+
+    monkeypatch.setattr(Batch, "__init__", __init__)
+
+    config = create_config(
+        "--replica_scheduler_config_type",
+        scheduler_type,
+        "--lightllm_scheduler_config_block_size",
+        "1",
+        # the predictions stop at 4096 tokens, FasterTransformer batches full prefills
+        "--faster_transformer_scheduler_config_batch_size_cap",
+        "1",
+        "--cluster_config_num_replicas",
+        "2",
+        "--synthetic_request_generator_config_num_requests",
+        "50",
+        "--metrics_config_output_dir",
+        str(tmp_path),
+    )
+    set_seeds(config.seed)
+    simulator = Simulator(config)
+    atexit.unregister(simulator._write_output)
+    simulator.run()
+
+    assert simulator._scheduler.is_empty()
+    assert num_batches > 50
@@ -0,0 +1,161 @@
+import atexit
+import glob
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from vidur.scheduler.utils.block_allocator import BlockAllocator
+from vidur.simulator import Simulator
+from vidur.utils.random import set_seeds
+
+
+def test_shared_prefix_blocks_are_reference_counted():
+    allocator = BlockAllocator(10)
+    prefix_block_keys = [("prefix", i) for i in range(3)]
+
+    assert allocator.get_num_new_blocks(4, prefix_block_keys) == 4
+    allocator.allocate(0, 4, prefix_block_keys)
+    # the prefix blocks in use are mapped instead of allocated
+    assert allocator.get_num_new_blocks(5, prefix_block_keys) == 2
+    allocator.allocate(1, 5, prefix_block_keys)
+    # appended blocks are private
+    allocator.allocate(0, 1)
+
+    block_tables = [allocator.get_block_table(i) for i in range(2)]
+    assert block_tables[0][:3] == block_tables[1][:3]
+    assert len(set(block_tables[0] + block_tables[1])) == 7
+    assert allocator.num_used_blocks == 7
+    assert allocator.num_shared_blocks == 3
+    assert allocator.num_free_blocks == 3
+
+    # the shared blocks stay with their other user
+    assert allocator.free(0) == 5
+    assert allocator.num_used_blocks == 5
+    assert allocator.num_shared_blocks == 3
+    assert allocator.get_num_new_blocks(4, prefix_block_keys) == 1
+
+    assert allocator.free(1) == 5
+    assert allocator.num_free_blocks == 10
+    assert allocator.num_shared_blocks == 0
+
+    # the released blocks are handed out again
+    allocator.allocate(2, 10)
+    assert sorted(allocator.get_block_table(2)) == list(range(10))
+    assert allocator.num_free_blocks == 0
+
+
+@pytest.fixture
+def trace_file(tmp_path) -> str:
+    rng = np.random.default_rng(0)
+    trace_file = str(tmp_path / "trace.csv")
+    pd.DataFrame(
+        {
+            "arrived_at": np.sort(rng.uniform(0, 30, 200)),
+            "num_prefill_tokens": rng.integers(512, 2048, 200),
+            "num_decode_tokens": rng.integers(16, 128, 200),
+            "prefix_id": rng.choice(["a", "b", None], 200),
+            "num_prefix_tokens": rng.integers(0, 512, 200),
+        }
+    ).to_csv(trace_file, index=False)
+    return trace_file
+
+
+def _run(create_config, trace_file: str, output_dir: str, *args: str):
+    config = create_config(
+        "--cluster_config_num_replicas",
+        "2",
+        "--request_generator_config_type",
+        "trace_replay",
+        "--trace_request_generator_config_trace_file",
+        trace_file,
+        "--metrics_config_output_dir",
+        output_dir,
+        *args,
+    )
+    set_seeds(config.seed)
+    simulator = Simulator(config)
+    atexit.unregister(simulator._write_output)
+    simulator.run()
+    simulator._write_output()
+
+    (path,) = glob.glob(f"{output_dir}/**/request_metrics.csv", recursive=True)
+    # the ids of the requests depend on the number of requests created before
+    return simulator, pd.read_csv(path).drop(columns="Request Id")
+
+
+@pytest.mark.parametrize("scheduler_type", ["vllm", "sarathi"])
+def test_prefix_caching_returns_every_block(
+    scheduler_type, create_config, trace_file, tmp_path
+):
+    simulator, _ = _run(
+        create_config,
+        trace_file,
+        str(tmp_path),
+        "--replica_scheduler_config_type",
+        scheduler_type,
+        f"--{scheduler_type}_scheduler_config_enable_prefix_caching",
+    )
+
+    assert simulator._scheduler.is_empty()
+    for replica_scheduler in simulator._scheduler._replica_schedulers.values():
+        block_allocator = replica_scheduler._block_allocator
+        assert block_allocator.num_free_blocks == block_allocator.num_blocks
+        assert replica_scheduler._num_allocated_blocks == 0
+
+
+@pytest.mark.parametrize("scheduler_type", ["vllm", "sarathi"])
+def test_prefix_caching_without_prefixes_does_not_change_the_results(
+    scheduler_type, create_config, trace_file, tmp_path
+):
+    trace_df = pd.read_csv(trace_file).drop(columns=["prefix_id", "num_prefix_tokens"])
+    trace_df.to_csv(trace_file, index=False)
+
+    _, request_metrics = _run(
+        create_config,
+        trace_file,
+        str(tmp_path / "private"),
+        "--replica_scheduler_config_type",
+        scheduler_type,
+    )
+    _, prefix_caching_request_metrics = _run(
+        create_config,
+        trace_file,
+        str(tmp_path / "prefix_caching"),
+        "--replica_scheduler_config_type",
+        scheduler_type,
+        f"--{scheduler_type}_scheduler_config_enable_prefix_caching",
+    )
+
+    assert len(request_metrics) == 200
+    pd.testing.assert_frame_equal(request_metrics, prefix_caching_request_metrics)
+
+
+def test_cached_prefix_blocks_are_evicted_least_recently_released_first():
+    allocator = BlockAllocator(4)
+    prefix_block_keys = {"a": [("a", 0), ("a", 1)], "b": [("b", 0)]}
+    for request_id, prefix_id in enumerate(prefix_block_keys):
+        num_blocks = len(prefix_block_keys[prefix_id])
+        allocator.allocate(request_id, num_blocks, prefix_block_keys[prefix_id])
+        allocator.mark_computed(request_id, num_blocks)
+        allocator.free(request_id)
+
+    # the cached blocks without users count as free
+    assert allocator.num_free_blocks == 4
+    assert allocator.num_evictable_blocks == 3
+    assert allocator.get_num_cached_prefix_blocks(prefix_block_keys["a"]) == 2
+
+    # the untouched block is taken first, then the end of the first released prefix
+    allocator.allocate(2, 2)
+    assert allocator.get_num_cached_prefix_blocks(prefix_block_keys["a"]) == 1
+    assert allocator.get_num_cached_prefix_blocks(prefix_block_keys["b"]) == 1
+
+    # reusing a cached block takes it from the free blocks, without an eviction
+    assert allocator.get_num_new_blocks(1, prefix_block_keys["b"]) == 1
+    allocator.allocate(3, 1, prefix_block_keys["b"])
+    assert allocator.get_num_cached_prefix_blocks(prefix_block_keys["b"]) == 1
+    assert allocator.num_evictable_blocks == 1
+
+    allocator.allocate(4, 1)
+    assert allocator.get_num_cached_prefix_blocks(prefix_block_keys["a"]) == 0
+    assert allocator.num_free_blocks == 0
@@ -0,0 +1,73 @@
+import atexit
+import glob
+import os
+import shutil
+
+import pandas as pd
+
+from vidur.config import SimulationConfig
+from vidur.simulator import Simulator
+from vidur.utils.random import set_seeds
+
+TRACE_FILE = os.path.join(
+    os.path.dirname(__file__), "../data/processed_traces/splitwise_conv.csv"
+)
+
+
+def _create_config(create_config, output_dir: str, *args: str) -> SimulationConfig:
+    return create_config(
+        "--time_limit",
+        "60",
+        "--cluster_config_num_replicas",
+        "2",
+        "--request_generator_config_type",
+        "synthetic",
+        "--length_generator_config_type",
+        "trace",
+        "--trace_request_length_generator_config_trace_file",
+        TRACE_FILE,
+        "--interval_generator_config_type",
+        "poisson",
+        "--poisson_request_interval_generator_config_qps",
+        "4",
+        "--synthetic_request_generator_config_num_requests",
+        "200",
+        "--metrics_config_output_dir",
+        output_dir,
+        *args,
+    )
+
+
+def _run(simulator: Simulator) -> pd.DataFrame:
+    atexit.unregister(simulator._write_output)
+    simulator.run()
+    simulator._write_output()
+
+    (path,) = glob.glob(
+        f"{simulator._config.metrics_config.output_dir}/**/request_metrics.csv",
+        recursive=True,
+    )
+    return pd.read_csv(path)
+
+
+def test_resumed_run_matches_uninterrupted_run(create_config, tmp_path, monkeypatch):
+    checkpoint_path = str(tmp_path / "first_checkpoint.pkl")
+    write_checkpoint = Simulator._write_checkpoint
+
+    def _write_checkpoint(self):
+        write_checkpoint(self)
+        # keep the first checkpoint, the later ones overwrite it
+        if not os.path.exists(checkpoint_path):
+            shutil.copy(self.checkpoint_path, checkpoint_path)
+
+    monkeypatch.setattr(Simulator, "_write_checkpoint", _write_checkpoint)
+
+    config = _create_config(create_config, str(tmp_path), "--checkpoint_interval", "20")
+    set_seeds(config.seed)
+    request_metrics = _run(Simulator(config))
+
+    resumed_simulator = Simulator.from_checkpoint(checkpoint_path)
+    assert 20 <= resumed_simulator._time < 40
+    resumed_request_metrics = _run(resumed_simulator)
+
+    pd.testing.assert_frame_equal(request_metrics, resumed_request_metrics)
@@ -0,0 +1,120 @@
+import atexit
+
+import pytest
+
+from vidur.config import (
+    ReplicaConfig,
+    RooflineExecutionTimePredictorConfig,
+    SimulationConfig,
+    SyntheticRequestGeneratorConfig,
+)
+from vidur.entities import Replica, Request
+from vidur.events.request_handoff_event import RequestHandoffEvent
+from vidur.scheduler.utils.kv_cache_transfer_time_predictor import (
+    KVCacheTransferTimePredictor,
+)
+from vidur.simulator import Simulator
+from vidur.types import ReplicaRole
+from vidur.utils.random import set_seeds
+
+
+def _create_simulator(output_dir: str, *args: str) -> Simulator:
+    config = SimulationConfig.create_from_cli_args(
+        [
+            "--cluster_config_num_replicas",
+            "4",
+            "--cluster_config_num_prefill_replicas",
+            "2",
+            "--synthetic_request_generator_config_num_requests",
+            "100",
+            "--execution_time_predictor_config_type",
+            "roofline",
+            "--autoscaler_config_type",
+            "disabled",
+            "--metrics_config_output_dir",
+            output_dir,
+            "--metrics_config_cache_dir",
+            f"{output_dir}/cache",
+            "--no-metrics_config_store_plots",
+            *args,
+        ]
+    )
+    set_seeds(config.seed)
+    simulator = Simulator(config)
+    atexit.unregister(simulator._write_output)
+    return simulator
+
+
+def test_new_requests_are_only_scheduled_on_prefill_replicas(tmp_path):
+    simulator = _create_simulator(str(tmp_path))
+    replicas = simulator._cluster.replicas
+    prefill_replica_ids = [
+        replica_id
+        for replica_id, replica in replicas.items()
+        if replica.role == ReplicaRole.PREFILL
+    ]
+
+    assert len(prefill_replica_ids) == 2
+    assert [replica.role for replica in replicas.values()].count(
+        ReplicaRole.DECODE
+    ) == 2
+    assert simulator._scheduler.get_schedulable_replica_ids() == sorted(
+        prefill_replica_ids
+    )
+
+
+@pytest.mark.parametrize("scheduler_type", ["vllm", "sarathi"])
+def test_requests_are_handed_off_to_decode_replicas(
+    scheduler_type, tmp_path, monkeypatch
+):
+    simulator = _create_simulator(
+        str(tmp_path), "--replica_scheduler_config_type", scheduler_type
+    )
+    replicas = simulator._cluster.replicas
+    scheduler = simulator._scheduler
+
+    handoffs = []
+    handle_event = RequestHandoffEvent.handle_event
+
+    def record_handoff(event, *args):
+        request = event._request
+        # the transfer starts when the prefill completes
+        assert event.time == pytest.approx(
+            request.prefill_completed_at + scheduler.get_kv_cache_transfer_time(request)
+        )
+        next_events = handle_event(event, *args)
+        handoffs.append((event._prefill_replica_id, event._decode_replica_id, request))
+        return next_events
+
+    monkeypatch.setattr(RequestHandoffEvent, "handle_event", record_handoff)
+    simulator.run()
+
+    assert scheduler.is_empty()
+    assert len(handoffs) == 100
+    for prefill_replica_id, decode_replica_id, request in handoffs:
+        assert replicas[prefill_replica_id].role == ReplicaRole.PREFILL
+        assert replicas[decode_replica_id].role == ReplicaRole.DECODE
+        assert request.completed
+        assert request.completed_at > request.prefill_completed_at
+
+
+def test_kv_cache_transfer_time():
+    replica_config = ReplicaConfig(
+        model_name="meta-llama/Meta-Llama-3-8B", network_device="a100_dgx"
+    )
+    replica = Replica(replica_config, SyntheticRequestGeneratorConfig())
+    predictor = KVCacheTransferTimePredictor(
+        replica_config,
+        replica,
+        RooflineExecutionTimePredictorConfig().send_recv_input_file,
+    )
+
+    transfer_times = [
+        predictor.get_transfer_time(Request(0, num_prefill_tokens, 16))
+        for num_prefill_tokens in (16, 256, 4096, 65536, 131072)
+    ]
+
+    assert 0 < transfer_times[0]
+    assert transfer_times == sorted(set(transfer_times))
+    # linear beyond the largest profiled message
+    assert transfer_times[4] == pytest.approx(2 * transfer_times[3])
@@ -0,0 +1,73 @@
+import atexit
+import glob
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from vidur.events.global_schedule_event import GlobalScheduleEvent
+from vidur.events.replica_schedule_event import ReplicaScheduleEvent
+from vidur.simulator import Simulator
+from vidur.utils.random import set_seeds
+
+
+@pytest.fixture
+def burst_trace_file(tmp_path) -> str:
+    # 15 bursts of 8 requests that arrive at the same time
+    rng = np.random.default_rng(0)
+    trace_file = str(tmp_path / "trace.csv")
+    pd.DataFrame(
+        {
+            "arrived_at": np.repeat(np.arange(15) * 2.0, 8),
+            "num_prefill_tokens": rng.integers(64, 1024, 120),
+            "num_decode_tokens": rng.integers(16, 128, 120),
+        }
+    ).to_csv(trace_file, index=False)
+    return trace_file
+
+
+def _run(create_config, trace_file: str, output_dir: str, scheduler_type: str):
+    config = create_config(
+        "--replica_scheduler_config_type",
+        scheduler_type,
+        "--lightllm_scheduler_config_block_size",
+        "1",
+        "--cluster_config_num_replicas",
+        "2",
+        "--request_generator_config_type",
+        "trace_replay",
+        "--trace_request_generator_config_trace_file",
+        trace_file,
+        "--metrics_config_output_dir",
+        output_dir,
+    )
+    set_seeds(config.seed)
+    simulator = Simulator(config)
+    atexit.unregister(simulator._write_output)
+    simulator.run()
+    simulator._write_output()
+
+    (path,) = glob.glob(f"{output_dir}/**/request_metrics.csv", recursive=True)
+    # the ids of the requests depend on the number of requests created before
+    return simulator, pd.read_csv(path).drop(columns="Request Id")
+
+
+@pytest.mark.parametrize("scheduler_type", ["vllm", "sarathi", "orca", "lightllm"])
+def test_coalescing_does_not_change_the_results(
+    scheduler_type, create_config, burst_trace_file, tmp_path, monkeypatch
+):
+    simulator, request_metrics = _run(
+        create_config, burst_trace_file, str(tmp_path / "coalesced"), scheduler_type
+    )
+    # the schedule events of a burst are coalesced into one
+    assert simulator._num_coalesced_events >= 7 * 15
+
+    monkeypatch.setattr(GlobalScheduleEvent, "coalescing_key", None)
+    monkeypatch.setattr(ReplicaScheduleEvent, "coalescing_key", None)
+    simulator, uncoalesced_request_metrics = _run(
+        create_config, burst_trace_file, str(tmp_path / "uncoalesced"), scheduler_type
+    )
+    assert simulator._num_coalesced_events == 0
+
+    assert len(request_metrics) == 120
+    pd.testing.assert_frame_equal(request_metrics, uncoalesced_request_metrics)
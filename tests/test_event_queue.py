@@ -0,0 +1,89 @@
+import atexit
+import glob
+import random
+
+import pandas as pd
+
+from vidur.config import CalendarEventQueueConfig, HeapEventQueueConfig
+from vidur.entities import Request
+from vidur.event_queue import CalendarEventQueue, HeapEventQueue
+from vidur.events import AutoscaleTunerEvent, RequestArrivalEvent
+from vidur.simulator import Simulator
+from vidur.utils.random import set_seeds
+
+
+def _get_order(event_queue, operations) -> list:
+    order = []
+    for operation in operations:
+        if operation is None:
+            order.append(event_queue.get())
+        else:
+            event_queue.put(operation)
+    while len(event_queue):
+        order.append(event_queue.get())
+    return order
+
+
+def test_calendar_queue_matches_heap_queue():
+    rng = random.Random(0)
+    # the events to put, None gets the next event
+    operations = []
+    num_events = 0
+    num_pending_events = 0
+    time = 0
+    for _ in range(5000):
+        if num_pending_events and rng.random() < 0.4:
+            operations.append(None)
+            num_pending_events -= 1
+            continue
+
+        # ties, events in the same bucket, in the next buckets and far ahead
+        time += rng.choice([0, 0, 1e-5, 1e-4, 1e-3, 0.01, 1.0])
+        event_time = time + rng.choice([0, 0, 1e-4, 2e-3, 0.5])
+        if rng.random() < 0.5:
+            event = RequestArrivalEvent(event_time, Request(event_time, 16, 16))
+        else:
+            event = AutoscaleTunerEvent(event_time)
+        operations.append(event)
+        num_events += 1
+        num_pending_events += 1
+
+    heap_order = _get_order(HeapEventQueue(HeapEventQueueConfig()), operations)
+    calendar_order = _get_order(
+        CalendarEventQueue(CalendarEventQueueConfig(bucket_width=1e-3)), operations
+    )
+
+    assert len(heap_order) == num_events
+    assert list(map(id, calendar_order)) == list(map(id, heap_order))
+
+
+def _run(create_config, output_dir: str, event_queue_type: str) -> pd.DataFrame:
+    config = create_config(
+        "--event_queue_config_type",
+        event_queue_type,
+        "--cluster_config_num_replicas",
+        "2",
+        "--synthetic_request_generator_config_num_requests",
+        "200",
+        "--metrics_config_output_dir",
+        output_dir,
+    )
+    set_seeds(config.seed)
+    simulator = Simulator(config)
+    atexit.unregister(simulator._write_output)
+    simulator.run()
+    simulator._write_output()
+
+    (path,) = glob.glob(f"{output_dir}/**/request_metrics.csv", recursive=True)
+    # the ids of the requests depend on the number of requests created before
+    return pd.read_csv(path).drop(columns="Request Id")
+
+
+def test_calendar_queue_run_matches_heap_queue_run(create_config, tmp_path):
+    request_metrics = _run(create_config, str(tmp_path / "heap"), "heap")
+    calendar_request_metrics = _run(
+        create_config, str(tmp_path / "calendar"), "calendar"
+    )
+
+    assert len(request_metrics) == 200
+    pd.testing.assert_frame_equal(request_metrics, calendar_request_metrics)
@@ -0,0 +1,118 @@
+from dataclasses import fields
+
+import pytest
+
+from vidur.config import (
+    BaseReplicaSchedulerConfig,
+    OrcaSchedulerConfig,
+    ReplicaConfig,
+    SyntheticRequestGeneratorConfig,
+    VllmSchedulerConfig,
+)
+from vidur.entities import Replica, Request
+from vidur.scheduler.replica_scheduler.replica_scheduler_registry import (
+    ReplicaSchedulerRegistry,
+)
+from vidur.types import ReplicaSchedulerType
+
+
+def _get_replica_scheduler(scheduler_type: str, **config):
+    replica_scheduler_config = BaseReplicaSchedulerConfig.create_from_type(
+        ReplicaSchedulerType.from_str(scheduler_type)
+    )
+    replica_scheduler_config.enable_prefix_caching = True
+    replica_scheduler_config.num_blocks = 1000
+    for key, value in config.items():
+        setattr(replica_scheduler_config, key, value)
+    replica_config = ReplicaConfig(
+        model_name="meta-llama/Meta-Llama-3-8B", network_device="a100_pairwise_nvlink"
+    )
+    request_generator_config = SyntheticRequestGeneratorConfig()
+    return ReplicaSchedulerRegistry.get(
+        replica_scheduler_config.get_type(),
+        replica_config=replica_config,
+        replica_scheduler_config=replica_scheduler_config,
+        request_generator_config=request_generator_config,
+        replica=Replica(replica_config, request_generator_config),
+        num_stages=1,
+        execution_time_predictor=None,
+    )
+
+
+def _run_batch(replica_scheduler, time: float) -> dict:
+    batch = replica_scheduler._get_next_batch()
+    batch.on_schedule(time)
+    batch.on_batch_end(time + 1)
+    replica_scheduler.on_batch_end(batch)
+    return dict(zip(batch.request_ids, batch.num_tokens))
+
+
+@pytest.mark.parametrize(
+    "scheduler_type, config, num_first_tokens",
+    [
+        ("vllm", {}, 1024),
+        # the first chunk of the first request computes 48 of the 60 prefix blocks
+        ("sarathi", {"chunk_size": 768}, 1024 - 768),
+    ],
+)
+def test_prefix_is_a_cache_hit_once_computed(scheduler_type, config, num_first_tokens):
+    replica_scheduler = _get_replica_scheduler(scheduler_type, **config)
+    requests = [
+        Request(0, 1024, 4, prefix_id="prefix", num_prefix_tokens=960) for _ in range(2)
+    ]
+    for request in requests:
+        replica_scheduler.add_request(request)
+
+    time = 0
+    num_tokens = {}
+    while requests[1].id not in num_tokens:
+        num_tokens = _run_batch(replica_scheduler, time)
+        time += 1
+
+    assert num_tokens[requests[1].id] == num_first_tokens
+
+    request = Request(time, 1024, 4, prefix_id="prefix", num_prefix_tokens=960)
+    replica_scheduler.add_request(request)
+    while request.id not in num_tokens:
+        num_tokens = _run_batch(replica_scheduler, time)
+        time += 1
+
+    assert num_tokens[request.id] == 64
+
+
+def test_swapped_in_request_shares_its_cached_prefix():
+    replica_scheduler = _get_replica_scheduler("vllm", preemption_mode="swap")
+    requests = [
+        Request(0, 1024, 4, prefix_id="prefix", num_prefix_tokens=960) for _ in range(2)
+    ]
+    for request in requests:
+        replica_scheduler.add_request(request)
+    _run_batch(replica_scheduler, 0)
+    _run_batch(replica_scheduler, 1)
+
+    block_allocator = replica_scheduler._block_allocator
+    prefix_blocks = block_allocator.get_block_table(requests[0].id)[:60]
+    num_used_blocks = block_allocator.num_used_blocks
+
+    replica_scheduler._preempt_request(requests[1])
+    replica_scheduler._get_kv_cache_swap_time()
+    replica_scheduler._swap_in_requests()
+
+    assert block_allocator.get_block_table(requests[1].id)[:60] == prefix_blocks
+    assert block_allocator.num_used_blocks == num_used_blocks
+    # only the blocks after the shared prefix are copied back
+    assert replica_scheduler._num_blocks_to_swap == 5
+
+
+def test_only_vllm_and_sarathi_cache_prefixes():
+    replica_scheduler = _get_replica_scheduler("orca")
+    request = Request(0, 1024, 4, prefix_id="prefix", num_prefix_tokens=960)
+
+    # the other schedulers ignore the prefix caching flag of their config
+    assert replica_scheduler._get_prefix_block_keys(request) == []
+    assert "enable_prefix_caching" not in {
+        field.name for field in fields(OrcaSchedulerConfig)
+    }
+
+    with pytest.raises(AssertionError, match="Invalid preemption mode"):
+        VllmSchedulerConfig(preemption_mode="discard")
@@ -0,0 +1,96 @@
+import os
+
+import pandas as pd
+import pytest
+
+from vidur.execution_time_predictor.profiling_data_catalog import (
+    ProfilingDataCatalog,
+)
+
+
+@pytest.fixture
+def catalog(tmp_path, monkeypatch) -> ProfilingDataCatalog:
+    # the partitions loaded by the other tests of the process are not shared
+    monkeypatch.setattr(ProfilingDataCatalog, "_partitions", {})
+    return ProfilingDataCatalog(str(tmp_path / "cache"))
+
+
+@pytest.fixture
+def input_file(tmp_path) -> str:
+    path = str(tmp_path / "all_reduce.csv")
+    df = pd.DataFrame(
+        {
+            "collective": ["all_reduce", "send_recv"] * 4 + ["all_reduce"],
+            "num_workers": [1, 1, 2, 2, 4, 4, 2, 2, 2],
+            "size": [1024, 1024, 1024, 1024, 2048, 2048, 4096, 4096, 1024],
+            "time_stats.median": [0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.3],
+        }
+    )
+    df.to_csv(path, index=False)
+    return path
+
+
+def _read_partition(file_path: str, **partition) -> pd.DataFrame:
+    # the rows the predictors used to load from the csv
+    df = pd.read_csv(file_path).drop_duplicates()
+    for column, value in partition.items():
+        df = df[df[column] == value]
+    return df
+
+
+def test_partitions_match_the_csv(catalog, input_file):
+    for num_workers in [1, 2, 4]:
+        partition = {"collective": "all_reduce", "num_workers": num_workers}
+        pd.testing.assert_frame_equal(
+            catalog.get_partition(input_file, partition),
+            _read_partition(input_file, **partition),
+        )
+
+    # the duplicated row is dropped
+    assert len(catalog.get_partition(input_file, {"num_workers": 2})) == 4
+
+    missing_partition = catalog.get_partition(input_file, {"num_workers": 8})
+    assert missing_partition.empty
+    assert list(missing_partition.columns) == list(pd.read_csv(input_file).columns)
+
+
+def test_partitions_are_loaded_from_the_catalog(
+    catalog, input_file, tmp_path, monkeypatch
+):
+    partition = {"collective": "all_reduce", "num_workers": 2}
+    df = catalog.get_partition(input_file, partition)
+
+    # the loaded partitions are copies
+    df["time_stats.median"] = 0
+    pd.testing.assert_frame_equal(
+        catalog.get_partition(input_file, partition),
+        _read_partition(input_file, **partition),
+    )
+
+    def read_csv(*args, **kwargs):
+        raise AssertionError("the csv is parsed again")
+
+    with monkeypatch.context() as m:
+        m.setattr(ProfilingDataCatalog, "_partitions", {})
+        m.setattr(pd, "read_csv", read_csv)
+        df = ProfilingDataCatalog(str(tmp_path / "cache")).get_partition(
+            input_file, partition
+        )
+    pd.testing.assert_frame_equal(df, _read_partition(input_file, **partition))
+
+
+def test_modified_csv_invalidates_the_catalog(catalog, input_file):
+    partition = {"collective": "all_reduce", "num_workers": 2}
+    catalog.get_partition(input_file, partition)
+
+    df = pd.read_csv(input_file)
+    df["time_stats.median"] *= 2
+    df.to_csv(input_file, index=False)
+    # the modification time may not change within the timestamp resolution
+    stat = os.stat(input_file)
+    os.utime(input_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    pd.testing.assert_frame_equal(
+        catalog.get_partition(input_file, partition),
+        _read_partition(input_file, **partition),
+    )
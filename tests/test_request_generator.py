@@ -0,0 +1,87 @@
+import atexit
+import itertools
+
+from vidur.config import (
+    PoissonRequestIntervalGeneratorConfig,
+    SyntheticRequestGeneratorConfig,
+    TraceRequestGeneratorConfig,
+    UniformRequestLengthGeneratorConfig,
+)
+from vidur.events import RequestArrivalEvent
+from vidur.request_generator import RequestGeneratorRegistry
+from vidur.request_generator.base_request_generator import BaseRequestGenerator
+from vidur.simulator import Simulator
+from vidur.utils.random import set_seeds
+
+
+def _get_request_generator(config) -> BaseRequestGenerator:
+    return RequestGeneratorRegistry.get(config.get_type(), config)
+
+
+def _to_tuples(requests) -> list:
+    return [
+        (request.arrived_at, request.num_prefill_tokens, request.num_decode_tokens)
+        for request in requests
+    ]
+
+
+def _get_synthetic_config(**kwargs) -> SyntheticRequestGeneratorConfig:
+    return SyntheticRequestGeneratorConfig(
+        length_generator_config=UniformRequestLengthGeneratorConfig(),
+        interval_generator_config=PoissonRequestIntervalGeneratorConfig(qps=4),
+        **kwargs,
+    )
+
+
+def test_synthetic_stream_matches_generate():
+    for config in [
+        _get_synthetic_config(num_requests=500),
+        _get_synthetic_config(num_requests=None, duration=60),
+    ]:
+        requests = _to_tuples(_get_request_generator(config).generate())
+        streamed_requests = _to_tuples(_get_request_generator(config).stream())
+
+        assert len(requests) > 100
+        assert streamed_requests == requests
+
+
+def test_synthetic_stream_is_lazy():
+    config = _get_synthetic_config(num_requests=10**12)
+    requests = list(itertools.islice(_get_request_generator(config).stream(), 10))
+
+    assert len(requests) == 10
+
+
+def test_trace_replay_stream_is_sorted_by_arrival():
+    config = TraceRequestGeneratorConfig(max_tokens=16384)
+    requests = _to_tuples(_get_request_generator(config).generate())
+    streamed_requests = _to_tuples(_get_request_generator(config).stream())
+
+    assert streamed_requests == sorted(requests, key=lambda request: request[0])
+
+
+def test_simulator_pulls_one_arrival_at_a_time(create_config, tmp_path, monkeypatch):
+    config = create_config(
+        "--synthetic_request_generator_config_num_requests",
+        "100",
+        "--metrics_config_output_dir",
+        str(tmp_path),
+    )
+
+    arrivals = []
+    init_arrival = RequestArrivalEvent.__init__
+
+    def record_arrival(event, time, request):
+        init_arrival(event, time, request)
+        arrivals.append(request)
+
+    monkeypatch.setattr(RequestArrivalEvent, "__init__", record_arrival)
+    set_seeds(config.seed)
+    simulator = Simulator(config)
+    atexit.unregister(simulator._write_output)
+
+    assert len(arrivals) == 1
+    simulator.run()
+
+    assert len(arrivals) == 100
+    assert all(request.completed for request in arrivals)
@@ -0,0 +1,35 @@
+from vidur.entities import Request
+from vidur.scheduler.utils.request_queue import ArrivalOrderedRequestQueue
+
+
+def _create_requests(*arrival_times: float):
+    return [Request(arrived_at, 16, 4) for arrived_at in arrival_times]
+
+
+def test_queue_is_fifo_until_sorted():
+    requests = _create_requests(2, 1, 3)
+    queue = ArrivalOrderedRequestQueue()
+    queue.extend(requests)
+
+    assert list(queue) == requests
+
+    queue.sort()
+    assert list(queue) == [requests[1], requests[0], requests[2]]
+    assert queue.popleft() is requests[1]
+    assert queue.pop() is requests[2]
+
+
+def test_sort_keeps_the_queue_order_of_ties():
+    # matches a stable sort of a list, re-added requests stay ahead of the requests
+    # in the queue which arrived at the same time
+    queued_requests = _create_requests(1, 1, 0)
+    readded_requests = _create_requests(1, 1)
+    queue = ArrivalOrderedRequestQueue()
+    queue.extend(queued_requests)
+    queue.extendleft(readded_requests)
+    queue.sort()
+
+    expected_requests = sorted(
+        readded_requests + queued_requests, key=lambda request: request.arrived_at
+    )
+    assert list(queue) == expected_requests
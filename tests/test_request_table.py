@@ -0,0 +1,71 @@
+import atexit
+import glob
+
+import numpy as np
+import pandas as pd
+
+from vidur.entities import Request, RequestTable
+from vidur.simulator import Simulator
+from vidur.utils.random import set_seeds
+
+
+def _complete(request: Request, time: float) -> None:
+    request.on_batch_schedule(time)
+    request.on_batch_end(time + 1, request.num_prefill_tokens)
+    request.on_batch_end(time + 2, request.num_decode_tokens - 1)
+
+
+def test_request_table_records_arrivals_and_completions():
+    request_table = RequestTable(initial_capacity=4)
+    requests = [Request(arrived_at, 128, 16) for arrived_at in range(10)]
+    for request in requests:
+        request_table.on_request_arrival(request)
+    # completions are recorded in completion order, not in id order
+    for request in requests[::-2]:
+        _complete(request, 20)
+        request_table.on_request_end(request)
+
+    assert len(request_table) == 10
+    assert request_table.num_arrived == 10
+    assert request_table.num_completed == 5
+    assert list(request_table.request_ids) == [request.id for request in requests]
+    assert list(request_table["arrived_at"]) == list(range(10))
+    assert np.isnan(request_table["inter_arrival_delay"][0])
+    assert list(request_table["inter_arrival_delay"][1:]) == [1] * 9
+    assert list(request_table["completed"]) == [False, True] * 5
+    assert list(request_table["completion_order"][1::2]) == [4, 3, 2, 1, 0]
+    assert list(request_table["completed_at"][1::2]) == [22] * 5
+    assert list(request_table["scheduling_delay"][1::2]) == [19, 17, 15, 13, 11]
+
+
+def _run(create_config, output_dir: str, *args: str) -> pd.DataFrame:
+    config = create_config(
+        "--cluster_config_num_replicas",
+        "2",
+        "--synthetic_request_generator_config_num_requests",
+        "200",
+        "--metrics_config_output_dir",
+        output_dir,
+        *args,
+    )
+    set_seeds(config.seed)
+    simulator = Simulator(config)
+    atexit.unregister(simulator._write_output)
+    simulator.run()
+    simulator._write_output()
+
+    (path,) = glob.glob(f"{output_dir}/**/request_metrics.csv", recursive=True)
+    # the ids of the requests depend on the number of requests created before
+    return pd.read_csv(path).drop(columns="Request Id")
+
+
+def test_request_table_metrics_match_data_series_metrics(create_config, tmp_path):
+    request_metrics = _run(create_config, str(tmp_path / "data_series"))
+    request_table_metrics = _run(
+        create_config,
+        str(tmp_path / "request_table"),
+        "--metrics_config_use_request_table",
+    )
+
+    assert len(request_metrics) == 200
+    pd.testing.assert_frame_equal(request_metrics, request_table_metrics)
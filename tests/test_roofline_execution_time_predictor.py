@@ -0,0 +1,108 @@
+import atexit
+import glob
+
+import pandas as pd
+import pytest
+
+from vidur.config import (
+    MetricsConfig,
+    ReplicaConfig,
+    RooflineExecutionTimePredictorConfig,
+    SimulationConfig,
+    VllmSchedulerConfig,
+)
+from vidur.entities import Batch, Request
+from vidur.execution_time_predictor import ExecutionTimePredictorRegistry
+from vidur.simulator import Simulator
+from vidur.types import ExecutionTimePredictorType, ReplicaSchedulerType
+from vidur.utils.random import set_seeds
+
+
+def _get_predictor(output_dir: str, tensor_parallel_size: int = 1):
+    return ExecutionTimePredictorRegistry.get(
+        ExecutionTimePredictorType.ROOFLINE,
+        predictor_config=RooflineExecutionTimePredictorConfig(),
+        replica_config=ReplicaConfig(
+            model_name="meta-llama/Meta-Llama-3-8B",
+            tensor_parallel_size=tensor_parallel_size,
+            network_device="a100_pairwise_nvlink",
+        ),
+        replica_scheduler_config=VllmSchedulerConfig(),
+        metrics_config=MetricsConfig(output_dir=output_dir, cache_dir=output_dir),
+    )
+
+
+def _get_prefill_time(predictor, num_prefill_tokens: int) -> float:
+    batch = Batch(0, [Request(0, num_prefill_tokens, 16)], [num_prefill_tokens])
+    return predictor.get_execution_time(batch, 0).total_time
+
+
+def _get_decode_time(predictor, batch_size: int, kv_cache_size: int) -> float:
+    requests = [Request(0, kv_cache_size, 16) for _ in range(batch_size)]
+    for request in requests:
+        request.on_batch_end(0, kv_cache_size)
+
+    batch = Batch(0, requests, [1] * batch_size)
+    return predictor.get_execution_time(batch, 0).total_time
+
+
+def test_time_increases_with_tokens_and_batch_size(tmp_path):
+    predictor = _get_predictor(str(tmp_path))
+
+    prefill_times = [_get_prefill_time(predictor, n) for n in (128, 512, 2048, 8192)]
+    assert prefill_times == sorted(set(prefill_times))
+
+    decode_times = [_get_decode_time(predictor, n, 1024) for n in (1, 8, 64, 256)]
+    assert decode_times == sorted(set(decode_times))
+
+    decode_times = [_get_decode_time(predictor, 32, n) for n in (256, 1024, 4096)]
+    assert decode_times == sorted(set(decode_times))
+
+
+def test_time_decreases_with_tensor_parallelism(tmp_path):
+    predictors = [_get_predictor(str(tmp_path), n) for n in (1, 2, 4)]
+
+    prefill_times = [_get_prefill_time(predictor, 4096) for predictor in predictors]
+    assert prefill_times == sorted(set(prefill_times), reverse=True)
+
+    decode_times = [_get_decode_time(predictor, 64, 2048) for predictor in predictors]
+    assert decode_times == sorted(set(decode_times), reverse=True)
+
+
+@pytest.mark.parametrize(
+    "scheduler_type", [str(scheduler_type) for scheduler_type in ReplicaSchedulerType]
+)
+def test_every_replica_scheduler_runs(scheduler_type, tmp_path):
+    config = SimulationConfig.create_from_cli_args(
+        [
+            "--replica_scheduler_config_type",
+            scheduler_type,
+            "--lightllm_scheduler_config_block_size",
+            "1",
+            "--cluster_config_num_replicas",
+            "2",
+            "--synthetic_request_generator_config_num_requests",
+            "50",
+            "--execution_time_predictor_config_type",
+            "roofline",
+            "--metrics_config_output_dir",
+            str(tmp_path),
+            "--metrics_config_cache_dir",
+            str(tmp_path / "cache"),
+            "--no-metrics_config_store_plots",
+            "--no-metrics_config_store_minimal_request_metrics",
+        ]
+    )
+    # the autoscaler config has no min_replicas flag
+    config.autoscaler_config.min_replicas = 2
+    set_seeds(config.seed)
+    simulator = Simulator(config)
+    atexit.unregister(simulator._write_output)
+    simulator.run()
+    simulator._write_output()
+
+    assert simulator._scheduler.is_empty()
+    (path,) = glob.glob(f"{tmp_path}/**/request_metrics.csv", recursive=True)
+    request_metrics = pd.read_csv(path)
+    assert len(request_metrics) == 50
+    assert (request_metrics["request_e2e_time"] > 0).all()
@@ -0,0 +1,240 @@
+import shutil
+from typing import List
+
+import numpy as np
+import pandas as pd
+
+from vidur.entities import Batch, ExecutionTime, Request
+from vidur.execution_time_predictor.sklearn_execution_time_predictor import (
+    NUM_TOKENS_MODEL_COLUMNS,
+    PREDICTION_TABLES,
+    SklearnExecutionTimePredictor,
+)
+from vidur.simulator import Simulator
+
+PREFIX = "--linear_regression_execution_time_predictor_config"
+
+
+def _get_predictor(create_config, *args: str) -> SklearnExecutionTimePredictor:
+    return Simulator._build_execution_time_predictor(create_config(*args))
+
+
+def _get_decode_request(kv_cache_size: int) -> Request:
+    request = Request(0, kv_cache_size, 16)
+    request.on_batch_end(0, kv_cache_size)
+    return request
+
+
+def _get_batches() -> List[Batch]:
+    # prefills, a chunked prefill, decodes with skewed kv cache sizes and a mixed batch
+    chunked_prefill_request = Request(0, 2048, 16)
+    chunked_prefill_request.on_batch_end(0, 512)
+
+    return [
+        Batch(0, [Request(0, 100, 16)], [100]),
+        Batch(0, [Request(0, 300, 16), Request(0, 50, 16)], [300, 50]),
+        Batch(0, [chunked_prefill_request], [1000]),
+        Batch(0, [_get_decode_request(n) for n in (100, 200, 3000)], [1, 1, 1]),
+        Batch(0, [Request(0, 300, 16), _get_decode_request(1000)], [300, 1]),
+    ]
+
+
+def _get_fields(execution_time: ExecutionTime) -> List[float]:
+    return [getattr(execution_time, slot) for slot in ExecutionTime.__slots__]
+
+
+def _get_keys_and_values(predictions: dict):
+    return np.array(list(predictions.keys())), np.array(list(predictions.values()))
+
+
+def test_dense_tables_match_the_model_predictions(create_config):
+    predictor = _get_predictor(create_config)
+    predictions = predictor._predict_from_models()
+    granularity = predictor._config.kv_cache_prediction_granularity
+    decode_overhead = 1 + predictor._attention_decode_batching_overhead_fraction
+
+    for model_name, column in NUM_TOKENS_MODEL_COLUMNS.items():
+        if model_name not in predictions:
+            continue
+        keys, values = _get_keys_and_values(predictions[model_name])
+        np.testing.assert_array_equal(
+            predictor._num_tokens_table[keys[:, 0], column], values
+        )
+
+    keys, values = _get_keys_and_values(predictions["attn_kv_cache_save"])
+    np.testing.assert_array_equal(
+        predictor._attn_kv_cache_save_table[keys[:, 0]], values
+    )
+
+    # (batch size, kv cache size)
+    keys, values = _get_keys_and_values(predictions["attn_decode"])
+    np.testing.assert_array_equal(
+        predictor._attn_decode_table[keys[:, 0], keys[:, 1] // granularity],
+        np.where(keys[:, 0] > 1, values * decode_overhead, values),
+    )
+
+    # (kv cache size, prefill chunk size squared)
+    keys, values = _get_keys_and_values(predictions["attn_prefill"])
+    np.testing.assert_array_equal(
+        predictor._attn_prefill_table[
+            keys[:, 0] // granularity, np.rint(np.sqrt(keys[:, 1])).astype(int)
+        ],
+        values,
+    )
+
+    # the decodes are predicted at the mean kv cache size, rounded up to the granularity
+    decode_batch = _get_batches()[3]
+    kv_cache_size = sum(
+        request.num_processed_tokens for request in decode_batch.requests
+    )
+    kv_cache_size = -(-kv_cache_size // 3 // granularity) * granularity
+    execution_time = predictor.get_execution_time(decode_batch, 0)
+    assert execution_time._attention_decode_execution_time == (
+        predictions["attn_decode"][(3, kv_cache_size)] * decode_overhead
+    )
+
+
+def test_execution_time_cache_counts_hits_and_misses(create_config):
+    predictor = _get_predictor(
+        create_config, f"{PREFIX}_execution_time_cache_size", "2"
+    )
+    uncached_predictor = _get_predictor(
+        create_config, f"{PREFIX}_execution_time_cache_size", "0"
+    )
+    batches = _get_batches()
+
+    execution_time = predictor.get_execution_time(batches[0], 0)
+    predictor.get_execution_time(batches[1], 0)
+    assert (predictor.num_cache_hits, predictor.num_cache_misses) == (0, 2)
+
+    # batches with the same features share their execution time
+    assert predictor.get_execution_time(_get_batches()[0], 0) is execution_time
+    assert (predictor.num_cache_hits, predictor.num_cache_misses) == (1, 2)
+
+    # the least recently used batch is evicted
+    predictor.get_execution_time(batches[2], 0)
+    predictor.get_execution_time(batches[1], 0)
+    predictor.get_execution_time(batches[2], 0)
+    assert (predictor.num_cache_hits, predictor.num_cache_misses) == (2, 4)
+    assert predictor.cache_hit_rate == 1 / 3
+
+    for batch in batches:
+        assert _get_fields(predictor.get_execution_time(batch, 0)) == _get_fields(
+            uncached_predictor.get_execution_time(batch, 0)
+        )
+    assert uncached_predictor.num_cache_hits == 0
+    assert uncached_predictor.num_cache_misses == 0
+
+
+def test_lazy_tables_match_eager_tables(create_config):
+    predictor = _get_predictor(create_config)
+    lazy_predictor = _get_predictor(create_config, f"{PREFIX}_lazy_prediction")
+
+    # nothing but the cpu overheads is predicted up front
+    mlp_up_proj_column = NUM_TOKENS_MODEL_COLUMNS["mlp_up_proj"]
+    assert np.isnan(lazy_predictor._num_tokens_table[:, mlp_up_proj_column]).all()
+    assert np.isnan(lazy_predictor._attn_decode_table).all()
+    assert np.isnan(lazy_predictor._attn_prefill_table).all()
+
+    for batch in _get_batches():
+        assert _get_fields(lazy_predictor.get_execution_time(batch, 0)) == _get_fields(
+            predictor.get_execution_time(batch, 0)
+        )
+
+    # only the tiles around the batches are predicted
+    for table_name in ["num_tokens_table", "attn_decode_table", "attn_prefill_table"]:
+        lazy_table = getattr(lazy_predictor, f"_{table_name}")
+        table = getattr(predictor, f"_{table_name}")
+        if table_name == "num_tokens_table":
+            lazy_table = lazy_table[:, mlp_up_proj_column]
+            table = table[:, mlp_up_proj_column]
+        is_predicted = ~np.isnan(lazy_table)
+        assert 0 < is_predicted.sum() < is_predicted.size / 4
+        np.testing.assert_array_equal(lazy_table[is_predicted], table[is_predicted])
+
+
+def test_prediction_tables_are_memory_mapped_from_the_cache(create_config, monkeypatch):
+    predictor = _get_predictor(create_config)
+    predictor._compile_prediction_tables(predictor._predict_from_models())
+
+    def _predict_from_models(self):
+        raise AssertionError("the prediction tables are not loaded from the cache")
+
+    monkeypatch.setattr(
+        SklearnExecutionTimePredictor, "_predict_from_models", _predict_from_models
+    )
+    cached_predictor = _get_predictor(create_config)
+
+    for table_name in PREDICTION_TABLES:
+        table = getattr(cached_predictor, f"_{table_name}")
+        assert isinstance(table.base, np.memmap)
+        assert not table.flags.writeable
+        np.testing.assert_array_equal(table, getattr(predictor, f"_{table_name}"))
+
+    for batch in _get_batches():
+        assert _get_fields(cached_predictor.get_execution_time(batch, 0)) == (
+            _get_fields(predictor.get_execution_time(batch, 0))
+        )
+
+
+def test_models_are_indexed_by_the_profiling_data(
+    create_config, attention_input_file, monkeypatch, tmp_path
+):
+    model_hashes = _get_predictor(create_config)._model_hashes
+
+    def _load_attention_df(self, file_path: str):
+        raise AssertionError("the models are not loaded from the index")
+
+    # a copy of the profiling data has the same fingerprint
+    shutil.copy(attention_input_file, tmp_path / "attention.csv")
+    with monkeypatch.context() as m:
+        m.setattr(
+            SklearnExecutionTimePredictor, "_load_attention_df", _load_attention_df
+        )
+        predictor = _get_predictor(
+            create_config,
+            f"{PREFIX}_attention_input_file",
+            str(tmp_path / "attention.csv"),
+        )
+    assert predictor._model_hashes == model_hashes
+    input_fingerprint = predictor._get_input_fingerprint()
+
+    # modified profiling data invalidates the index, only the affected models change
+    attention_df = pd.read_csv(attention_input_file)
+    attention_df["time_stats.attn_decode.median"] *= 2
+    attention_df.to_csv(tmp_path / "attention.csv", index=False)
+    modified_predictor = _get_predictor(
+        create_config,
+        f"{PREFIX}_attention_input_file",
+        str(tmp_path / "attention.csv"),
+    )
+
+    assert modified_predictor._get_input_fingerprint() != input_fingerprint
+    assert (
+        modified_predictor._model_hashes["attn_decode"] != model_hashes["attn_decode"]
+    )
+    for model_name in ["mlp_up_proj", "attn_prefill"]:
+        assert modified_predictor._model_hashes[model_name] == model_hashes[model_name]
+    np.testing.assert_allclose(
+        modified_predictor._attn_decode_table[1:],
+        2 * predictor._attn_decode_table[1:],
+        rtol=1e-6,
+    )
+
+
+def test_parallel_training_matches_serial_training(create_config, tmp_path):
+    predictor = _get_predictor(create_config)
+    parallel_predictor = _get_predictor(
+        create_config,
+        "--metrics_config_cache_dir",
+        str(tmp_path),
+        f"{PREFIX}_num_training_processes",
+        "2",
+    )
+
+    assert parallel_predictor._model_hashes == predictor._model_hashes
+    for table_name in PREDICTION_TABLES:
+        np.testing.assert_array_equal(
+            getattr(parallel_predictor, f"_{table_name}"),
+            getattr(predictor, f"_{table_name}"),
+        )
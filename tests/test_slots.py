@@ -0,0 +1,40 @@
+import importlib
+import pkgutil
+
+import pytest
+
+import vidur.events
+from vidur.entities import Batch, BatchStage, ExecutionTime, Request
+from vidur.events import BaseEvent
+
+
+def _get_event_classes() -> list:
+    for module in pkgutil.iter_modules(vidur.events.__path__):
+        importlib.import_module(f"vidur.events.{module.name}")
+
+    event_classes = []
+    subclasses = [BaseEvent]
+    while subclasses:
+        event_class = subclasses.pop()
+        event_classes.append(event_class)
+        subclasses.extend(event_class.__subclasses__())
+    return event_classes
+
+
+@pytest.mark.parametrize(
+    "entity_class",
+    [Request, Batch, BatchStage, ExecutionTime, *_get_event_classes()],
+    ids=lambda entity_class: entity_class.__name__,
+)
+def test_instances_have_no_dict(entity_class):
+    # a single class without __slots__ in the hierarchy brings the __dict__ back
+    for base_class in entity_class.__mro__[:-1]:
+        assert "__slots__" in vars(base_class), base_class
+
+
+def test_requests_reject_unknown_attributes():
+    request = Request(0, 128, 16)
+
+    with pytest.raises(AttributeError):
+        request.unknown_attribute = 1
+    assert Request(0, 128, 16).id == request.id + 1
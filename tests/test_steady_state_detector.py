@@ -0,0 +1,107 @@
+import atexit
+import glob
+import json
+from types import SimpleNamespace
+
+import numpy as np
+
+from vidur.config import SteadyStateDetectorConfig
+from vidur.config_optimizer.config_explorer.config.config import (
+    SimulationConfig as RunConfig,
+)
+from vidur.metrics.steady_state_detector import SteadyStateDetector
+from vidur.simulator import Simulator
+from vidur.types import SimulationStopReason
+from vidur.utils.random import set_seeds
+
+
+def _run_detector(detector: SteadyStateDetector, scheduling_delays, num_in_flight):
+    # returns the stop reason and the number of samples it was found at
+    for i, scheduling_delay in enumerate(scheduling_delays):
+        detector.on_requests_completed(
+            [SimpleNamespace(scheduling_delay=scheduling_delay)]
+        )
+        if not detector.should_check():
+            continue
+
+        stop_reason = detector.check(num_in_flight(i))
+        if stop_reason is not None:
+            return stop_reason, i + 1
+
+    return None, len(scheduling_delays)
+
+
+def test_stationary_delays_reach_steady_state():
+    rng = np.random.default_rng(0)
+    detector = SteadyStateDetector(SteadyStateDetectorConfig(quantile=0.9))
+
+    stop_reason, num_samples = _run_detector(
+        detector, rng.exponential(1.0, 100000), lambda i: 10
+    )
+
+    assert stop_reason == SimulationStopReason.STEADY_STATE
+    assert 2000 <= num_samples < 100000
+    # the 0.9 quantile of the exponential distribution is ln(10)
+    assert abs(detector.to_dict()["scheduling_delay_quantile"] - np.log(10)) < 0.2
+
+
+def test_drifting_delays_do_not_reach_steady_state():
+    detector = SteadyStateDetector(SteadyStateDetectorConfig())
+
+    stop_reason, _ = _run_detector(detector, np.linspace(0, 100, 20000), lambda i: 10)
+
+    assert stop_reason is None
+
+
+def test_growing_number_of_requests_in_flight_is_unstable():
+    detector = SteadyStateDetector(SteadyStateDetectorConfig(unstable_num_checks=5))
+
+    stop_reason, num_samples = _run_detector(
+        detector, np.linspace(0, 100, 20000), lambda i: i
+    )
+
+    assert stop_reason == SimulationStopReason.UNSTABLE
+    # six checks past the minimum number of samples, well before the end
+    assert 2000 < num_samples < 4000
+
+
+def test_simulation_stops_at_steady_state(create_config, tmp_path):
+    config = create_config(
+        "--cluster_config_num_replicas",
+        "2",
+        "--poisson_request_interval_generator_config_qps",
+        "1",
+        "--synthetic_request_generator_config_num_requests",
+        "600",
+        "--steady_state_detector_config_enable",
+        "--steady_state_detector_config_min_samples",
+        "200",
+        "--steady_state_detector_config_check_interval",
+        "50",
+        "--metrics_config_output_dir",
+        str(tmp_path),
+    )
+    set_seeds(config.seed)
+    simulator = Simulator(config)
+    atexit.unregister(simulator._write_output)
+    simulator.run()
+    simulator._write_output()
+
+    (path,) = glob.glob(f"{tmp_path}/**/stop_reason.json", recursive=True)
+    with open(path) as f:
+        stop_reason = json.load(f)
+
+    assert stop_reason["stop_reason"] == str(SimulationStopReason.STEADY_STATE)
+    assert 200 <= stop_reason["num_samples"] < 600
+    assert stop_reason["num_requests_in_flight"] == len(simulator._active_requests)
+
+
+def test_steady_state_runs_do_not_share_the_run_dir_of_full_runs():
+    job_config = SimpleNamespace(get_hash=lambda: "job")
+
+    run_dirs = {
+        RunConfig("output", "cache", 1.0, 10, job_config, quantile).get_run_dir()
+        for quantile in [None, 0.9, 0.99]
+    }
+
+    assert len(run_dirs) == 3
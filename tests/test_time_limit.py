@@ -0,0 +1,87 @@
+import atexit
+import glob
+
+import pandas as pd
+
+from vidur.simulator import Simulator
+from vidur.utils.random import set_seeds
+
+
+def _read_csv(output_dir: str, file_name: str) -> pd.DataFrame:
+    (path,) = glob.glob(f"{output_dir}/**/{file_name}.csv", recursive=True)
+    return pd.read_csv(path).set_index("Request Id")
+
+
+def _run(create_config, output_dir: str, *args: str) -> Simulator:
+    config = create_config(
+        "--cluster_config_num_replicas",
+        "2",
+        "--poisson_request_interval_generator_config_qps",
+        "4",
+        "--synthetic_request_generator_config_num_requests",
+        "300",
+        "--metrics_config_output_dir",
+        output_dir,
+        *args,
+    )
+    set_seeds(config.seed)
+    simulator = Simulator(config)
+    atexit.unregister(simulator._write_output)
+    simulator.run()
+    simulator._write_output()
+    return simulator
+
+
+def test_truncated_run_censors_the_requests_in_flight(create_config, tmp_path):
+    _run(create_config, str(tmp_path / "full"))
+    request_metrics = _read_csv(str(tmp_path / "full"), "request_metrics")
+
+    simulator = _run(
+        create_config,
+        str(tmp_path / "truncated"),
+        "--time_limit",
+        "40",
+        "--truncate_at_time_limit",
+    )
+    truncated_request_metrics = _read_csv(
+        str(tmp_path / "truncated"), "request_metrics"
+    )
+    request_censoring_metrics = _read_csv(
+        str(tmp_path / "truncated"), "request_censoring_metrics"
+    )
+
+    assert simulator._time == 40
+
+    # the ids of the requests depend on the number of requests created before
+    request_metrics.index -= request_metrics.index.min()
+    first_request_id = min(
+        truncated_request_metrics.index.min(), request_censoring_metrics.index.min()
+    )
+    truncated_request_metrics.index -= first_request_id
+    request_censoring_metrics.index -= first_request_id
+
+    # every request that arrived before the limit either completed or is censored
+    completed_request_metrics = truncated_request_metrics.dropna(
+        subset=["request_e2e_time"]
+    )
+    request_ids = completed_request_metrics.index.union(request_censoring_metrics.index)
+    assert len(request_ids) == len(completed_request_metrics) + len(
+        request_censoring_metrics
+    )
+    assert list(request_ids) == list(truncated_request_metrics.index)
+    assert list(request_ids) == list(range(len(request_ids)))
+    assert len(request_censoring_metrics) > 0
+    assert len(request_ids) < len(request_metrics) == 300
+
+    # the requests that completed before the limit are not affected by it
+    pd.testing.assert_frame_equal(
+        completed_request_metrics,
+        request_metrics.loc[completed_request_metrics.index],
+        check_dtype=False,
+    )
+    assert (request_censoring_metrics["request_censored_time"] <= 40).all()
+    # the censored requests complete after the limit in the full run
+    assert (
+        request_metrics["request_e2e_time"].loc[request_censoring_metrics.index]
+        > request_censoring_metrics["request_censored_time"]
+    ).all()
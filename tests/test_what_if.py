@@ -0,0 +1,39 @@
+import atexit
+
+import pytest
+
+from vidur.simulator import Simulator
+
+
+@pytest.fixture
+def simulator(create_config, tmp_path):
+    simulator = Simulator(create_config("--metrics_config_output_dir", str(tmp_path)))
+    atexit.unregister(simulator._write_output)
+    return simulator
+
+
+def test_variant_config_can_change_scheduler_and_autoscaler(
+    simulator, create_config, tmp_path
+):
+    simulator.check_variant_config(
+        create_config(
+            "--metrics_config_output_dir",
+            str(tmp_path / "variant"),
+            "--global_scheduler_config_type",
+            "lor",
+            "--autoscaler_config_type",
+            "custom",
+        )
+    )
+
+
+def test_variant_config_can_not_change_the_replicas(simulator, create_config, tmp_path):
+    with pytest.raises(AssertionError, match="cluster_config.num_replicas"):
+        simulator.check_variant_config(
+            create_config(
+                "--metrics_config_output_dir",
+                str(tmp_path / "variant"),
+                "--cluster_config_num_replicas",
+                "3",
+            )
+        )
@@ -13,6 +13,13 @@ from vidur.autoscaler.inferline_autoscaler import NetworkEnvelope
 
 logger = init_logger(__name__)
 
+class EnvelopeConfig:
+    def __init__(self, min_window_up, look_back_up, min_window_down, look_back_down):
+        self.min_window_size_scale_up = min_window_up
+        self.look_back_time_scale_up = look_back_up
+        self.min_window_size_scale_down = min_window_down
+        self.look_back_time_scale_down = look_back_down
+
 class CustomAutoscaler(BaseAutoscaler):
     def __init__(
         self,
@@ -40,13 +47,6 @@ class CustomAutoscaler(BaseAutoscaler):
 
         self.init_service_level()
         
-        class EnvelopeConfig:
-            def __init__(self, min_window_up, look_back_up, min_window_down, look_back_down):
-                self.min_window_size_scale_up = min_window_up
-                self.look_back_time_scale_up = look_back_up
-                self.min_window_size_scale_down = min_window_down
-                self.look_back_time_scale_down = look_back_down
-        
         envelope_config = EnvelopeConfig(
             self._min_window_up,
             self._look_back_up,
@@ -0,0 +1,163 @@
+import argparse
+import gc
+import time
+import tracemalloc
+
+import pandas as pd
+
+from vidur.entities import Batch, BatchStage, ExecutionTime, Request
+from vidur.events.batch_end_event import BatchEndEvent
+from vidur.events.batch_stage_arrival_event import BatchStageArrivalEvent
+from vidur.events.batch_stage_end_event import BatchStageEndEvent
+from vidur.events.global_schedule_event import GlobalScheduleEvent
+from vidur.events.replica_schedule_event import ReplicaScheduleEvent
+from vidur.events.replica_stage_schedule_event import ReplicaStageScheduleEvent
+from vidur.events.request_arrival_event import RequestArrivalEvent
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Entity Benchmark")
+    parser.add_argument(
+        "--trace_file",
+        type=str,
+        default="data/generated_traces/Synthetic_Trace1_1hr.csv",
+        help="Trace whose request lifecycle is replayed",
+    )
+    parser.add_argument(
+        "--batch_size",
+        type=int,
+        default=16,
+        help="Number of requests batched together in every iteration",
+    )
+    parser.add_argument(
+        "--num_instances",
+        type=int,
+        default=100000,
+        help="Number of instances per class used to measure the memory footprint",
+    )
+    return parser.parse_args()
+
+
+def create_execution_time(time: float) -> ExecutionTime:
+    # num_layers_per_pipeline_stage followed by the 19 component times
+    return ExecutionTime(1, *([time] * 19))
+
+
+def replay_trace(trace_df: pd.DataFrame, batch_size: int) -> int:
+    """
+    Creates and touches the entities and events that a single replica simulation of
+    the trace goes through, without any scheduling or execution time prediction. The
+    requests are batched in arrival order and every batch is run until all of its
+    requests have completed. Returns the number of objects created.
+    """
+    num_objects = 0
+    current_time = 0.0
+
+    requests = [
+        Request(arrived_at, num_prefill_tokens, num_decode_tokens)
+        for arrived_at, num_prefill_tokens, num_decode_tokens in trace_df[
+            ["arrived_at", "num_prefill_tokens", "num_decode_tokens"]
+        ].itertuples(index=False, name=None)
+    ]
+    num_objects += len(requests)
+
+    for start in range(0, len(requests), batch_size):
+        batch_requests = requests[start : start + batch_size]
+        for request in batch_requests:
+            current_time = max(current_time, request.arrived_at)
+            RequestArrivalEvent(request.arrived_at, request)
+            GlobalScheduleEvent(request.arrived_at)
+        num_objects += 2 * len(batch_requests)
+
+        while batch_requests:
+            num_tokens = [
+                request.num_prefill_tokens if not request.is_prefill_complete else 1
+                for request in batch_requests
+            ]
+            execution_time = create_execution_time(1e-4)
+            batch = Batch(0, batch_requests, num_tokens)
+            batch_stage = BatchStage(
+                batch.id,
+                0,
+                0,
+                execution_time.total_time,
+                execution_time.model_time,
+                batch_requests,
+                num_tokens,
+            )
+
+            ReplicaScheduleEvent(current_time, 0)
+            batch.on_schedule(current_time)
+            BatchStageArrivalEvent(current_time, 0, 0, batch)
+            ReplicaStageScheduleEvent(current_time, 0, 0)
+            batch_stage.on_schedule(current_time)
+            current_time += batch_stage.execution_time
+            BatchStageEndEvent(current_time, 0, 0, True, batch, batch_stage)
+            batch_stage.on_stage_end(current_time)
+            BatchEndEvent(current_time, 0, batch)
+            batch.on_batch_end(current_time)
+            num_objects += 9
+
+            batch_requests = [
+                request for request in batch_requests if not request.completed
+            ]
+
+    return num_objects
+
+
+def measure_instance_size(create, num_instances: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    start_size, _ = tracemalloc.get_traced_memory()
+    instances = [create(i) for i in range(num_instances)]
+    end_size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # exclude the list holding the instances
+    return (end_size - start_size) / num_instances - 8
+
+
+def main():
+    args = parse_args()
+
+    trace_df = pd.read_csv(args.trace_file)
+
+    gc.collect()
+    start_time = time.perf_counter()
+    num_objects = replay_trace(trace_df, args.batch_size)
+    elapsed_time = time.perf_counter() - start_time
+
+    gc.collect()
+    tracemalloc.start()
+    replay_trace(trace_df, args.batch_size)
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(
+        f"Trace replay: {len(trace_df)} requests, {num_objects} objects in "
+        f"{elapsed_time:.2f}s ({num_objects / elapsed_time:.0f} objects/s), "
+        f"peak memory {peak_memory / 2**20:.1f} MiB"
+    )
+
+    request = Request(0.0, 256, 1)
+    batch = Batch(0, [request], [256])
+    instance_creators = {
+        "Request": lambda i: Request(float(i), 256, 1),
+        "Batch": lambda i: Batch(0, [request], [256]),
+        "BatchStage": lambda i: BatchStage(i, 0, 0, 1.0, 1.0, [request], [256]),
+        "ExecutionTime": lambda i: create_execution_time(float(i)),
+        "BatchEndEvent": lambda i: BatchEndEvent(float(i), 0, batch),
+        "GlobalScheduleEvent": lambda i: GlobalScheduleEvent(float(i)),
+    }
+
+    results = [
+        {
+            "class": class_name,
+            "bytes_per_instance": measure_instance_size(create, args.num_instances),
+        }
+        for class_name, create in instance_creators.items()
+    ]
+    print(pd.DataFrame(results).round(1).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+import argparse
+import random
+import time
+
+import pandas as pd
+
+from vidur.config import CalendarEventQueueConfig, HeapEventQueueConfig
+from vidur.event_queue import EventQueueRegistry
+from vidur.events.global_schedule_event import GlobalScheduleEvent
+from vidur.types import EventQueueType
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Event Queue Benchmark")
+    parser.add_argument(
+        "--num_pending_events",
+        type=int,
+        nargs="+",
+        default=[100, 1000, 10000, 100000],
+        help="Number of events held in the queue during the benchmark",
+    )
+    parser.add_argument(
+        "--num_operations",
+        type=int,
+        default=500000,
+        help="Number of get/put pairs to perform per run",
+    )
+    parser.add_argument(
+        "--mean_event_delay",
+        type=float,
+        default=0.05,
+        help="Mean delay in seconds between an event and the event it schedules",
+    )
+    parser.add_argument(
+        "--bucket_width",
+        type=float,
+        default=CalendarEventQueueConfig.bucket_width,
+        help="Bucket width of the calendar queue",
+    )
+    parser.add_argument(
+        "--num_repeats",
+        type=int,
+        default=3,
+        help="Number of repetitions per run, the best one is reported",
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args()
+
+
+def run_hold_benchmark(
+    event_queue_config,
+    num_pending_events: int,
+    num_operations: int,
+    mean_event_delay: float,
+    seed: int,
+) -> float:
+    """
+    Classic hold model: pop the earliest event and schedule a successor at a random
+    delay. Roughly a fifth of the successors share the timestamp of their parent,
+    mimicking the same-time scheduling events the simulator generates.
+    """
+    rng = random.Random(seed)
+    delays = [
+        0.0 if rng.random() < 0.2 else rng.expovariate(1 / mean_event_delay)
+        for _ in range(num_operations)
+    ]
+
+    event_queue = EventQueueRegistry.get(
+        event_queue_config.get_type(), event_queue_config
+    )
+    for _ in range(num_pending_events):
+        event_queue.put(GlobalScheduleEvent(rng.expovariate(1 / mean_event_delay)))
+
+    last_time = 0.0
+    start_time = time.perf_counter()
+    for delay in delays:
+        event = event_queue.get()
+        assert event._time >= last_time
+        last_time = event._time
+        # reuse the event object so that only the queue operations are measured
+        event._time += delay
+        event._priority_number = event._get_priority_number()
+        event_queue.put(event)
+    elapsed_time = time.perf_counter() - start_time
+
+    return num_operations / elapsed_time
+
+
+def main():
+    args = parse_args()
+
+    event_queue_configs = {
+        EventQueueType.HEAP: HeapEventQueueConfig(),
+        EventQueueType.CALENDAR: CalendarEventQueueConfig(
+            bucket_width=args.bucket_width
+        ),
+    }
+
+    results = []
+    for num_pending_events in args.num_pending_events:
+        result = {"num_pending_events": num_pending_events}
+        for event_queue_type, config in event_queue_configs.items():
+            result[f"{event_queue_type}_events_per_sec"] = max(
+                run_hold_benchmark(
+                    config,
+                    num_pending_events,
+                    args.num_operations,
+                    args.mean_event_delay,
+                    args.seed,
+                )
+                for _ in range(args.num_repeats)
+            )
+        result["calendar_speedup"] = (
+            result["calendar_events_per_sec"] / result["heap_events_per_sec"]
+        )
+        results.append(result)
+
+    print(pd.DataFrame(results).round(2).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+import argparse
+import random
+import time
+
+import pandas as pd
+
+from vidur.config import (
+    BaseReplicaSchedulerConfig,
+    ReplicaConfig,
+    SyntheticRequestGeneratorConfig,
+)
+from vidur.entities import Replica, Request
+from vidur.scheduler.replica_scheduler.replica_scheduler_registry import (
+    ReplicaSchedulerRegistry,
+)
+from vidur.types import ReplicaSchedulerType
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Replica Scheduler Benchmark")
+    parser.add_argument(
+        "--num_queued_requests",
+        type=int,
+        nargs="+",
+        default=[1000, 10000, 100000],
+        help="Number of requests waiting in the replica queue at the start",
+    )
+    parser.add_argument(
+        "--replica_scheduler_types",
+        type=str,
+        nargs="+",
+        default=["vllm", "sarathi", "orca"],
+        help="Replica schedulers to benchmark",
+    )
+    parser.add_argument(
+        "--num_batches",
+        type=int,
+        default=2000,
+        help="Number of batches to form per run",
+    )
+    parser.add_argument(
+        "--num_repeats",
+        type=int,
+        default=3,
+        help="Number of repetitions per run, the best one is reported",
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    return parser.parse_args()
+
+
+class ListRequestQueue(list):
+    """
+    The list based request queue the replica schedulers used before, where removing
+    the head and putting restarted requests back in front copy the whole queue.
+    """
+
+    def popleft(self) -> Request:
+        return self.pop(0)
+
+    def appendleft(self, request: Request) -> None:
+        self.insert(0, request)
+
+
+def run_scheduler_benchmark(
+    replica_scheduler_type: ReplicaSchedulerType,
+    num_queued_requests: int,
+    num_batches: int,
+    seed: int,
+    use_list_queue: bool,
+) -> float:
+    """
+    Fills the request queue of a single stage replica and forms batches while the
+    queue is still long, i.e. the replica is overloaded. Every batch completes right
+    away, so running requests are fed back as preempted requests. The requests are
+    short so that most batches admit new requests from the queue. Only the batch
+    formation is timed. Returns the number of batches formed per second.
+    """
+    rng = random.Random(seed)
+
+    replica_config = ReplicaConfig()
+    request_generator_config = SyntheticRequestGeneratorConfig()
+    replica_scheduler_config = BaseReplicaSchedulerConfig.create_from_type(
+        replica_scheduler_type
+    )
+    replica_scheduler = ReplicaSchedulerRegistry.get(
+        replica_scheduler_type,
+        replica_config=replica_config,
+        replica_scheduler_config=replica_scheduler_config,
+        request_generator_config=request_generator_config,
+        replica=Replica(replica_config, request_generator_config),
+        num_stages=1,
+        # batches are not executed, so no execution time is predicted
+        execution_time_predictor=None,
+    )
+    if use_list_queue:
+        replica_scheduler._request_queue = ListRequestQueue()
+
+    for i in range(num_queued_requests):
+        replica_scheduler.add_request(
+            Request(i * 1e-3, rng.randint(16, 256), rng.randint(2, 8))
+        )
+
+    current_time = num_queued_requests * 1e-3
+    num_formed_batches = 0
+    elapsed_time = 0.0
+    while num_formed_batches < num_batches:
+        start_time = time.perf_counter()
+        batches = replica_scheduler.on_schedule()
+        elapsed_time += time.perf_counter() - start_time
+
+        if not batches:
+            break
+
+        for batch in batches:
+            current_time += 1e-2
+            batch.on_schedule(current_time)
+            batch.on_batch_end(current_time)
+            replica_scheduler.on_batch_end(batch)
+        num_formed_batches += len(batches)
+
+    return num_formed_batches / elapsed_time
+
+
+def main():
+    args = parse_args()
+
+    results = []
+    for replica_scheduler_type in args.replica_scheduler_types:
+        replica_scheduler_type = ReplicaSchedulerType.from_str(replica_scheduler_type)
+        for num_queued_requests in args.num_queued_requests:
+            result = {
+                "scheduler": str(replica_scheduler_type),
+                "num_queued_requests": num_queued_requests,
+            }
+            for queue_name, use_list_queue in (("list", True), ("deque", False)):
+                result[f"{queue_name}_batches_per_sec"] = max(
+                    run_scheduler_benchmark(
+                        replica_scheduler_type,
+                        num_queued_requests,
+                        args.num_batches,
+                        args.seed,
+                        use_list_queue,
+                    )
+                    for _ in range(args.num_repeats)
+                )
+            result["deque_speedup"] = (
+                result["deque_batches_per_sec"] / result["list_batches_per_sec"]
+            )
+            results.append(result)
+
+    print(pd.DataFrame(results).round(2).to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -13,8 +13,10 @@ from vidur.config.node_sku_config import BaseNodeSKUConfig
 from vidur.config.utils import dataclass_to_dict
 from vidur.logger import init_logger
 from vidur.types import (
+    EventQueueType,
     ExecutionTimePredictorType,
     GlobalSchedulerType,
+    PreemptionMode,
     ReplicaSchedulerType,
     RequestGeneratorType,
     RequestIntervalGeneratorType,
@@ -253,6 +255,13 @@ class TraceRequestGeneratorConfig(BaseRequestGeneratorConfig):
         return RequestGeneratorType.TRACE_REPLAY
 
 
+def _validate_preemption_mode(preemption_mode: str) -> None:
+    preemption_modes = [str(mode) for mode in PreemptionMode]
+    assert (
+        preemption_mode in preemption_modes
+    ), f"Invalid preemption mode {preemption_mode}, expected one of {preemption_modes}"
+
+
 @dataclass
 class BaseReplicaSchedulerConfig(BasePolyConfig):
     batch_size_cap: int = field(
@@ -279,6 +288,27 @@ class VllmSchedulerConfig(BaseReplicaSchedulerConfig):
         default=4096,
         metadata={"help": "Maximum tokens in batch for vLLM."},
     )
+    preemption_mode: str = field(
+        default="recompute",
+        metadata={
+            "help": "How vLLM preempts requests on memory pressure: recompute or swap (to CPU memory)."
+        },
+    )
+    swap_space_gb: float = field(
+        default=4,
+        metadata={
+            "help": "CPU memory per device for swapped out KV cache blocks in GB (1e9 bytes, like the PCIe bandwidth of the device)."
+        },
+    )
+    enable_prefix_caching: bool = field(
+        default=False,
+        metadata={
+            "help": "Cache the KV cache blocks of the prompt prefixes of requests with a prefix id, requests with the same prefix id reuse them instead of recomputing the prefix."
+        },
+    )
+
+    def __post_init__(self):
+        _validate_preemption_mode(self.preemption_mode)
 
     @staticmethod
     def get_type():
@@ -321,6 +351,27 @@ class SarathiSchedulerConfig(BaseReplicaSchedulerConfig):
         default=512,
         metadata={"help": "Chunk size for Sarathi."},
     )
+    preemption_mode: str = field(
+        default="recompute",
+        metadata={
+            "help": "How Sarathi preempts requests on memory pressure: recompute or swap (to CPU memory)."
+        },
+    )
+    swap_space_gb: float = field(
+        default=4,
+        metadata={
+            "help": "CPU memory per device for swapped out KV cache blocks in GB (1e9 bytes, like the PCIe bandwidth of the device)."
+        },
+    )
+    enable_prefix_caching: bool = field(
+        default=False,
+        metadata={
+            "help": "Cache the KV cache blocks of the prompt prefixes of requests with a prefix id, requests with the same prefix id reuse them instead of recomputing the prefix."
+        },
+    )
+
+    def __post_init__(self):
+        _validate_preemption_mode(self.preemption_mode)
 
     @staticmethod
     def get_type():
@@ -423,6 +474,12 @@ class MetricsConfig:
         default=True,
         metadata={"help": "Whether to store autoscaling metrics."},
     )
+    use_request_table: bool = field(
+        default=False,
+        metadata={
+            "help": "Whether to collect request metrics in a columnar request table."
+        },
+    )
 
     def __post_init__(self):
         self.output_dir = (
@@ -431,6 +488,58 @@ class MetricsConfig:
         os.makedirs(self.output_dir, exist_ok=True)
 
 
+@dataclass
+class SteadyStateDetectorConfig:
+    """Steady state detection configuration."""
+
+    enable: bool = field(
+        default=False,
+        metadata={
+            "help": "Whether to stop the simulation once the scheduling delay quantile has converged or the system is unstable."
+        },
+    )
+    quantile: float = field(
+        default=0.99,
+        metadata={"help": "Scheduling delay quantile to track."},
+    )
+    confidence: float = field(
+        default=0.95,
+        metadata={"help": "Confidence level of the quantile confidence interval."},
+    )
+    num_batches: int = field(
+        default=10,
+        metadata={
+            "help": "Number of contiguous batches the samples are split into to estimate the confidence interval."
+        },
+    )
+    relative_tolerance: float = field(
+        default=0.05,
+        metadata={
+            "help": "Maximum half-width of the confidence interval relative to the quantile estimate."
+        },
+    )
+    absolute_tolerance: float = field(
+        default=0.01,
+        metadata={
+            "help": "Maximum half-width of the confidence interval in seconds, used for near zero scheduling delays."
+        },
+    )
+    min_samples: int = field(
+        default=2000,
+        metadata={"help": "Minimum number of completed requests before stopping."},
+    )
+    check_interval: int = field(
+        default=100,
+        metadata={"help": "Minimum number of completed requests between two checks."},
+    )
+    unstable_num_checks: int = field(
+        default=10,
+        metadata={
+            "help": "Number of consecutive checks with a growing number of in-flight requests after which the system is deemed unstable."
+        },
+    )
+
+
 @dataclass
 class ReplicaConfig:
     model_name: str = field(
@@ -556,10 +665,34 @@ class BaseExecutionTimePredictorConfig(BasePolyConfig):
         default=-1,
         metadata={"help": "Number of training job threads."},
     )
+    num_training_processes: int = field(
+        default=1,
+        metadata={
+            "help": "Number of processes training models in parallel. With more than one, every grid search runs single threaded."
+        },
+    )
     skip_cpu_overhead_modeling: bool = field(
         default=True,
         metadata={"help": "Whether to skip CPU overhead modeling."},
     )
+    per_request_decode_attention: bool = field(
+        default=False,
+        metadata={
+            "help": "Predict the decode attention time of a batch as the mean of the predictions one standard deviation below and above the mean kv cache size of its decodes, instead of the prediction for the mean kv cache size. Batches with skewed kv cache sizes no longer collapse to their mean."
+        },
+    )
+    lazy_prediction: bool = field(
+        default=False,
+        metadata={
+            "help": "Predict execution times in tiles on first use instead of predicting the full grid at startup."
+        },
+    )
+    execution_time_cache_size: int = field(
+        default=4096,
+        metadata={
+            "help": "Number of execution times cached by batch features (LRU). 0 disables the cache."
+        },
+    )
 
 
 @dataclass
@@ -606,12 +739,64 @@ class RandomForrestExecutionTimePredictorConfig(BaseExecutionTimePredictorConfig
         return ExecutionTimePredictorType.RANDOM_FORREST
 
 
+@dataclass
+class RooflineExecutionTimePredictorConfig(BaseExecutionTimePredictorConfig):
+    compute_efficiency: float = field(
+        default=0.7,
+        metadata={
+            "help": "Fraction of the peak FLOPs attained by the kernels, used for the operations without calibration factor."
+        },
+    )
+    memory_bandwidth_efficiency: float = field(
+        default=0.8,
+        metadata={
+            "help": "Fraction of the peak memory bandwidth attained by the kernels, used for the operations without calibration factor."
+        },
+    )
+    interconnect_bandwidth_gbps: float = field(
+        default=150,
+        metadata={
+            "help": "Bandwidth of the links between the devices of a node in GB/s."
+        },
+    )
+    inter_node_bandwidth_gbps: float = field(
+        default=25,
+        metadata={"help": "Bandwidth of the links between nodes in GB/s."},
+    )
+    communication_latency_ms: float = field(
+        default=0.01,
+        metadata={"help": "Latency of a collective or send/recv in ms."},
+    )
+    calibrate: bool = field(
+        default=False,
+        metadata={
+            "help": "Whether to fit per operation calibration factors to the profiling data of the device."
+        },
+    )
+    calibration_data_dir: str = field(
+        default="./data/profiling/compute/{DEVICE}",
+        metadata={
+            "help": "Directory with the compute (mlp.csv) and attention (attention.csv) profiling data the calibration factors are fitted to."
+        },
+    )
+
+    @staticmethod
+    def get_type():
+        return ExecutionTimePredictorType.ROOFLINE
+
+
 @dataclass
 class ClusterConfig:
     num_replicas: int = field(
         default=1,
         metadata={"help": "Number of initial replicas."},
     )
+    num_prefill_replicas: int = field(
+        default=0,
+        metadata={
+            "help": "Number of the initial replicas that form the prefill pool of a disaggregated (Splitwise-style) cluster, the other replicas form the decode pool. Requests hand their KV cache off to a decode replica once their prefill completes. 0 runs prefill and decode on every replica."
+        },
+    )
     replica_config: ReplicaConfig = field(default_factory=ReplicaConfig)
     global_scheduler_config: BaseGlobalSchedulerConfig = field(
         default_factory=RoundRobinGlobalSchedulerConfig,
@@ -622,6 +807,20 @@ class ClusterConfig:
         metadata={"help": "Replica scheduler config."},
     )
 
+    def __post_init__(self):
+        self.is_disaggregated = self.num_prefill_replicas > 0
+        if not self.is_disaggregated:
+            return
+
+        assert (
+            self.num_prefill_replicas < self.num_replicas
+        ), "A disaggregated cluster needs at least one decode replica"
+        # the decode replicas receive the kv cache of a request block by block
+        assert self.replica_scheduler_config.get_type() in (
+            ReplicaSchedulerType.VLLM,
+            ReplicaSchedulerType.SARATHI,
+        ), "Disaggregated clusters are only supported by the vllm and sarathi schedulers"
+
 
 @dataclass
 class BaseAutoscalerConfig(BasePolyConfig):
@@ -705,6 +904,30 @@ class CustomAutoscalerConfig(InferlineAutoscalerConfig):
         return AutoscalerType.CUSTOM
 
 
+@dataclass
+class BaseEventQueueConfig(BasePolyConfig):
+    pass
+
+
+@dataclass
+class HeapEventQueueConfig(BaseEventQueueConfig):
+    @staticmethod
+    def get_type():
+        return EventQueueType.HEAP
+
+
+@dataclass
+class CalendarEventQueueConfig(BaseEventQueueConfig):
+    bucket_width: float = field(
+        default=0.001,
+        metadata={"help": "Width of a calendar queue bucket in seconds."},
+    )
+
+    @staticmethod
+    def get_type():
+        return EventQueueType.CALENDAR
+
+
 @dataclass
 class SimulationConfig(ABC):
     seed: int = field(
@@ -719,6 +942,28 @@ class SimulationConfig(ABC):
         default=0,  # in seconds, 0 is no limit
         metadata={"help": "Time limit for simulation in seconds. 0 means no limit."},
     )
+    truncate_at_time_limit: bool = field(
+        default=False,
+        metadata={
+            "help": "Whether to stop exactly at the time limit without generating the requests arriving after it. Requests still in flight are reported as censored."
+        },
+    )
+    checkpoint_interval: float = field(
+        default=0,  # in seconds, 0 is no checkpointing
+        metadata={
+            "help": "Simulated time in seconds between checkpoints of the simulator state. 0 means no checkpointing."
+        },
+    )
+    resume_from: Optional[str] = field(
+        default=None,
+        metadata={"help": "Path of a checkpoint to resume the simulation from."},
+    )
+    num_shards: int = field(
+        default=0,
+        metadata={
+            "help": "Number of worker processes the replicas are sharded across. 0 or 1 simulates all replicas in the main process."
+        },
+    )
     cluster_config: ClusterConfig = field(
         default_factory=ClusterConfig,
         metadata={"help": "Cluster config."},
@@ -739,13 +984,21 @@ class SimulationConfig(ABC):
         default_factory=InferlineAutoscalerConfig,
         metadata={"help": "Autoscaler config."},
     )
+    event_queue_config: BaseEventQueueConfig = field(
+        default_factory=HeapEventQueueConfig,
+        metadata={"help": "Event queue config."},
+    )
+    steady_state_detector_config: SteadyStateDetectorConfig = field(
+        default_factory=SteadyStateDetectorConfig,
+        metadata={"help": "Steady state detector config."},
+    )
 
     def __post_init__(self):
         self.write_config_to_file()
 
     @classmethod
-    def create_from_cli_args(cls):
-        flat_config = create_flat_dataclass(cls).create_from_cli_args()
+    def create_from_cli_args(cls, args: Optional[List[str]] = None):
+        flat_config = create_flat_dataclass(cls).create_from_cli_args(args)
         instance = flat_config.reconstruct_original_dataclass()
         instance.__flat_config__ = flat_config
         return instance
@@ -757,6 +1010,21 @@ class SimulationConfig(ABC):
 
         return self.__flat_config__.__dict__
 
+    def __getstate__(self):
+        # the flat config is an instance of a dynamically created class, so it is
+        # pickled as its field values and rebuilt on load
+        state = self.__dict__.copy()
+        if "__flat_config__" in state:
+            state["__flat_config__"] = state["__flat_config__"].__dict__
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if "__flat_config__" in state:
+            self.__flat_config__ = create_flat_dataclass(type(self))(
+                **state["__flat_config__"]
+            )
+
     def write_config_to_file(self):
         config_dict = dataclass_to_dict(self)
         with open(f"{self.metrics_config.output_dir}/config.json", "w") as f:
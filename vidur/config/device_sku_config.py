@@ -11,11 +11,15 @@ logger = init_logger(__name__)
 class BaseDeviceSKUConfig(BaseFixedConfig):
     fp16_tflops: int
     total_memory_gb: int
+    memory_bandwidth_gbps: int
+    pcie_bandwidth_gbps: int
 
 @dataclass
 class A40DeviceSKUConfig(BaseDeviceSKUConfig):
     fp16_tflops: int = 150
     total_memory_gb: int = 45
+    memory_bandwidth_gbps: int = 696
+    pcie_bandwidth_gbps: int = 32
 
     @staticmethod
     def get_type():
@@ -26,6 +30,8 @@ class A40DeviceSKUConfig(BaseDeviceSKUConfig):
 class A100DeviceSKUConfig(BaseDeviceSKUConfig):
     fp16_tflops: int = 312
     total_memory_gb: int = 80
+    memory_bandwidth_gbps: int = 2039
+    pcie_bandwidth_gbps: int = 32
 
     @staticmethod
     def get_type():
@@ -36,6 +42,8 @@ class A100DeviceSKUConfig(BaseDeviceSKUConfig):
 class H100DeviceSKUConfig(BaseDeviceSKUConfig):
     fp16_tflops: int = 1000
     total_memory_gb: int = 80
+    memory_bandwidth_gbps: int = 3350
+    pcie_bandwidth_gbps: int = 64
 
     @staticmethod
     def get_type():
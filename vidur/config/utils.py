@@ -1,5 +1,5 @@
 from dataclasses import fields, is_dataclass
-from typing import Union, get_args, get_origin
+from typing import List, Union, get_args, get_origin
 
 primitive_types = {int, str, float, bool, type(None)}
 
@@ -85,3 +85,16 @@ def dataclass_to_dict(obj):
         return data
     else:
         return obj
+
+
+def get_dict_diff(left: dict, right: dict, prefix: str = "") -> List[str]:
+    # dotted paths of the (nested) keys whose values differ
+    diff = []
+    for key in sorted(set(left) | set(right), key=str):
+        path = f"{prefix}{key}"
+        left_value, right_value = left.get(key), right.get(key)
+        if isinstance(left_value, dict) and isinstance(right_value, dict):
+            diff.extend(get_dict_diff(left_value, right_value, f"{path}."))
+        elif left_value != right_value:
+            diff.append(path)
+    return diff
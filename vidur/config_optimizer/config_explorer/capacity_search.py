@@ -1,5 +1,6 @@
 import argparse
 import glob
+import json
 import os
 import platform
 import shlex
@@ -14,6 +15,7 @@ from vidur.config_optimizer.config_explorer.ray_utils import (
     get_ip,
 )
 from vidur.logger import init_logger
+from vidur.types import SimulationStopReason
 
 logger = init_logger(__name__)
 
@@ -79,6 +81,19 @@ class CapacitySearch:
             scheduling_delay <= self.args.scheduling_delay_slo_value
         )
 
+        # runs stopped by the steady state detector record why they stopped, the
+        # delays of the completed requests of an unstable run understate the queueing
+        simulation_output_dir = os.path.dirname(os.path.dirname(result_file))
+        stop_reason_file = f"{simulation_output_dir}/stop_reason.json"
+        if os.path.exists(stop_reason_file):
+            with open(stop_reason_file) as f:
+                stop_reason = json.load(f)["stop_reason"]
+            if stop_reason == str(SimulationStopReason.UNSTABLE):
+                is_under_scheduling_delay_sla = False
+            logger.info(
+                f"{simulator_config.to_human_readable_name()} - Stop reason: {stop_reason}",
+            )
+
         logger.info(
             f"{simulator_config.to_human_readable_name()} - Scheduling delay (P{self.args.scheduling_delay_slo_quantile}): {scheduling_delay}",
         )
@@ -91,6 +106,11 @@ class CapacitySearch:
             qps=qps,
             time_limit=self.args.time_limit,
             job_config=self.job_config,
+            steady_state_quantile=(
+                self.args.scheduling_delay_slo_quantile
+                if self.args.steady_state_detection
+                else None
+            ),
         )
         run_dir = simulator_config.get_run_dir()
         os.makedirs(run_dir, exist_ok=True)
@@ -235,6 +235,7 @@ class SimulationConfig:
     qps: float
     time_limit: int
     job_config: JobConfig
+    steady_state_quantile: Optional[float] = None
 
     def to_config_dict(self):
         return {
@@ -244,6 +245,7 @@ class SimulationConfig:
             "poisson_request_interval_generator_config_qps": self.qps,
             "gamma_request_interval_generator_config_qps": self.qps,
             "time_limit": self.time_limit * 60,  # to seconds
+            "truncate_at_time_limit": None,
             "no-metrics_config_save_table_to_wandb": None,
             "no-metrics_config_store_plots": None,
             "no-metrics_config_store_operation_metrics": None,
@@ -251,6 +253,16 @@ class SimulationConfig:
             "no-metrics_config_enable_chrome_trace": None,
             "linear_regression_execution_time_predictor_config_skip_cpu_overhead_modeling": None,
             "random_forrest_execution_time_predictor_config_skip_cpu_overhead_modeling": None,
+            **self._get_steady_state_config_dict(),
+        }
+
+    def _get_steady_state_config_dict(self):
+        if self.steady_state_quantile is None:
+            return {}
+
+        return {
+            "steady_state_detector_config_enable": None,
+            "steady_state_detector_config_quantile": self.steady_state_quantile,
         }
 
     def to_args(self):
@@ -268,4 +280,10 @@ class SimulationConfig:
         return f"{self.job_config.get_human_readable_name()}, QPS: {self.qps}"
 
     def get_run_dir(self):
-        return f"{self.output_dir}/runs/{self.job_config.get_hash()}/{self.qps}"
+        run_dir = f"{self.output_dir}/runs/{self.job_config.get_hash()}/{self.qps}"
+        # the results of runs stopped by the steady state detector are not
+        # interchangeable with full runs or with runs tracking another quantile
+        if self.steady_state_quantile is None:
+            return run_dir
+
+        return f"{run_dir}_steady_state_p{self.steady_state_quantile}"
@@ -38,6 +38,11 @@ def get_args():
     parser.add_argument(
         "--time-limit", type=int, default=30, help="Time limit in minutes"
     )
+    parser.add_argument(
+        "--steady-state-detection",
+        action="store_true",
+        help="Stop each simulation once the scheduling delay quantile has converged or the system is unstable",
+    )
     parser.add_argument("--debug", action="store_true")
     parser.add_argument("--skip-cache-warmup", action="store_true")
 
@@ -1,8 +1,19 @@
 from vidur.entities.batch import Batch
+from vidur.entities.batch_features import BatchFeatures
 from vidur.entities.batch_stage import BatchStage
 from vidur.entities.cluster import Cluster
 from vidur.entities.execution_time import ExecutionTime
 from vidur.entities.replica import Replica
 from vidur.entities.request import Request
+from vidur.entities.request_table import RequestTable
 
-__all__ = [Request, Replica, Batch, Cluster, BatchStage, ExecutionTime]
+__all__ = [
+    Request,
+    RequestTable,
+    Replica,
+    Batch,
+    BatchFeatures,
+    Cluster,
+    BatchStage,
+    ExecutionTime,
+]
@@ -1,10 +1,14 @@
 class BaseEntity:
-    _id = -1
+    # entities are created in large numbers, so subclasses declare their attributes
+    # in __slots__ to avoid a per-instance __dict__
+    __slots__ = ("_id",)
+
+    _next_id = -1
 
     @classmethod
     def generate_id(cls):
-        cls._id += 1
-        return cls._id
+        cls._next_id += 1
+        return cls._next_id
 
     @property
     def id(self) -> int:
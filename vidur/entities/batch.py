@@ -1,6 +1,7 @@
-from typing import List
+from typing import List, Optional
 
 from vidur.entities.base_entity import BaseEntity
+from vidur.entities.batch_features import BatchFeatures
 from vidur.entities.request import Request
 from vidur.logger import init_logger
 
@@ -27,24 +28,44 @@ def check_completed(func):
 
 
 class Batch(BaseEntity):
+    __slots__ = (
+        "_replica_id",
+        "_requests",
+        "_num_tokens",
+        "_features",
+        "_kv_cache_swap_time",
+        "_total_num_tokens",
+        "_num_prefill_tokens",
+        "_total_num_tokens_rounded",
+        "_scheduled_at",
+        "_completed_at",
+        "_scheduled",
+        "_completed",
+        "_decode_params",
+        "_prefill_params",
+    )
+
     def __init__(
         self,
         replica_id: int,
         requests: List[Request],
         num_tokens: List[int],
+        features: Optional[BatchFeatures] = None,
+        kv_cache_swap_time: float = 0.0,
     ) -> None:
         self._id = Batch.generate_id()
         self._replica_id = replica_id
 
         self._requests = requests
         self._num_tokens = num_tokens
-        self._total_num_tokens = sum(num_tokens)
-        self._num_prefill_tokens = sum(
-            [
-                (t if not r.is_prefill_complete else 0)
-                for r, t in zip(self.requests, self._num_tokens)
-            ]
-        )
+        if features is None:
+            features = BatchFeatures.from_requests(requests, num_tokens)
+        self._features = features
+        # time to move kv cache blocks between the devices and CPU memory before the
+        # batch can run, every pipeline stage moves the blocks of its layers
+        self._kv_cache_swap_time = kv_cache_swap_time
+        self._total_num_tokens = features.total_num_tokens
+        self._num_prefill_tokens = features.num_prefill_tokens
 
         self._total_num_tokens_rounded = (self._total_num_tokens + 7) // 8 * 8
 
@@ -53,6 +74,10 @@ class Batch(BaseEntity):
         self._scheduled = False
         self._completed = False
 
+        # attention parameters derived by the execution time predictor
+        self._decode_params = None
+        self._prefill_params = None
+
     @property
     def replica_id(self) -> int:
         return self._replica_id
@@ -65,6 +90,14 @@ class Batch(BaseEntity):
     def num_tokens(self) -> List[int]:
         return self._num_tokens
 
+    @property
+    def features(self) -> BatchFeatures:
+        return self._features
+
+    @property
+    def kv_cache_swap_time(self) -> float:
+        return self._kv_cache_swap_time
+
     @property
     def total_num_tokens(self) -> int:
         return self._total_num_tokens
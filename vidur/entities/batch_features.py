@@ -0,0 +1,63 @@
+from typing import List, Tuple
+
+from vidur.entities.request import Request
+
+
+class BatchFeatures:
+    """
+    Token and kv cache statistics of a batch, accumulated by the replica scheduler
+    while it adds the requests to the batch. They are read by the execution time
+    predictors, the MFU calculator and the metrics instead of iterating over the
+    requests of the batch again. Decodes process a single token.
+    """
+
+    __slots__ = (
+        "total_num_tokens",
+        "num_prefill_tokens",
+        "num_decodes",
+        "decode_kv_cache_size_sum",
+        "decode_kv_cache_size_sq_sum",
+        "prefill_chunks",
+    )
+
+    def __init__(self) -> None:
+        self.total_num_tokens = 0
+        self.num_prefill_tokens = 0
+        self.num_decodes = 0
+        self.decode_kv_cache_size_sum = 0
+        self.decode_kv_cache_size_sq_sum = 0
+        # (kv cache size, prefill chunk size) of every prefill
+        self.prefill_chunks: List[Tuple[int, int]] = []
+
+    @classmethod
+    def from_requests(
+        cls, requests: List[Request], num_tokens: List[int]
+    ) -> "BatchFeatures":
+        features = cls()
+        for request, request_num_tokens in zip(requests, num_tokens):
+            features.add_request(request, request_num_tokens)
+        return features
+
+    def add_request(self, request: Request, num_tokens: int) -> None:
+        self.total_num_tokens += num_tokens
+
+        kv_cache_size = request.num_processed_tokens
+        if request.is_prefill_complete:
+            self.num_decodes += 1
+            self.decode_kv_cache_size_sum += kv_cache_size
+            self.decode_kv_cache_size_sq_sum += kv_cache_size * kv_cache_size
+        else:
+            self.num_prefill_tokens += num_tokens
+            self.prefill_chunks.append((kv_cache_size, num_tokens))
+
+    @property
+    def attention_work(self) -> int:
+        # sum of the query length times the kv length (including the new tokens)
+        return (
+            self.num_decodes
+            + self.decode_kv_cache_size_sum
+            + sum(
+                prefill_chunk_size * (kv_cache_size + prefill_chunk_size)
+                for kv_cache_size, prefill_chunk_size in self.prefill_chunks
+            )
+        )
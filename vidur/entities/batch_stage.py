@@ -1,6 +1,7 @@
-from typing import List
+from typing import List, Optional
 
 from vidur.entities.base_entity import BaseEntity
+from vidur.entities.batch_features import BatchFeatures
 from vidur.entities.request import Request
 from vidur.logger import init_logger
 
@@ -18,6 +19,20 @@ def check_scheduled(func):
 
 
 class BatchStage(BaseEntity):
+    __slots__ = (
+        "_requests",
+        "_num_tokens",
+        "_features",
+        "_batch_id",
+        "_replica_id",
+        "_pipeline_stage",
+        "_execution_time",
+        "_model_execution_time",
+        "_scheduled_at",
+        "_completed_at",
+        "_scheduled",
+    )
+
     def __init__(
         self,
         batch_id: int,
@@ -27,11 +42,15 @@ class BatchStage(BaseEntity):
         model_execution_time: float,
         requests: List[Request],
         num_tokens: List[Request],
+        features: Optional[BatchFeatures] = None,
     ) -> None:
         self._id = BatchStage.generate_id()
 
         self._requests = requests
         self._num_tokens = num_tokens
+        if features is None:
+            features = BatchFeatures.from_requests(requests, num_tokens)
+        self._features = features
         self._batch_id = batch_id
         self._replica_id = replica_id
         self._pipeline_stage = pipeline_stage
@@ -46,6 +65,10 @@ class BatchStage(BaseEntity):
     def num_tokens(self) -> List[int]:
         return self._num_tokens
 
+    @property
+    def features(self) -> BatchFeatures:
+        return self._features
+
     @property
     @check_scheduled
     def scheduled_at(self) -> float:
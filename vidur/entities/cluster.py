@@ -5,6 +5,7 @@ from vidur.config import BaseRequestGeneratorConfig, ClusterConfig, MetricsConfi
 from vidur.entities.base_entity import BaseEntity
 from vidur.entities.replica import Replica
 from vidur.logger import init_logger
+from vidur.types import ReplicaRole
 
 logger = init_logger(__name__)
 
@@ -26,8 +27,12 @@ class Cluster(BaseEntity):
         # Init replica object handles
         self._replicas = {}
 
-        for _ in range(self._config.num_replicas):
-            replica = Replica(self._config.replica_config, generator_config)
+        for replica_idx in range(self._config.num_replicas):
+            replica = Replica(
+                self._config.replica_config,
+                generator_config,
+                self._get_initial_replica_role(replica_idx),
+            )
             self._replicas[replica.id] = replica
 
         if metrics_config.write_json_trace:
@@ -63,6 +68,14 @@ class Cluster(BaseEntity):
         replica_id = next(iter(self._replicas))
         self.free_replica_with_id(replica_id)
 
+    def _get_initial_replica_role(self, replica_idx: int) -> ReplicaRole:
+        if not self._config.is_disaggregated:
+            return ReplicaRole.MIXED
+
+        if replica_idx < self._config.num_prefill_replicas:
+            return ReplicaRole.PREFILL
+        return ReplicaRole.DECODE
+
     def to_dict(self) -> dict:
         return {
             "id": self._id,
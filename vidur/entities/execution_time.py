@@ -2,6 +2,29 @@ from vidur.entities.base_entity import BaseEntity
 
 
 class ExecutionTime(BaseEntity):
+    __slots__ = (
+        "_num_layers_per_pipeline_stage",
+        "_attention_rope_execution_time",
+        "_attention_kv_cache_save_execution_time",
+        "_attention_decode_execution_time",
+        "_attention_prefill_execution_time",
+        "_attention_layer_pre_proj_execution_time",
+        "_attention_layer_post_proj_execution_time",
+        "_mlp_layer_up_proj_execution_time",
+        "_mlp_layer_down_proj_execution_time",
+        "_mlp_layer_act_execution_time",
+        "_mlp_norm_time",
+        "_attn_norm_time",
+        "_add_time",
+        "_tensor_parallel_communication_time",
+        "_pipeline_parallel_communication_time",
+        "_schedule_time",
+        "_sampler_e2e_time",
+        "_prepare_inputs_e2e_time",
+        "_process_model_outputs_time",
+        "_ray_comm_time",
+    )
+
     def __init__(
         self,
         num_layers_per_pipeline_stage: int,
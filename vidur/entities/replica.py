@@ -3,6 +3,7 @@ from math import ceil
 from vidur.config import BaseRequestGeneratorConfig, ReplicaConfig
 from vidur.entities.base_entity import BaseEntity
 from vidur.logger import init_logger
+from vidur.types import ReplicaRole
 
 logger = init_logger(__name__)
 
@@ -12,8 +13,10 @@ class Replica(BaseEntity):
         self,
         replica_config: ReplicaConfig,
         generator_config: BaseRequestGeneratorConfig,
+        role: ReplicaRole = ReplicaRole.MIXED,
     ) -> None:
         self._id = Replica.generate_id()
+        self._role = role
 
         self._replica_config = replica_config
         self._model_config = replica_config.model_config
@@ -33,6 +36,10 @@ class Replica(BaseEntity):
     def id(self) -> int:
         return self._id
 
+    @property
+    def role(self) -> ReplicaRole:
+        return self._role
+
     @property
     def num_layers(self) -> int:
         return self._model_config.num_layers
@@ -93,6 +100,10 @@ class Replica(BaseEntity):
     def total_memory_gb(self) -> int:
         return self._device_config.total_memory_gb
 
+    @property
+    def pcie_bandwidth_gbps(self) -> int:
+        return self._device_config.pcie_bandwidth_gbps
+
     @property
     def memory_margin_fraction(self) -> float:
         return self._replica_config.memory_margin_fraction
@@ -108,6 +119,7 @@ class Replica(BaseEntity):
     def to_dict(self) -> dict:
         return {
             "id": self.id,
+            "role": str(self.role),
             "num_layers": self.num_layers,
             "num_q_heads": self.num_q_heads,
             "num_kv_heads": self.num_kv_heads,
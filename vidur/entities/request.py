@@ -1,4 +1,4 @@
-from typing import Tuple
+from typing import Hashable, Optional, Tuple
 
 from vidur.entities.base_entity import BaseEntity
 from vidur.logger import init_logger
@@ -26,12 +26,40 @@ def check_completed(func):
 
 
 class Request(BaseEntity):
+    __slots__ = (
+        "_arrived_at",
+        "_num_prefill_tokens",
+        "_num_decode_tokens",
+        "_num_processed_tokens",
+        "_scheduled_at",
+        "_execution_time",
+        "_model_execution_time",
+        "_scheduling_delay",
+        "_preempted_time",
+        "_completed_at",
+        "_prefill_completed_at",
+        "_latest_stage_scheduled_at",
+        "_latest_stage_completed_at",
+        "_latest_iteration_scheduled_at",
+        "_latest_iteration_completed_at",
+        "_latest_iteration_scheduling_delay",
+        "_scheduled",
+        "_preempted",
+        "_completed",
+        "_is_prefill_complete",
+        "_num_restarts",
+        "_prefix_id",
+        "_num_prefix_tokens",
+    )
+
     def __init__(
         self,
         arrived_at: float,
         num_prefill_tokens: int,
         num_decode_tokens: int,
         num_processed_tokens: int = 0,
+        prefix_id: Optional[Hashable] = None,
+        num_prefix_tokens: int = 0,
     ):
         self._id = Request.generate_id()
         self._arrived_at = arrived_at
@@ -59,6 +87,10 @@ class Request(BaseEntity):
 
         self._num_restarts = 0
 
+        # requests with the same prefix id share their first num_prefix_tokens tokens
+        self._prefix_id = prefix_id
+        self._num_prefix_tokens = num_prefix_tokens if prefix_id is not None else 0
+
     @property
     def size(self) -> Tuple[int, int]:
         return (self._num_prefill_tokens, self._num_decode_tokens)
@@ -155,6 +187,14 @@ class Request(BaseEntity):
     def num_decode_tokens(self) -> int:
         return self._num_decode_tokens
 
+    @property
+    def prefix_id(self) -> Optional[Hashable]:
+        return self._prefix_id
+
+    @property
+    def num_prefix_tokens(self) -> int:
+        return self._num_prefix_tokens
+
     @property
     def pd_ratio(self) -> float:
         return self._num_prefill_tokens / self._num_decode_tokens
@@ -199,6 +239,14 @@ class Request(BaseEntity):
     def has_started_decode(self) -> bool:
         return self._num_processed_tokens > self._num_prefill_tokens + 1
 
+    def on_prefix_cache_hit(self, num_tokens: int) -> None:
+        # the kv cache of the first num_tokens prompt tokens is reused from the prefix
+        # cache, so they are not processed again
+        assert self._num_processed_tokens == 0
+        assert num_tokens < self._num_prefill_tokens
+
+        self._num_processed_tokens = num_tokens
+
     def on_batch_schedule(
         self,
         time: float,
@@ -0,0 +1,161 @@
+from typing import Dict
+
+import numpy as np
+
+from vidur.entities.request import Request
+
+
+class RequestTable:
+    """
+    Columnar (struct of arrays) store of per request scalars, indexed by request id.
+    Requests are recorded once when they arrive and once when they complete, which
+    lets the metrics store drop the Request objects and compute the per request
+    metrics with a handful of vectorized operations at the end of the run.
+    """
+
+    _COLUMN_DTYPES = {
+        # recorded on arrival
+        "arrived": np.bool_,
+        "arrival_order": np.int64,
+        "arrived_at": np.float64,
+        "inter_arrival_delay": np.float64,
+        "arrival_num_prefill_tokens": np.int64,
+        "arrival_num_decode_tokens": np.int64,
+        # recorded on completion, token counts can change when a request is restarted
+        "completed": np.bool_,
+        "completion_order": np.int64,
+        "num_prefill_tokens": np.int64,
+        "num_decode_tokens": np.int64,
+        "scheduled_at": np.float64,
+        "completed_at": np.float64,
+        "prefill_completed_at": np.float64,
+        "execution_time": np.float64,
+        "model_execution_time": np.float64,
+        "preempted_time": np.float64,
+        "scheduling_delay": np.float64,
+        "num_restarts": np.int64,
+    }
+
+    _COMPLETION_COLUMNS = (
+        "num_prefill_tokens",
+        "num_decode_tokens",
+        "scheduled_at",
+        "completed_at",
+        "prefill_completed_at",
+        "execution_time",
+        "model_execution_time",
+        "preempted_time",
+        "scheduling_delay",
+        "num_restarts",
+    )
+
+    def __init__(self, initial_capacity: int = 1024) -> None:
+        self._capacity = initial_capacity
+        self._columns: Dict[str, np.ndarray] = {
+            name: np.zeros(initial_capacity, dtype=dtype)
+            for name, dtype in self._COLUMN_DTYPES.items()
+        }
+
+        self._id_offset = None
+        self._num_rows = 0
+        self._num_arrived = 0
+        self._num_completed = 0
+        self._last_arrived_at = None
+
+    def __len__(self) -> int:
+        return self._num_rows
+
+    def __getitem__(self, column: str) -> np.ndarray:
+        return self._columns[column][: self._num_rows]
+
+    @property
+    def request_ids(self) -> np.ndarray:
+        return np.arange(self._id_offset or 0, (self._id_offset or 0) + self._num_rows)
+
+    @property
+    def num_arrived(self) -> int:
+        return self._num_arrived
+
+    @property
+    def num_completed(self) -> int:
+        return self._num_completed
+
+    def _grow(self, min_capacity: int) -> None:
+        capacity = max(2 * self._capacity, min_capacity)
+        for name, column in self._columns.items():
+            new_column = np.zeros(capacity, dtype=column.dtype)
+            new_column[: self._capacity] = column
+            self._columns[name] = new_column
+        self._capacity = capacity
+
+    def _get_row(self, request_id: int) -> int:
+        # request ids are handed out sequentially, rows are relative to the first one
+        if self._id_offset is None:
+            self._id_offset = request_id
+
+        row = request_id - self._id_offset
+        assert row >= 0, f"Request {request_id} predates the request table"
+
+        if row >= self._capacity:
+            self._grow(row + 1)
+        self._num_rows = max(self._num_rows, row + 1)
+
+        return row
+
+    def on_request_arrival(self, request: Request) -> None:
+        row = self._get_row(request.id)
+        columns = self._columns
+
+        columns["arrived"][row] = True
+        columns["arrival_order"][row] = self._num_arrived
+        columns["arrived_at"][row] = request.arrived_at
+        columns["inter_arrival_delay"][row] = (
+            np.nan
+            if self._last_arrived_at is None
+            else request.arrived_at - self._last_arrived_at
+        )
+        columns["arrival_num_prefill_tokens"][row] = request.num_prefill_tokens
+        columns["arrival_num_decode_tokens"][row] = request.num_decode_tokens
+
+        self._num_arrived += 1
+        self._last_arrived_at = request.arrived_at
+
+    def merge_completions(self, other: "RequestTable") -> None:
+        # adds the completions recorded by another table, e.g. of a simulation shard
+        completed = np.flatnonzero(other["completed"])
+        if len(completed) == 0:
+            return
+        completed = completed[np.argsort(other["completion_order"][completed])]
+
+        request_ids = other.request_ids[completed]
+        # grows the table and checks the ids against its first row
+        self._get_row(int(request_ids.min()))
+        self._get_row(int(request_ids.max()))
+        rows = request_ids - self._id_offset
+
+        columns = self._columns
+        for name in self._COMPLETION_COLUMNS:
+            columns[name][rows] = other._columns[name][completed]
+        columns["completed"][rows] = True
+        columns["completion_order"][rows] = self._num_completed + np.arange(len(rows))
+
+        self._num_completed += len(rows)
+
+    def on_request_end(self, request: Request) -> None:
+        row = self._get_row(request.id)
+        columns = self._columns
+
+        columns["completed"][row] = True
+        columns["completion_order"][row] = self._num_completed
+        columns["num_prefill_tokens"][row] = request.num_prefill_tokens
+        columns["num_decode_tokens"][row] = request.num_decode_tokens
+        columns["scheduled_at"][row] = request.scheduled_at
+        columns["completed_at"][row] = request.completed_at
+        columns["prefill_completed_at"][row] = request.prefill_completed_at
+        columns["execution_time"][row] = request.execution_time
+        columns["model_execution_time"][row] = request.model_execution_time
+        columns["preempted_time"][row] = request.preempted_time
+        columns["scheduling_delay"][row] = request.scheduling_delay
+        columns["num_restarts"][row] = request.num_restarts
+
+        self._num_completed += 1
@@ -0,0 +1,6 @@
+from vidur.event_queue.base_event_queue import BaseEventQueue
+from vidur.event_queue.calendar_event_queue import CalendarEventQueue
+from vidur.event_queue.event_queue_registry import EventQueueRegistry
+from vidur.event_queue.heap_event_queue import HeapEventQueue
+
+__all__ = [BaseEventQueue, HeapEventQueue, CalendarEventQueue, EventQueueRegistry]
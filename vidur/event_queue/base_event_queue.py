@@ -0,0 +1,27 @@
+from abc import ABC, abstractmethod
+
+from vidur.config import BaseEventQueueConfig
+from vidur.events.base_event import BaseEvent
+
+
+class BaseEventQueue(ABC):
+    """
+    Pending events of the simulation. Implementations must hand out events in the
+    order of their `(event._priority_number, event)` tuples, i.e. by time, then id,
+    falling back to `BaseEvent.__lt__` when the priority numbers are equal.
+    """
+
+    def __init__(self, config: BaseEventQueueConfig):
+        self._config = config
+
+    @abstractmethod
+    def put(self, event: BaseEvent) -> None:
+        pass
+
+    @abstractmethod
+    def get(self) -> BaseEvent:
+        pass
+
+    @abstractmethod
+    def __len__(self) -> int:
+        pass
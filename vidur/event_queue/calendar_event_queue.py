@@ -0,0 +1,69 @@
+import heapq
+from bisect import insort
+
+from vidur.config import CalendarEventQueueConfig
+from vidur.event_queue.base_event_queue import BaseEventQueue
+from vidur.events.base_event import BaseEvent
+
+
+class CalendarEventQueue(BaseEventQueue):
+    """
+    Two level calendar queue. Events are hashed into fixed width time buckets which
+    are kept as unsorted lists, only the indices of non-empty buckets live in a heap.
+    A bucket is sorted once when it becomes current and then consumed front to back,
+    events that land in the current bucket are insorted behind the read cursor.
+    """
+
+    def __init__(self, config: CalendarEventQueueConfig):
+        super().__init__(config)
+
+        self._bucket_width = config.bucket_width
+        self._buckets = {}
+        self._bucket_indices = []
+
+        self._current_index = float("-inf")
+        self._current_bucket = []
+        self._cursor = 0
+
+        self._size = 0
+
+    def put(self, event: BaseEvent) -> None:
+        item = (event._priority_number, event)
+        index = int(event._time // self._bucket_width)
+        self._size += 1
+
+        if index <= self._current_index:
+            # events are never scheduled in the past by the simulator, but if they
+            # are, the current bucket is still the right place for them
+            insort(self._current_bucket, item, self._cursor)
+            return
+
+        bucket = self._buckets.get(index)
+        if bucket is None:
+            self._buckets[index] = [item]
+            heapq.heappush(self._bucket_indices, index)
+        else:
+            bucket.append(item)
+
+    def get(self) -> BaseEvent:
+        if self._cursor == len(self._current_bucket):
+            self._advance()
+
+        item = self._current_bucket[self._cursor]
+        # release the event, slots behind the cursor are never looked at again
+        self._current_bucket[self._cursor] = None
+        self._cursor += 1
+        self._size -= 1
+        return item[1]
+
+    def _advance(self) -> None:
+        if not self._bucket_indices:
+            raise IndexError("get from an empty event queue")
+
+        self._current_index = heapq.heappop(self._bucket_indices)
+        self._current_bucket = self._buckets.pop(self._current_index)
+        self._current_bucket.sort()
+        self._cursor = 0
+
+    def __len__(self) -> int:
+        return self._size
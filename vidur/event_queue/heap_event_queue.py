@@ -0,0 +1,21 @@
+import heapq
+
+from vidur.config import HeapEventQueueConfig
+from vidur.event_queue.base_event_queue import BaseEventQueue
+from vidur.events.base_event import BaseEvent
+
+
+class HeapEventQueue(BaseEventQueue):
+    def __init__(self, config: HeapEventQueueConfig):
+        super().__init__(config)
+
+        self._heap = []
+
+    def put(self, event: BaseEvent) -> None:
+        heapq.heappush(self._heap, (event._priority_number, event))
+
+    def get(self) -> BaseEvent:
+        return heapq.heappop(self._heap)[1]
+
+    def __len__(self) -> int:
+        return len(self._heap)
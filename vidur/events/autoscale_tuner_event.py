@@ -13,6 +13,8 @@ logger = init_logger(__name__)
 
 
 class AutoscaleTunerEvent(BaseEvent):
+    __slots__ = ()
+
     def __init__(self, time: float):
         super().__init__(time, EventType.AUTOSCALE_TUNER)
 
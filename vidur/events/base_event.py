@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import List
+from typing import List, Optional, Tuple
 
 from vidur.autoscaler import BaseAutoscaler
 from vidur.metrics import MetricsStore
@@ -8,7 +8,11 @@ from vidur.types import EventType
 
 
 class BaseEvent(ABC):
-    _id = 0
+    # millions of events are created in a long simulation, subclasses declare their
+    # attributes in __slots__ as well
+    __slots__ = ("_time", "_id", "_event_type", "_priority_number")
+
+    _next_id = 0
 
     def __init__(self, time: float, event_type: EventType):
         self._time = time
@@ -18,8 +22,8 @@ class BaseEvent(ABC):
 
     @classmethod
     def generate_id(cls):
-        cls._id += 1
-        return cls._id
+        cls._next_id += 1
+        return cls._next_id
 
     @property
     def id(self) -> int:
@@ -33,6 +37,14 @@ class BaseEvent(ABC):
     def event_type(self):
         pass
 
+    @property
+    def coalescing_key(self) -> Optional[Tuple]:
+        """
+        Events that share a coalescing key with an event that is still pending in the
+        event queue are redundant and are dropped by the simulator at enqueue time.
+        """
+        return None
+
     @abstractmethod
     def handle_event(
         self,
@@ -12,6 +12,8 @@ logger = init_logger(__name__)
 
 
 class BatchEndEvent(BaseEvent):
+    __slots__ = ("_replica_id", "_batch")
+
     def __init__(self, time: float, replica_id: int, batch: Batch):
         super().__init__(time, EventType.BATCH_END)
 
@@ -25,6 +27,7 @@ class BatchEndEvent(BaseEvent):
         autoscaler: BaseAutoscaler,
     ) -> List[BaseEvent]:
         from vidur.events.replica_schedule_event import ReplicaScheduleEvent
+        from vidur.events.request_handoff_event import RequestHandoffEvent
 
         self._batch.on_batch_end(self.time)
         replica_scheduler = scheduler.get_replica_scheduler(self._replica_id)
@@ -38,7 +41,14 @@ class BatchEndEvent(BaseEvent):
         if autoscaler is not None:
             autoscaler.on_batch_end(self._batch)
 
-        next_events = []
+        next_events = [
+            RequestHandoffEvent(
+                self.time + scheduler.get_kv_cache_transfer_time(request),
+                self._replica_id,
+                request,
+            )
+            for request in replica_scheduler.pop_prefilled_requests()
+        ]
         if not replica_scheduler.is_empty():
             next_events.append(ReplicaScheduleEvent(self.time, self._replica_id))
         else:
@@ -13,6 +13,8 @@ logger = init_logger(__name__)
 
 
 class BatchStageEndEvent(BaseEvent):
+    __slots__ = ("_replica_id", "_stage_id", "_is_last_stage", "_batch", "_batch_stage")
+
     def __init__(
         self,
         time: float,
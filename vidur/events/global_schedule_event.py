@@ -11,12 +11,19 @@ logger = init_logger(__name__)
 
 
 class GlobalScheduleEvent(BaseEvent):
+    __slots__ = ("_replica_set", "_request_mapping")
+
     def __init__(self, time: float):
         super().__init__(time, EventType.GLOBAL_SCHEDULE)
 
         self._replica_set = []
         self._request_mapping = []
 
+    @property
+    def coalescing_key(self):
+        # a single pass routes every queued request, so one pass per timestamp suffices
+        return (self._event_type, self._time)
+
     def handle_event(
         self,
         scheduler: BaseGlobalScheduler,
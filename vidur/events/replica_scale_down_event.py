@@ -11,6 +11,8 @@ logger = init_logger(__name__)
 
 
 class ReplicaScaleDownEvent(BaseEvent):
+    __slots__ = ()
+
     def __init__(self, time: float):
         super().__init__(time, EventType.REPLICA_SCALE_DOWN)
 
@@ -11,6 +11,8 @@ logger = init_logger(__name__)
 
 
 class ReplicaScheduleEvent(BaseEvent):
+    __slots__ = ("_replica_id", "_batches")
+
     def __init__(self, time: float, replica_id: int):
         super().__init__(time, EventType.REPLICA_SCHEDULE)
 
@@ -18,6 +20,12 @@ class ReplicaScheduleEvent(BaseEvent):
 
         self._batches = []
 
+    @property
+    def coalescing_key(self):
+        # on_schedule keeps forming batches until the replica pipeline is full, so
+        # a pending schedule for the same replica and time subsumes any duplicate
+        return (self._event_type, self._time, self._replica_id)
+
     def handle_event(
         self,
         scheduler: BaseGlobalScheduler,
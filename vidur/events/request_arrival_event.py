@@ -12,11 +12,19 @@ logger = init_logger(__name__)
 
 
 class RequestArrivalEvent(BaseEvent):
+    __slots__ = ("_request",)
+
     def __init__(self, time: float, request: Request) -> None:
         super().__init__(time, EventType.REQUEST_ARRIVAL)
 
         self._request = request
 
+    def _get_priority_number(self):
+        # arrivals are pulled lazily from the request stream, so they can be created
+        # after other events with the same timestamp. Order them ahead of those (and
+        # among themselves by id) as if the whole workload had been enqueued upfront.
+        return (self._time, 0, self.event_type)
+
     def handle_event(
         self,
         scheduler: BaseGlobalScheduler,
@@ -28,7 +36,8 @@ class RequestArrivalEvent(BaseEvent):
         logger.debug(f"Request: {self._request.id} arrived at {self.time}")
         scheduler.add_request(self._request)
         metrics_store.on_request_arrival(self.time, self._request)
-        autoscaler.on_request_arrival(self._request)
+        if autoscaler is not None:
+            autoscaler.on_request_arrival(self._request)
         return [GlobalScheduleEvent(self.time)]
 
     def to_dict(self) -> dict:
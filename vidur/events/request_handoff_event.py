@@ -0,0 +1,59 @@
+from typing import List
+
+from vidur.autoscaler import BaseAutoscaler
+from vidur.entities import Request
+from vidur.events.base_event import BaseEvent
+from vidur.logger import init_logger
+from vidur.metrics import MetricsStore
+from vidur.scheduler import BaseGlobalScheduler
+from vidur.types import EventType
+
+logger = init_logger(__name__)
+
+
+class RequestHandoffEvent(BaseEvent):
+    """
+    The kv cache of a request whose prefill completed on a prefill replica has been
+    transferred, the request continues its decode on a decode replica.
+    """
+
+    __slots__ = ("_prefill_replica_id", "_decode_replica_id", "_request")
+
+    def __init__(self, time: float, prefill_replica_id: int, request: Request) -> None:
+        super().__init__(time, EventType.REQUEST_HANDOFF)
+
+        self._prefill_replica_id = prefill_replica_id
+        self._decode_replica_id = None
+        self._request = request
+
+    def handle_event(
+        self,
+        scheduler: BaseGlobalScheduler,
+        metrics_store: MetricsStore,
+        autoscaler: BaseAutoscaler,
+    ) -> List[BaseEvent]:
+        from vidur.events.replica_schedule_event import ReplicaScheduleEvent
+
+        scheduler.get_replica_scheduler(self._prefill_replica_id).free(self._request.id)
+        self._decode_replica_id = scheduler.schedule_decode(self._request)
+        scheduler.get_replica_scheduler(self._decode_replica_id).add_request(
+            self._request
+        )
+        logger.debug(
+            f"Request: {self._request.id} handed off from replica {self._prefill_replica_id}"
+            f" to replica {self._decode_replica_id} at {self.time}"
+        )
+
+        return [
+            ReplicaScheduleEvent(self.time, self._prefill_replica_id),
+            ReplicaScheduleEvent(self.time, self._decode_replica_id),
+        ]
+
+    def to_dict(self) -> dict:
+        return {
+            "time": self.time,
+            "event_type": self.event_type,
+            "request": self._request.id,
+            "prefill_replica_id": self._prefill_replica_id,
+            "decode_replica_id": self._decode_replica_id,
+        }
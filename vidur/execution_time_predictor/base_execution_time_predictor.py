@@ -1,4 +1,6 @@
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Hashable, Optional
 
 from vidur.config import (
     BaseExecutionTimePredictorConfig,
@@ -29,7 +31,55 @@ class BaseExecutionTimePredictor(ABC):
             self._model_config.num_layers // self._replica_config.num_pipeline_stages
         )
 
+        self._execution_time_cache = OrderedDict()
+        self._num_cache_hits = 0
+        self._num_cache_misses = 0
+
+    @property
+    def num_cache_hits(self) -> int:
+        return self._num_cache_hits
+
+    @property
+    def num_cache_misses(self) -> int:
+        return self._num_cache_misses
+
+    @property
+    def cache_hit_rate(self) -> float:
+        num_lookups = self._num_cache_hits + self._num_cache_misses
+        if not num_lookups:
+            return 0
+        return self._num_cache_hits / num_lookups
+
     def get_execution_time(self, batch: Batch, pipeline_stage: int) -> ExecutionTime:
+        batch_features = self._get_batch_features(batch)
+        if batch_features is None or not self._config.execution_time_cache_size:
+            return self._get_execution_time(batch, pipeline_stage)
+
+        # all but the last pipeline stage have the same execution time
+        key = (
+            batch_features,
+            pipeline_stage == self._replica_config.num_pipeline_stages - 1,
+        )
+        execution_time = self._execution_time_cache.get(key)
+        if execution_time is not None:
+            self._execution_time_cache.move_to_end(key)
+            self._num_cache_hits += 1
+            return execution_time
+
+        self._num_cache_misses += 1
+        execution_time = self._get_execution_time(batch, pipeline_stage)
+        self._execution_time_cache[key] = execution_time
+        if len(self._execution_time_cache) > self._config.execution_time_cache_size:
+            self._execution_time_cache.popitem(last=False)
+
+        return execution_time
+
+    def _get_batch_features(self, batch: Batch) -> Optional[Hashable]:
+        # the features the predictions of the batch depend on, batches with the same
+        # features share their (immutable) execution time. None disables the cache
+        return None
+
+    def _get_execution_time(self, batch: Batch, pipeline_stage: int) -> ExecutionTime:
         if pipeline_stage == self._replica_config.num_pipeline_stages - 1:
             pipeline_parallel_communication_time = 0
         else:
@@ -4,6 +4,9 @@ from vidur.execution_time_predictor.linear_regression_execution_time_predictor i
 from vidur.execution_time_predictor.random_forrest_execution_time_predictor import (
     RandomForrestExecutionTimePredictor,
 )
+from vidur.execution_time_predictor.roofline_execution_time_predictor import (
+    RooflineExecutionTimePredictor,
+)
 from vidur.types import ExecutionTimePredictorType
 from vidur.utils.base_registry import BaseRegistry
 
@@ -20,3 +23,6 @@ ExecutionTimePredictorRegistry.register(
 ExecutionTimePredictorRegistry.register(
     ExecutionTimePredictorType.LINEAR_REGRESSION, LinearRegressionExecutionTimePredictor
 )
+ExecutionTimePredictorRegistry.register(
+    ExecutionTimePredictorType.ROOFLINE, RooflineExecutionTimePredictor
+)
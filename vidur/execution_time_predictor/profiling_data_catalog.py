@@ -0,0 +1,110 @@
+import hashlib
+import json
+import os
+from typing import Any, Dict, Tuple
+
+import numpy as np
+import pandas as pd
+from fasteners import InterProcessReaderWriterLock
+
+from vidur.logger import init_logger
+
+logger = init_logger(__name__)
+
+
+class ProfilingDataCatalog:
+    """
+    Converts the profiling CSVs once into typed DataFrame partitions on disk, indexed
+    by the values of the columns the predictors filter on (tensor parallel size, block
+    size, collective, ...). Model and device are already part of the profiling file
+    paths. Predictors only load the partition they need, and the partitions loaded by
+    a process are shared by all of its predictors, so config sweeps do not re-parse
+    the same CSVs. A catalog entry is invalidated when its CSV is modified.
+    """
+
+    # (source dir, partition values) -> partition, shared by all predictors of a process
+    _partitions: Dict[Tuple[str, Tuple[Any, ...]], pd.DataFrame] = {}
+
+    def __init__(self, cache_dir: str) -> None:
+        self._catalog_dir = f"{cache_dir}/profiling_catalog"
+        os.makedirs(self._catalog_dir, exist_ok=True)
+
+    def get_partition(self, file_path: str, partition: Dict[str, Any]) -> pd.DataFrame:
+        """
+        Returns the deduplicated rows of the CSV at file_path whose columns match the
+        given values, with the columns of the CSV even if no row matches.
+        """
+        source_dir = self._get_source_dir(file_path, list(partition))
+        key = (source_dir, tuple(partition.values()))
+
+        if key not in self._partitions:
+            index = self._load_index(source_dir)
+            if index is None:
+                index = self._convert(file_path, source_dir, list(partition))
+
+            partition_file = index.get(key[1], "empty.pkl")
+            self._partitions[key] = pd.read_pickle(f"{source_dir}/{partition_file}")
+
+        # the predictors modify the frames they load
+        return self._partitions[key].copy()
+
+    def _get_source_dir(self, file_path: str, partition_columns: list) -> str:
+        stat = os.stat(file_path)
+        source_str = str(
+            (
+                os.path.abspath(file_path),
+                stat.st_mtime_ns,
+                stat.st_size,
+                partition_columns,
+            )
+        )
+        source_hash = hashlib.md5(source_str.encode("utf-8")).hexdigest()[0:8]
+        file_name = os.path.splitext(os.path.basename(file_path))[0]
+        return f"{self._catalog_dir}/{file_name}_{source_hash}"
+
+    def _load_index(self, source_dir: str) -> Dict[Tuple[Any, ...], str]:
+        with InterProcessReaderWriterLock(f"{source_dir}_lock.file").read_lock():
+            return self._read_index(source_dir)
+
+    def _read_index(self, source_dir: str) -> Dict[Tuple[Any, ...], str]:
+        index_file = f"{source_dir}/index.json"
+        if not os.path.exists(index_file):
+            return
+
+        with open(index_file) as f:
+            return {tuple(values): file_name for values, file_name in json.load(f)}
+
+    def _convert(
+        self, file_path: str, source_dir: str, partition_columns: list
+    ) -> Dict[Tuple[Any, ...], str]:
+        with InterProcessReaderWriterLock(f"{source_dir}_lock.file").write_lock():
+            # another process may have converted the file in the meantime
+            index = self._read_index(source_dir)
+            if index is not None:
+                return index
+
+            logger.info(f"Adding {file_path} to the profiling data catalog")
+            os.makedirs(source_dir, exist_ok=True)
+
+            df = pd.read_csv(file_path)
+            df = df.drop_duplicates()
+
+            df.iloc[0:0].to_pickle(f"{source_dir}/empty.pkl")
+
+            index = {}
+            for i, (values, partition_df) in enumerate(
+                df.groupby(partition_columns, sort=False, dropna=False)
+            ):
+                values = tuple(
+                    value.item() if isinstance(value, np.generic) else value
+                    for value in values
+                )
+                partition_file = f"partition_{i}.pkl"
+                partition_df.to_pickle(f"{source_dir}/{partition_file}")
+                index[values] = partition_file
+
+            # written last, it marks the conversion as complete
+            with open(f"{source_dir}/index.json", "w") as f:
+                json.dump(list(index.items()), f)
+
+        return index
@@ -0,0 +1,446 @@
+import hashlib
+import json
+import os
+from collections import defaultdict
+from glob import glob
+from math import ceil
+from typing import Dict, Tuple
+
+import numpy as np
+import pandas as pd
+
+from vidur.config import (
+    BaseReplicaSchedulerConfig,
+    MetricsConfig,
+    ReplicaConfig,
+    RooflineExecutionTimePredictorConfig,
+)
+from vidur.entities import Batch
+from vidur.execution_time_predictor.base_execution_time_predictor import (
+    BaseExecutionTimePredictor,
+)
+from vidur.logger import init_logger
+
+logger = init_logger(__name__)
+
+# fp16 weights and activations
+BYTES_PER_ELEMENT = 2
+
+
+def get_matmul_cost(m, k, n) -> Tuple:
+    return 2 * m * k * n, BYTES_PER_ELEMENT * (m * k + k * n + m * n)
+
+
+def get_num_tokens_costs(
+    num_tokens,
+    num_q_heads,
+    num_kv_heads,
+    head_dim,
+    embedding_dim,
+    mlp_hidden_dim,
+    use_gated_mlp,
+) -> Dict[str, Tuple]:
+    """
+    FLOPs and bytes moved per layer of the operations whose cost only depends on
+    the number of tokens, for the heads and hidden dims of a single tensor parallel
+    worker. Works on scalars and on numpy arrays of profiled shapes alike.
+    """
+    num_up_proj_outputs = mlp_hidden_dim * (1 + use_gated_mlp)
+    qkv_dim = (num_q_heads + 2 * num_kv_heads) * head_dim
+    hidden_size = num_tokens * embedding_dim
+    rope_size = num_tokens * (num_q_heads + num_kv_heads) * head_dim
+
+    return {
+        "attn_pre_proj": get_matmul_cost(num_tokens, embedding_dim, qkv_dim),
+        "attn_post_proj": get_matmul_cost(
+            num_tokens, num_q_heads * head_dim, embedding_dim
+        ),
+        "mlp_up_proj": get_matmul_cost(num_tokens, embedding_dim, num_up_proj_outputs),
+        "mlp_down_proj": get_matmul_cost(num_tokens, mlp_hidden_dim, embedding_dim),
+        "mlp_act": (
+            num_tokens * num_up_proj_outputs,
+            BYTES_PER_ELEMENT * num_tokens * (num_up_proj_outputs + mlp_hidden_dim),
+        ),
+        "attn_rope": (3 * rope_size, 2 * BYTES_PER_ELEMENT * rope_size),
+        "input_layernorm": (4 * hidden_size, 2 * BYTES_PER_ELEMENT * hidden_size),
+        "post_attention_layernorm": (
+            4 * hidden_size,
+            2 * BYTES_PER_ELEMENT * hidden_size,
+        ),
+        "add": (hidden_size, 3 * BYTES_PER_ELEMENT * hidden_size),
+        "attn_kv_cache_save": (
+            0,
+            2 * BYTES_PER_ELEMENT * 2 * num_tokens * num_kv_heads * head_dim,
+        ),
+    }
+
+
+def get_attention_decode_cost(
+    batch_size, kv_cache_size, num_q_heads, num_kv_heads, head_dim
+) -> Tuple:
+    # kv_cache_size is the total over the batch, every request reads its kv cache once
+    return (
+        4 * num_q_heads * head_dim * kv_cache_size,
+        BYTES_PER_ELEMENT
+        * (
+            2 * kv_cache_size * num_kv_heads * head_dim
+            + 2 * batch_size * num_q_heads * head_dim
+        ),
+    )
+
+
+def get_attention_prefill_cost(
+    prefill_chunk_size,
+    kv_cache_size,
+    chunk_kv_cache_product,
+    num_q_heads,
+    num_kv_heads,
+    head_dim,
+) -> Tuple:
+    # totals over the prefills of the batch, the kv cache includes the chunk and
+    # chunk_kv_cache_product is the sum of the per request q * kv lengths
+    return (
+        4 * num_q_heads * head_dim * chunk_kv_cache_product,
+        BYTES_PER_ELEMENT
+        * (
+            2 * prefill_chunk_size * num_q_heads * head_dim
+            + 2 * kv_cache_size * num_kv_heads * head_dim
+        ),
+    )
+
+
+class RooflineExecutionTimePredictor(BaseExecutionTimePredictor):
+    """
+    Predicts the execution time of every operation as the time it takes to either
+    compute its FLOPs at the peak FLOPs or move its bytes at the peak memory bandwidth
+    of the device, whichever is longer, scaled by an efficiency factor. It needs no
+    profiling data or training, so hypothetical models and devices can be simulated
+    directly. Optionally the factors are fitted per operation to the profiling data
+    available for the device. Communication is modelled from the link bandwidths,
+    cpu overheads are not modelled.
+    """
+
+    def __init__(
+        self,
+        predictor_config: RooflineExecutionTimePredictorConfig,
+        replica_config: ReplicaConfig,
+        replica_scheduler_config: BaseReplicaSchedulerConfig,
+        metrics_config: MetricsConfig,
+    ) -> None:
+        super().__init__(
+            predictor_config=predictor_config,
+            replica_config=replica_config,
+            replica_scheduler_config=replica_scheduler_config,
+            metrics_config=metrics_config,
+        )
+
+        tensor_parallel_size = self._replica_config.tensor_parallel_size
+        self._worker_shape = (
+            self._model_config.num_q_heads // tensor_parallel_size,
+            ceil(self._model_config.num_kv_heads / tensor_parallel_size),
+            self._model_config.embedding_dim // self._model_config.num_q_heads,
+            self._model_config.embedding_dim,
+            self._model_config.mlp_hidden_dim // tensor_parallel_size,
+            self._model_config.use_gated_mlp,
+        )
+
+        device_config = self._replica_config.device_config
+        self._flops_per_ms = device_config.fp16_tflops * 1e9
+        self._bytes_per_ms = device_config.memory_bandwidth_gbps * 1e6
+
+        num_workers = self._replica_config.num_pipeline_stages * tensor_parallel_size
+        if num_workers > self._replica_config.node_config.num_devices_per_node:
+            pipeline_bandwidth_gbps = self._config.inter_node_bandwidth_gbps
+        else:
+            pipeline_bandwidth_gbps = self._config.interconnect_bandwidth_gbps
+        self._pipeline_bytes_per_ms = pipeline_bandwidth_gbps * 1e6
+        self._tensor_parallel_bytes_per_ms = (
+            self._config.interconnect_bandwidth_gbps * 1e6
+        )
+
+        # number of tokens -> times of the operations which only depend on it
+        self._num_tokens_times: Dict[int, Dict[str, float]] = {}
+
+        self._calibration_factors: Dict[str, float] = {}
+        if self._config.calibrate:
+            self._calibration_factors = self._get_calibration_factors()
+
+    def _get_peak_time(self, flops, num_bytes):
+        return np.maximum(flops / self._flops_per_ms, num_bytes / self._bytes_per_ms)
+
+    def _get_operation_time(self, operation: str, cost: Tuple) -> float:
+        flops, num_bytes = cost
+        if operation in self._calibration_factors:
+            return float(
+                self._get_peak_time(flops, num_bytes)
+                * self._calibration_factors[operation]
+            )
+
+        return max(
+            flops / (self._flops_per_ms * self._config.compute_efficiency),
+            num_bytes / (self._bytes_per_ms * self._config.memory_bandwidth_efficiency),
+        )
+
+    def _get_num_tokens_time(self, batch: Batch, operation: str) -> float:
+        num_tokens = batch._total_num_tokens
+        times = self._num_tokens_times.get(num_tokens)
+        if times is None:
+            times = {
+                operation: self._get_operation_time(operation, cost)
+                for operation, cost in get_num_tokens_costs(
+                    num_tokens, *self._worker_shape
+                ).items()
+            }
+            self._num_tokens_times[num_tokens] = times
+
+        return times[operation]
+
+    def _get_calibration_files(self) -> Tuple[list, list]:
+        data_dir = self._config.calibration_data_dir.replace(
+            "{DEVICE}", self._replica_config.device
+        )
+        return (
+            sorted(glob(f"{data_dir}/**/mlp.csv", recursive=True)),
+            sorted(glob(f"{data_dir}/**/attention.csv", recursive=True)),
+        )
+
+    def _get_calibration_factors(self) -> Dict[str, float]:
+        compute_files, attention_files = self._get_calibration_files()
+        if not compute_files and not attention_files:
+            logger.warning(
+                f"No profiling data to calibrate the roofline model for device {self._replica_config.device}"
+            )
+            return {}
+
+        # the factors are fitted once per version of the profiling data
+        files_str = str(
+            (
+                [
+                    (file, os.stat(file).st_mtime_ns, os.stat(file).st_size)
+                    for file in compute_files + attention_files
+                ],
+                self._flops_per_ms,
+                self._bytes_per_ms,
+            )
+        )
+        files_hash = hashlib.md5(files_str.encode("utf-8")).hexdigest()[0:8]
+        cache_file = f"{self._cache_dir}/roofline_calibration_{files_hash}.json"
+        if os.path.exists(cache_file):
+            with open(cache_file) as f:
+                return json.load(f)
+
+        calibration_factors = self._fit_calibration_factors(
+            compute_files, attention_files
+        )
+        logger.info(f"Fitted roofline calibration factors: {calibration_factors}")
+
+        os.makedirs(self._cache_dir, exist_ok=True)
+        with open(cache_file, "w") as f:
+            json.dump(calibration_factors, f)
+
+        return calibration_factors
+
+    def _fit_calibration_factors(
+        self, compute_files: list, attention_files: list
+    ) -> Dict[str, float]:
+        # the factor of an operation is the median ratio of its measured time to the
+        # time at peak FLOPs and memory bandwidth, over all profiled models and shapes
+        ratios = defaultdict(list)
+
+        def add_ratios(operation: str, df: pd.DataFrame, cost: Tuple) -> None:
+            column = f"time_stats.{operation}.median"
+            if column not in df.columns:
+                return
+            measured_time = df[column].to_numpy(dtype=float)
+            peak_time = self._get_peak_time(*cost)
+            is_valid = (measured_time > 0) & (peak_time > 0)
+            ratios[operation].append(measured_time[is_valid] / peak_time[is_valid])
+
+        for file in compute_files:
+            df = pd.read_csv(file).drop_duplicates()
+            tensor_parallel_size = df["num_tensor_parallel_workers"].to_numpy()
+            costs = get_num_tokens_costs(
+                df["num_tokens"].to_numpy(),
+                df["n_head"].to_numpy() // tensor_parallel_size,
+                np.ceil(df["n_kv_head"].to_numpy() / tensor_parallel_size),
+                df["n_embd"].to_numpy() // df["n_head"].to_numpy(),
+                df["n_embd"].to_numpy(),
+                df["n_expanded_embd"].to_numpy() // tensor_parallel_size,
+                df["use_gated_mlp"].to_numpy(dtype=int),
+            )
+            for operation, cost in costs.items():
+                if operation != "attn_kv_cache_save":
+                    add_ratios(operation, df, cost)
+
+        for file in attention_files:
+            df = pd.read_csv(file).drop_duplicates()
+            tensor_parallel_size = df["num_tensor_parallel_workers"].to_numpy()
+            num_q_heads = df["n_q_head"].to_numpy() // tensor_parallel_size
+            num_kv_heads = np.ceil(df["n_kv_head"].to_numpy() / tensor_parallel_size)
+            head_dim = df["n_embd"].to_numpy() // df["n_q_head"].to_numpy()
+            batch_size = df["batch_size"].to_numpy()
+            kv_cache_size = df["kv_cache_size"].to_numpy()
+            prefill_chunk_size = df["prefill_chunk_size"].to_numpy()
+            prefill_kv_cache_size = kv_cache_size + prefill_chunk_size
+
+            add_ratios(
+                "attn_decode",
+                df,
+                get_attention_decode_cost(
+                    batch_size,
+                    batch_size * kv_cache_size,
+                    num_q_heads,
+                    num_kv_heads,
+                    head_dim,
+                ),
+            )
+            add_ratios(
+                "attn_prefill",
+                df,
+                get_attention_prefill_cost(
+                    prefill_chunk_size,
+                    prefill_kv_cache_size,
+                    prefill_chunk_size * prefill_kv_cache_size,
+                    num_q_heads,
+                    num_kv_heads,
+                    head_dim,
+                ),
+            )
+            num_tokens = np.maximum(batch_size, prefill_chunk_size)
+            add_ratios(
+                "attn_kv_cache_save",
+                df,
+                (0, 2 * BYTES_PER_ELEMENT * 2 * num_tokens * num_kv_heads * head_dim),
+            )
+
+        return {
+            operation: float(np.median(np.concatenate(operation_ratios)))
+            for operation, operation_ratios in ratios.items()
+            if sum(len(ratio) for ratio in operation_ratios)
+        }
+
+    def _get_attention_features(self, batch: Batch) -> Tuple[int, ...]:
+        features = batch.features
+        prefill_kv_cache_size = 0
+        chunk_kv_cache_product = 0
+
+        for kv_cache_size, prefill_chunk_size in features.prefill_chunks:
+            kv_cache_size += prefill_chunk_size
+            prefill_kv_cache_size += kv_cache_size
+            chunk_kv_cache_product += prefill_chunk_size * kv_cache_size
+
+        return (
+            features.num_decodes,
+            features.decode_kv_cache_size_sum,
+            features.num_prefill_tokens,
+            prefill_kv_cache_size,
+            chunk_kv_cache_product,
+        )
+
+    def _get_batch_features(self, batch: Batch) -> Tuple:
+        return batch._total_num_tokens, self._get_attention_features(batch)
+
+    def _get_attention_layer_pre_proj_execution_time(self, batch: Batch) -> float:
+        return self._get_num_tokens_time(batch, "attn_pre_proj")
+
+    def _get_attention_layer_post_proj_execution_time(self, batch: Batch) -> float:
+        return self._get_num_tokens_time(batch, "attn_post_proj")
+
+    def _get_attention_rope_execution_time(self, batch: Batch) -> float:
+        return self._get_num_tokens_time(batch, "attn_rope")
+
+    def _get_attention_kv_cache_save_execution_time(self, batch: Batch) -> float:
+        return self._get_num_tokens_time(batch, "attn_kv_cache_save")
+
+    def _get_attention_decode_execution_time(self, batch: Batch) -> float:
+        num_decodes, decode_kv_cache_size, *_ = self._get_attention_features(batch)
+        if num_decodes == 0:
+            return 0
+
+        num_q_heads, num_kv_heads, head_dim, *_ = self._worker_shape
+        return self._get_operation_time(
+            "attn_decode",
+            get_attention_decode_cost(
+                num_decodes, decode_kv_cache_size, num_q_heads, num_kv_heads, head_dim
+            ),
+        )
+
+    def _get_attention_prefill_execution_time(self, batch: Batch) -> float:
+        _, _, *prefill_features = self._get_attention_features(batch)
+        if prefill_features[0] == 0:
+            return 0
+
+        num_q_heads, num_kv_heads, head_dim, *_ = self._worker_shape
+        return self._get_operation_time(
+            "attn_prefill",
+            get_attention_prefill_cost(
+                *prefill_features, num_q_heads, num_kv_heads, head_dim
+            ),
+        )
+
+    def _get_mlp_layer_up_proj_execution_time(self, batch: Batch) -> float:
+        return self._get_num_tokens_time(batch, "mlp_up_proj")
+
+    def _get_mlp_layer_down_proj_execution_time(self, batch: Batch) -> float:
+        return self._get_num_tokens_time(batch, "mlp_down_proj")
+
+    def _get_mlp_layer_act_execution_time(self, batch: Batch) -> float:
+        return self._get_num_tokens_time(batch, "mlp_act")
+
+    def _get_attn_norm_layer_act_execution_time(self, batch: Batch) -> float:
+        return self._get_num_tokens_time(batch, "input_layernorm")
+
+    def _get_mlp_norm_layer_act_execution_time(self, batch: Batch) -> float:
+        if not self._model_config.post_attn_norm:
+            return 0
+
+        return self._get_num_tokens_time(batch, "post_attention_layernorm")
+
+    def _get_add_layer_act_execution_time(self, batch: Batch) -> float:
+        return self._get_num_tokens_time(batch, "add")
+
+    def _get_tensor_parallel_communication_time(self, batch: Batch) -> float:
+        # ring all reduce of the hidden states, including the nccl cpu overheads
+        tensor_parallel_size = self._replica_config.tensor_parallel_size
+        num_bytes = (
+            BYTES_PER_ELEMENT
+            * batch._total_num_tokens
+            * self._model_config.embedding_dim
+        )
+        return (
+            self._config.communication_latency_ms
+            + 2
+            * (tensor_parallel_size - 1)
+            / tensor_parallel_size
+            * num_bytes
+            / self._tensor_parallel_bytes_per_ms
+            + self._config.nccl_cpu_launch_overhead_ms
+            + self._config.nccl_cpu_skew_overhead_per_device_ms
+            * tensor_parallel_size**1.25
+        )
+
+    def _get_pipeline_parallel_communication_time(self, batch: Batch) -> float:
+        num_bytes = (
+            BYTES_PER_ELEMENT
+            * batch._total_num_tokens
+            * self._model_config.embedding_dim
+        )
+        return (
+            self._config.communication_latency_ms
+            + num_bytes / self._pipeline_bytes_per_ms
+        )
+
+    def _get_schedule_time(self, batch: Batch) -> float:
+        return 0
+
+    def _get_sampler_e2e_time(self, batch: Batch) -> float:
+        return 0
+
+    def _get_prepare_inputs_e2e_time(self, batch: Batch) -> float:
+        return 0
+
+    def _get_process_model_outputs_time(self, batch: Batch) -> float:
+        return 0
+
+    def _get_ray_comm_time(self, batch: Batch) -> float:
+        return 0
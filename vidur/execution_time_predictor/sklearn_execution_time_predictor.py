@@ -1,9 +1,13 @@
 import hashlib
+import json
+import math
 import os
 import pickle
+import time
 from abc import abstractmethod
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from itertools import product
-from typing import Any, Dict, List, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import numpy as np
 import pandas as pd
@@ -18,14 +22,68 @@ from vidur.config import (
     MetricsConfig,
     ReplicaConfig,
 )
-from vidur.entities import Batch
+from vidur.entities import Batch, ExecutionTime
 from vidur.execution_time_predictor.base_execution_time_predictor import (
     BaseExecutionTimePredictor,
 )
+from vidur.execution_time_predictor.profiling_data_catalog import (
+    ProfilingDataCatalog,
+)
 from vidur.logger import init_logger
 
 logger = init_logger(__name__)
 
+# models predicted from the rounded number of tokens in the batch, in the order of the
+# ExecutionTime arguments
+NUM_TOKENS_MODELS = [
+    "attn_rope",
+    "attn_pre_proj",
+    "attn_post_proj",
+    "mlp_up_proj",
+    "mlp_down_proj",
+    "mlp_act",
+    "input_layernorm",
+    "post_attention_layernorm",
+    "add",
+    "all_reduce",
+    "send_recv",
+]
+NUM_TOKENS_MODEL_COLUMNS = {
+    model_name: column for column, model_name in enumerate(NUM_TOKENS_MODELS)
+}
+# models predicted from the batch size
+BATCH_SIZE_MODELS = [
+    "schedule",
+    "sampler_e2e",
+    "prepare_inputs_e2e",
+    "process_model_outputs",
+    "ray_comm_time",
+]
+BATCH_SIZE_MODEL_COLUMNS = {
+    model_name: column for column, model_name in enumerate(BATCH_SIZE_MODELS)
+}
+# number of token counts (or prefill chunk sizes) predicted at once in lazy mode
+PREDICTION_TILE_SIZE = 256
+# the compiled prediction tables, stored as _<name> and cached as <name>_<hash>.npy
+PREDICTION_TABLES = [
+    "num_tokens_table",
+    "attn_kv_cache_save_table",
+    "batch_size_table",
+    "attn_decode_table",
+    "attn_prefill_table",
+]
+
+
+def fit_grid_search(
+    grid_search: GridSearchCV, X: pd.DataFrame, y: pd.Series
+) -> Tuple[GridSearchCV, float, float]:
+    # module level, so that it can be run in the training worker processes
+    start_time = time.perf_counter()
+    grid_search.fit(X, y)
+    score = grid_search.score(X, y)
+
+    return grid_search, score, time.perf_counter() - start_time
+
 
 class SklearnExecutionTimePredictor(BaseExecutionTimePredictor):
     def __init__(
@@ -42,6 +100,7 @@ class SklearnExecutionTimePredictor(BaseExecutionTimePredictor):
             metrics_config=metrics_config,
         )
         os.makedirs(self._cache_dir, exist_ok=True)
+        self._profiling_data_catalog = ProfilingDataCatalog(self._cache_dir)
 
         # These overheads are only for GQA models
         self._attention_prefill_batching_overhead_fraction = (
@@ -81,8 +140,10 @@ class SklearnExecutionTimePredictor(BaseExecutionTimePredictor):
             self._cpu_overhead_input_file,
         ) = self._get_input_files()
 
+        # hashes of the trained models, they address the cached prediction tables
+        self._model_hashes: Dict[str, str] = {}
         self._models = self._train_models()
-        self._predictions = self._predict_from_models()
+        self._init_prediction_tables()
 
     def _get_input_files(self) -> Tuple[str, str, str, str, str]:
         input_files = [
@@ -103,8 +164,10 @@ class SklearnExecutionTimePredictor(BaseExecutionTimePredictor):
         return tuple(input_files)
 
     def _load_compute_df(self, file_path: str) -> pd.DataFrame:
-        df = self._read_input_file(file_path)
-        df = df.drop_duplicates()
+        df = self._read_input_file(
+            file_path,
+            num_tensor_parallel_workers=self._replica_config.tensor_parallel_size,
+        )
 
         logger.debug(f"Length of complete compute df: {len(df)} {file_path}")
         logger.debug(f"self._num_q_heads: {self._model_config.num_q_heads}")
@@ -141,8 +204,11 @@ class SklearnExecutionTimePredictor(BaseExecutionTimePredictor):
         return df
 
     def _load_attention_df(self, file_path: str) -> pd.DataFrame:
-        df = pd.read_csv(file_path)
-        df = df.drop_duplicates()
+        df = self._read_input_file(
+            file_path,
+            num_tensor_parallel_workers=self._replica_config.tensor_parallel_size,
+            block_size=self._block_size,
+        )
 
         for column in [
             "time_stats.attn_kv_cache_save.median",
@@ -164,7 +230,11 @@ class SklearnExecutionTimePredictor(BaseExecutionTimePredictor):
         ]
 
     def _load_all_reduce_df(self, file_path: str) -> pd.DataFrame:
-        df = self._read_input_file(file_path)
+        df = self._read_input_file(
+            file_path,
+            collective="all_reduce",
+            num_workers=self._replica_config.tensor_parallel_size,
+        )
         return df[
             (df["num_workers"] == self._replica_config.tensor_parallel_size)
             & (df["devices_per_node"] == self._replica_config.tensor_parallel_size)
@@ -177,7 +247,9 @@ class SklearnExecutionTimePredictor(BaseExecutionTimePredictor):
         else:
             devices_per_node = 2
 
-        df = self._read_input_file(file_path)
+        df = self._read_input_file(
+            file_path, collective="send_recv", devices_per_node=devices_per_node
+        )
         filtered_df = df[
             (df["collective"] == "send_recv")
             & (df["devices_per_node"] == devices_per_node)
@@ -185,7 +257,11 @@ class SklearnExecutionTimePredictor(BaseExecutionTimePredictor):
         return filtered_df
 
     def _load_cpu_overhead_df(self, file_path: str) -> pd.DataFrame:
-        df = self._read_input_file(file_path)
+        df = self._read_input_file(
+            file_path,
+            model_name=self._model_config.get_name(),
+            tensor_parallel_degree=self._replica_config.tensor_parallel_size,
+        )
         filtered_df = df[
             (df["model_name"] == self._model_config.get_name())
             & (
@@ -195,10 +271,9 @@ class SklearnExecutionTimePredictor(BaseExecutionTimePredictor):
         ]
         return filtered_df
 
-    def _read_input_file(self, file_path: str) -> pd.DataFrame:
-        df = pd.read_csv(file_path)
-        df = df.drop_duplicates()
-        return df
+    def _read_input_file(self, file_path: str, **partition: Any) -> pd.DataFrame:
+        # the deduplicated rows matching the partition, the loaders filter the rest
+        return self._profiling_data_catalog.get_partition(file_path, partition)
 
     def _get_compute_df_with_derived_features(self, df: pd.DataFrame) -> pd.DataFrame:
         df_with_derived_features = df.copy()
@@ -284,11 +359,70 @@ class SklearnExecutionTimePredictor(BaseExecutionTimePredictor):
         if df is None:
             combined_str = f"{config_str}_{model_name}"
         else:
-            df_hash_str = hashlib.md5(df.to_json().encode("utf-8")).hexdigest()
+            # hashes the values column by column instead of serializing the df
+            df_hash = hashlib.md5(str(list(df.columns)).encode("utf-8"))
+            df_hash.update(pd.util.hash_pandas_object(df).values.tobytes())
+            df_hash_str = df_hash.hexdigest()
             combined_str = f"{config_str}_{model_name}_{df_hash_str}"
 
         return hashlib.md5(combined_str.encode("utf-8")).hexdigest()[0:8]
 
+    def _get_training_input_files(self) -> List[str]:
+        input_files = [self._compute_input_file, self._attention_input_file]
+        if self._replica_config.num_pipeline_stages > 1:
+            input_files.append(self._send_recv_input_file)
+        if self._replica_config.tensor_parallel_size > 1:
+            input_files.append(self._all_reduce_input_file)
+        if not self._config.skip_cpu_overhead_modeling:
+            input_files.append(self._cpu_overhead_input_file)
+
+        return input_files
+
+    def _get_input_fingerprint(self) -> str:
+        # the models are fully determined by the config and the raw bytes of the
+        # profiling data they are trained on
+        fingerprint = hashlib.md5(str(self.to_dict()).encode("utf-8"))
+        for input_file in self._get_training_input_files():
+            with open(input_file, "rb") as f:
+                fingerprint.update(f.read())
+
+        return fingerprint.hexdigest()[0:8]
+
+    def _load_models_from_index(
+        self, input_fingerprint: str
+    ) -> Optional[Dict[str, BaseEstimator]]:
+        with InterProcessReaderWriterLock(
+            f"{self._cache_dir}/{input_fingerprint}_index_lock.file"
+        ).read_lock():
+            if self._config.no_cache:
+                return
+            index_file = f"{self._cache_dir}/{input_fingerprint}_model_hashes.json"
+            if not os.path.exists(index_file):
+                return
+
+            with open(index_file) as f:
+                model_hashes = json.load(f)
+
+        models = {}
+        for model_name, model_hash in model_hashes.items():
+            model = self._load_model_from_cache(model_name, model_hash)
+            if not model:
+                return
+            models[model_name] = model
+
+        logger.debug(f"Found models of input fingerprint {input_fingerprint} in cache")
+        self._model_hashes = model_hashes
+
+        return models
+
+    def _store_model_index(self, input_fingerprint: str) -> None:
+        with InterProcessReaderWriterLock(
+            f"{self._cache_dir}/{input_fingerprint}_index_lock.file"
+        ).write_lock():
+            index_file = f"{self._cache_dir}/{input_fingerprint}_model_hashes.json"
+            with open(index_file, "w") as f:
+                json.dump(self._model_hashes, f)
+
     def _load_model_from_cache(self, model_name: str, model_hash: str) -> BaseEstimator:
         with InterProcessReaderWriterLock(
             f"{self._cache_dir}/{model_hash}_model_lock.file"
@@ -334,47 +468,44 @@ class SklearnExecutionTimePredictor(BaseExecutionTimePredictor):
             index=False,
         )
 
-    def _train_model(
-        self,
-        model_name: str,
-        df: pd.DataFrame,
-        feature_cols: List[str],
-        target_col: str,
-    ) -> BaseEstimator:
+    def _load_trained_model(
+        self, model_name: str, df: pd.DataFrame
+    ) -> Tuple[str, BaseEstimator]:
         if len(df) == 0:
             raise Exception(f"Training data for model {model_name} is empty")
 
         model_hash = self._get_model_hash(model_name, df)
+        self._model_hashes[model_name] = model_hash
 
-        cached_model = self._load_model_from_cache(model_name, model_hash)
-        if cached_model:
-            return cached_model
-
-        model = self._get_estimator()
-        grid_search_params = self._get_grid_search_params()
+        return model_hash, self._load_model_from_cache(model_name, model_hash)
 
-        if len(df) < self._config.k_fold_cv_splits:
+    def _get_grid_search(self, num_samples: int, n_jobs: int) -> GridSearchCV:
+        if num_samples < self._config.k_fold_cv_splits:
             cv = 2
         else:
             cv = self._config.k_fold_cv_splits
 
-        grid_search = GridSearchCV(
-            estimator=model,
-            param_grid=grid_search_params,
+        return GridSearchCV(
+            estimator=self._get_estimator(),
+            param_grid=self._get_grid_search_params(),
             scoring=self._get_scorer(),
             cv=cv,
-            n_jobs=self._config.num_training_job_threads,
+            n_jobs=n_jobs,
         )
 
-        # we don't create a train/test split, because we want to use all data for training
-        # and we don't care about overfitting, because we only want to predict execution time within the same domain
-        X, y = df[feature_cols], df[target_col]
-
-        grid_search.fit(X, y)
-        score = grid_search.score(X, y)
-
+    def _on_model_trained(
+        self,
+        model_name: str,
+        model_hash: str,
+        df: pd.DataFrame,
+        feature_cols: List[str],
+        target_col: str,
+        grid_search: GridSearchCV,
+        score: float,
+        wall_time: float,
+    ) -> BaseEstimator:
         logger.info(
-            f"Trained model {model_name} and found best parameters: {grid_search.best_params_} "
+            f"Trained model {model_name} in {wall_time:.2f}s and found best parameters: {grid_search.best_params_} "
             f"with mean absolute percentage error (MEAP) {-score}%"
         )
 
@@ -390,34 +521,127 @@ class SklearnExecutionTimePredictor(BaseExecutionTimePredictor):
         )
         return grid_search.best_estimator_
 
-    def _store_model_predication_cache(
-        self, model_name: str, model_hash: str, predictions: Dict[Tuple, float]
-    ) -> None:
-        with InterProcessReaderWriterLock(
-            f"{self._cache_dir}/{model_hash}_prediction_lock.file"
-        ).write_lock():
-            cache_file = f"{self._cache_dir}/{model_name}_{model_hash}_predictions.pkl"
-            pickle.dump(
-                predictions, open(cache_file, "wb"), protocol=pickle.HIGHEST_PROTOCOL
+    def _train_model(
+        self,
+        model_name: str,
+        df: pd.DataFrame,
+        feature_cols: List[str],
+        target_col: str,
+    ) -> BaseEstimator:
+        model_hash, cached_model = self._load_trained_model(model_name, df)
+        if cached_model:
+            return cached_model
+
+        grid_search = self._get_grid_search(
+            len(df), self._config.num_training_job_threads
+        )
+
+        # we don't create a train/test split, because we want to use all data for training
+        # and we don't care about overfitting, because we only want to predict execution time within the same domain
+        return self._on_model_trained(
+            model_name,
+            model_hash,
+            df,
+            feature_cols,
+            target_col,
+            *fit_grid_search(grid_search, df[feature_cols], df[target_col]),
+        )
+
+    def _train_models_in_parallel(
+        self, training_data: List[Tuple[str, pd.DataFrame, List[str], str]]
+    ) -> Dict[str, BaseEstimator]:
+        models = {}
+        pending_training_data = []
+        for model_name, df, feature_cols, target_col in training_data:
+            model_hash, cached_model = self._load_trained_model(model_name, df)
+            if cached_model:
+                models[model_name] = cached_model
+            else:
+                pending_training_data.append(
+                    (model_name, model_hash, df, feature_cols, target_col)
+                )
+
+        if not pending_training_data:
+            return models
+
+        # the models are trained in parallel instead of the folds of a grid search. The
+        # largest models are submitted first and every idle worker picks up the next
+        # pending model, so the small models fill in around the large ones
+        pending_training_data.sort(key=lambda data: len(data[2]), reverse=True)
+
+        with ProcessPoolExecutor(
+            max_workers=self._config.num_training_processes
+        ) as executor:
+            futures = {
+                executor.submit(
+                    fit_grid_search,
+                    self._get_grid_search(len(df), n_jobs=1),
+                    df[feature_cols],
+                    df[target_col],
+                ): (model_name, model_hash, df, feature_cols, target_col)
+                for model_name, model_hash, df, feature_cols, target_col in pending_training_data
+            }
+            for future in as_completed(futures):
+                model_name, model_hash, df, feature_cols, target_col = futures[future]
+                models[model_name] = self._on_model_trained(
+                    model_name,
+                    model_hash,
+                    df,
+                    feature_cols,
+                    target_col,
+                    *future.result(),
+                )
+
+        return models
+
+    def _get_prediction_tables_hash(self) -> str:
+        # the tables are derived from the trained models and the prediction grid
+        tables_str = str(
+            (
+                self.to_dict(),
+                sorted(self._model_hashes.items()),
+                self._model_config.post_attn_norm,
+                self._config.kv_cache_prediction_granularity,
+                self._config.prediction_max_tokens_per_request,
+                self._attention_decode_batching_overhead_fraction,
+                self._get_nccl_cpu_overhead(),
             )
+        )
+        return hashlib.md5(tables_str.encode("utf-8")).hexdigest()[0:8]
 
-    def _load_model_predication_cache(
-        self, model_name: str, model_hash: str
-    ) -> Dict[Tuple, float]:
+    def _load_prediction_tables_from_cache(self, tables_hash: str) -> bool:
         with InterProcessReaderWriterLock(
-            f"{self._cache_dir}/{model_hash}_prediction_lock.file"
+            f"{self._cache_dir}/{tables_hash}_prediction_lock.file"
         ).read_lock():
             if self._config.no_cache:
-                return
-            cache_file = f"{self._cache_dir}/{model_name}_{model_hash}_predictions.pkl"
+                return False
 
-            if not os.path.exists(cache_file):
-                return
+            cache_files = {
+                table_name: f"{self._cache_dir}/{table_name}_{tables_hash}.npy"
+                for table_name in PREDICTION_TABLES
+            }
+            if not all(
+                os.path.exists(cache_file) for cache_file in cache_files.values()
+            ):
+                return False
+
+            logger.debug(f"Found prediction tables {tables_hash} in cache")
 
-            logger.debug(f"Found model {model_name} predictions in cache")
+            # the tables are memory mapped read-only, all simulations on a node share
+            # the page cached copy
+            for table_name, cache_file in cache_files.items():
+                table = np.load(cache_file, mmap_mode="r")
+                setattr(self, f"_{table_name}", table.view(np.ndarray))
 
-            predictions = pickle.load(open(cache_file, "rb"))
-            return predictions
+            return True
+
+    def _store_prediction_tables_in_cache(self, tables_hash: str) -> None:
+        with InterProcessReaderWriterLock(
+            f"{self._cache_dir}/{tables_hash}_prediction_lock.file"
+        ).write_lock():
+            for table_name in PREDICTION_TABLES:
+                cache_file = f"{self._cache_dir}/{table_name}_{tables_hash}.npy"
+                np.save(cache_file, getattr(self, f"_{table_name}"))
 
     def _get_model_prediction(
         self, model_name: str, model: BaseEstimator, X: pd.DataFrame
@@ -426,20 +650,13 @@ class SklearnExecutionTimePredictor(BaseExecutionTimePredictor):
 
         model_hash = self._get_model_hash(model, df=None)
 
-        cached_predictions = self._load_model_predication_cache(model_name, model_hash)
-        if cached_predictions:
-            return cached_predictions
-
         logger.info(f"Predicting execution time for model {model_name}")
 
         predictions_array = model.predict(X)
 
-        # turn this into a dict, so we can store use it as a cache
-        # the key is tuple for each row of X
+        # turn this into a dict, the key is tuple for each row of X
         predictions = dict(zip([tuple(x) for x in X.values], predictions_array))
 
-        self._store_model_predication_cache(model_name, model_hash, predictions)
-
         X["prediction"] = predictions_array
         X.to_csv(
             f"{self._cache_dir}/{model_name}_{model_hash}_predictions.csv",
@@ -448,11 +665,13 @@ class SklearnExecutionTimePredictor(BaseExecutionTimePredictor):
 
         return predictions
 
-    def _train_compute_models(self) -> Dict[str, BaseEstimator]:
+    def _get_compute_training_data(
+        self,
+    ) -> List[Tuple[str, pd.DataFrame, List[str], str]]:
         compute_df = self._load_compute_df(self._compute_input_file)
         compute_df = self._get_compute_df_with_derived_features(compute_df)
 
-        models = {}
+        training_data = []
         model_names = [
             "attn_pre_proj",
             "attn_post_proj",
@@ -469,11 +688,13 @@ class SklearnExecutionTimePredictor(BaseExecutionTimePredictor):
             logger.debug(
                 f"Training model {model_name}, size of training data: {len(compute_df)}"
             )
-            models[model_name] = self._train_model(
-                model_name=model_name,
-                df=compute_df,
-                feature_cols=["num_tokens"],
-                target_col=f"time_stats.{model_name}.median",
+            training_data.append(
+                (
+                    model_name,
+                    compute_df,
+                    ["num_tokens"],
+                    f"time_stats.{model_name}.median",
+                )
             )
 
         attention_df = self._load_attention_df(self._attention_input_file)
@@ -484,42 +705,50 @@ class SklearnExecutionTimePredictor(BaseExecutionTimePredictor):
         ]
 
         for model_name in model_names:
-            models[model_name] = self._train_model(
-                model_name=model_name,
-                df=attention_df,
-                feature_cols=["num_tokens"],
-                target_col=f"time_stats.{model_name}.median",
+            training_data.append(
+                (
+                    model_name,
+                    attention_df,
+                    ["num_tokens"],
+                    f"time_stats.{model_name}.median",
+                )
             )
 
         if self._replica_config.num_pipeline_stages > 1:
             send_recv_df = self._load_send_recv_df(self._send_recv_input_file)
             send_recv_df = self._get_send_recv_df_with_derived_features(send_recv_df)
 
-            models["send_recv"] = self._train_model(
-                model_name="send_recv",
-                df=send_recv_df,
-                feature_cols=["num_tokens"],
-                target_col="time_stats.send_recv.median",
+            training_data.append(
+                (
+                    "send_recv",
+                    send_recv_df,
+                    ["num_tokens"],
+                    "time_stats.send_recv.median",
+                )
             )
 
         if self._replica_config.tensor_parallel_size > 1:
             all_reduce_df = self._load_all_reduce_df(self._all_reduce_input_file)
             all_reduce_df = self._get_all_reduce_df_with_derived_features(all_reduce_df)
 
-            models["all_reduce"] = self._train_model(
-                model_name="all_reduce",
-                df=all_reduce_df,
-                feature_cols=["num_tokens"],
-                target_col="time_stats.all_reduce.median",
+            training_data.append(
+                (
+                    "all_reduce",
+                    all_reduce_df,
+                    ["num_tokens"],
+                    "time_stats.all_reduce.median",
+                )
             )
 
-        return models
+        return training_data
 
-    def _train_cpu_overhead_models(self) -> Dict[str, BaseEstimator]:
+    def _get_cpu_overhead_training_data(
+        self,
+    ) -> List[Tuple[str, pd.DataFrame, List[str], str]]:
         if self._config.skip_cpu_overhead_modeling:
-            return {}
+            return []
 
-        models = {}
+        training_data = []
         model_names = [
             "schedule",
             "sampler_e2e",
@@ -539,22 +768,21 @@ class SklearnExecutionTimePredictor(BaseExecutionTimePredictor):
             else:
                 target_col = f"{model_name}_median"
 
-            models[model_name] = self._train_model(
-                model_name=model_name,
-                df=cpu_overhead_df,
-                feature_cols=["batch_size"],
-                target_col=target_col,
+            training_data.append(
+                (model_name, cpu_overhead_df, ["batch_size"], target_col)
             )
 
-        return models
+        return training_data
 
-    def _train_attention_layer_models(self) -> Dict[str, BaseEstimator]:
+    def _get_attention_layer_training_data(
+        self,
+    ) -> List[Tuple[str, pd.DataFrame, List[str], str]]:
         attention_df = self._load_attention_df(self._attention_input_file)
         attention_df = self._get_attention_df_with_derived_features(attention_df)
         prefill_df = attention_df[~attention_df["is_decode"]]
         decode_df = attention_df[attention_df["is_decode"]]
 
-        models = {}
+        training_data = []
 
         chunked_prefill_df = prefill_df[prefill_df["kv_cache_size"] > 0].copy()
         chunked_prefill_df["total_prefill_tokens"] = (
@@ -562,26 +790,52 @@ class SklearnExecutionTimePredictor(BaseExecutionTimePredictor):
             + chunked_prefill_df["prefill_chunk_size"]
         )
 
-        models["attn_prefill"] = self._train_model(
-            model_name="attn_prefill",
-            df=prefill_df,
-            feature_cols=["kv_cache_size", "prefill_chunk_size_squared"],
-            target_col="time_stats.attn_prefill.median",
+        training_data.append(
+            (
+                "attn_prefill",
+                prefill_df,
+                ["kv_cache_size", "prefill_chunk_size_squared"],
+                "time_stats.attn_prefill.median",
+            )
         )
 
-        models["attn_decode"] = self._train_model(
-            model_name="attn_decode",
-            df=decode_df,
-            feature_cols=["batch_size", "kv_cache_size"],
-            target_col="time_stats.attn_decode.median",
+        training_data.append(
+            (
+                "attn_decode",
+                decode_df,
+                ["batch_size", "kv_cache_size"],
+                "time_stats.attn_decode.median",
+            )
         )
 
-        return models
+        return training_data
 
     def _train_models(self) -> Dict[str, BaseEstimator]:
-        models = self._train_compute_models()
-        models.update(self._train_cpu_overhead_models())
-        models.update(self._train_attention_layer_models())
+        # with a warm cache the models are loaded without parsing the profiling data
+        input_fingerprint = self._get_input_fingerprint()
+        models = self._load_models_from_index(input_fingerprint)
+        if models:
+            return models
+
+        training_data = (
+            self._get_compute_training_data()
+            + self._get_cpu_overhead_training_data()
+            + self._get_attention_layer_training_data()
+        )
+
+        start_time = time.perf_counter()
+        if self._config.num_training_processes > 1:
+            models = self._train_models_in_parallel(training_data)
+        else:
+            models = {
+                model_name: self._train_model(model_name, df, feature_cols, target_col)
+                for model_name, df, feature_cols, target_col in training_data
+            }
+        logger.info(
+            f"Trained or loaded {len(models)} models in {time.perf_counter() - start_time:.2f}s"
+        )
+
+        self._store_model_index(input_fingerprint)
 
         return models
 
@@ -716,187 +970,457 @@ class SklearnExecutionTimePredictor(BaseExecutionTimePredictor):
         return predictions
 
     def _predict_from_models(self) -> Dict[str, Any]:
+        if self._config.lazy_prediction:
+            # the compute and attention models are predicted on first use
+            return self._predict_for_cpu_overhead_models()
+
         predictions = self._predict_for_compute_models()
         predictions.update(self._predict_for_cpu_overhead_models())
         predictions.update(self._predict_for_attention_layer_models())
 
         return predictions
 
-    def _get_batch_decode_attention_params(self, batch: Batch) -> Tuple[int, int]:
-        if hasattr(batch, "_decode_params"):
-            return batch._decode_params
+    def _init_prediction_tables(self) -> None:
+        if self._config.lazy_prediction:
+            self._compile_prediction_tables(self._predict_from_models())
+            return
+
+        tables_hash = self._get_prediction_tables_hash()
+        if self._load_prediction_tables_from_cache(tables_hash):
+            return
+
+        self._compile_prediction_tables(self._predict_from_models())
+        self._store_prediction_tables_in_cache(tables_hash)
+
+    def _get_dense_table(
+        self,
+        predictions: Optional[Dict[Tuple, float]],
+        shape: Tuple[int, ...],
+        key_scale: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+    ) -> np.ndarray:
+        # entries which have not been predicted (yet) are nan
+        table = np.full(shape, np.nan)
+        if not predictions:
+            return table
+
+        keys = np.array(list(predictions.keys()), dtype=np.int64)
+        if key_scale is not None:
+            keys = key_scale(keys)
+        table[tuple(keys.T)] = list(predictions.values())
+
+        return table
+
+    def _compile_prediction_tables(self, predictions: Dict[str, Any]) -> None:
+        # the predictions are looked up for every batch stage, they are gathered from
+        # dense arrays indexed by the batch features instead of dicts keyed by tuples
+        granularity = self._config.kv_cache_prediction_granularity
+
+        self._num_tokens_table = np.zeros(
+            (self._max_tokens + 1, len(NUM_TOKENS_MODELS))
+        )
+        for column, model_name in self._get_num_tokens_model_columns():
+            self._num_tokens_table[:, column] = self._get_dense_table(
+                predictions.get(model_name), (self._max_tokens + 1,)
+            )
+
+        if "all_reduce" in self._models:
+            self._num_tokens_table[
+                :, NUM_TOKENS_MODEL_COLUMNS["all_reduce"]
+            ] += self._get_nccl_cpu_overhead()
+
+        self._attn_kv_cache_save_table = self._get_dense_table(
+            predictions.get("attn_kv_cache_save"), (self._max_tokens + 1,)
+        )
+
+        self._batch_size_table = np.zeros(
+            (self._config.prediction_max_batch_size + 1, len(BATCH_SIZE_MODELS))
+        )
+        for column, model_name in enumerate(BATCH_SIZE_MODELS):
+            if model_name not in predictions:
+                continue
+            self._batch_size_table[:, column] = self._get_dense_table(
+                predictions[model_name], (self._config.prediction_max_batch_size + 1,)
+            )
+
+        num_kv_cache_buckets = (
+            self._config.prediction_max_tokens_per_request // granularity + 1
+        )
+
+        def decode_key_scale(keys: np.ndarray) -> np.ndarray:
+            # (batch size, kv cache size)
+            keys[:, 1] //= granularity
+            return keys
+
+        self._attn_decode_table = self._get_dense_table(
+            predictions.get("attn_decode"),
+            (self._config.prediction_max_batch_size + 1, num_kv_cache_buckets),
+            decode_key_scale,
+        )
+        self._attn_decode_table[2:] *= (
+            1 + self._attention_decode_batching_overhead_fraction
+        )
+
+        def prefill_key_scale(keys: np.ndarray) -> np.ndarray:
+            # (kv cache size, prefill chunk size squared)
+            keys[:, 0] //= granularity
+            keys[:, 1] = np.rint(np.sqrt(keys[:, 1]))
+            return keys
+
+        self._attn_prefill_table = self._get_dense_table(
+            predictions.get("attn_prefill"),
+            (num_kv_cache_buckets, self._config.prediction_max_prefill_chunk_size + 1),
+            prefill_key_scale,
+        )
+
+    def _get_num_tokens_model_columns(self) -> List[Tuple[int, str]]:
+        # the columns of models which are not trained (without tensor or pipeline
+        # parallelism) or not used (without post attention norm) stay zero
+        return [
+            (column, model_name)
+            for column, model_name in enumerate(NUM_TOKENS_MODELS)
+            if model_name in self._models
+            and (
+                model_name != "post_attention_layernorm"
+                or self._model_config.post_attn_norm
+            )
+        ]
+
+    def _get_nccl_cpu_overhead(self) -> float:
+        return (
+            self._config.nccl_cpu_launch_overhead_ms
+            + self._config.nccl_cpu_skew_overhead_per_device_ms
+            * self._replica_config.tensor_parallel_size ** 1.25
+        )
+
+    def _get_prediction_tile(
+        self, index: int, min_value: int, max_value: int
+    ) -> np.ndarray:
+        # the range of PREDICTION_TILE_SIZE values around the index, clipped to the
+        # predicted range
+        start = index // PREDICTION_TILE_SIZE * PREDICTION_TILE_SIZE
+        return np.arange(
+            max(start, min_value), min(start + PREDICTION_TILE_SIZE, max_value + 1)
+        )
+
+    def _predict_num_tokens_tile(self, num_tokens: int) -> None:
+        num_token_range = self._get_prediction_tile(num_tokens, 1, self._max_tokens)
+        X = pd.DataFrame({"num_tokens": num_token_range})
+
+        for column, model_name in self._get_num_tokens_model_columns():
+            self._num_tokens_table[num_token_range, column] = self._models[
+                model_name
+            ].predict(X)
 
-        decode_kv_cache_sizes = []
+        if "all_reduce" in self._models:
+            self._num_tokens_table[
+                num_token_range, NUM_TOKENS_MODEL_COLUMNS["all_reduce"]
+            ] += self._get_nccl_cpu_overhead()
 
-        for request in batch.requests:
-            if request._is_prefill_complete:
-                decode_kv_cache_sizes.append(request.num_processed_tokens)
+        self._attn_kv_cache_save_table[num_token_range] = self._models[
+            "attn_kv_cache_save"
+        ].predict(X)
 
-        if not decode_kv_cache_sizes:
-            batch._decode_params = (0, 0)
+    def _predict_attention_decode_row(self, decode_batch_size: int) -> None:
+        kv_cache_size_range = np.arange(
+            0,
+            self._config.prediction_max_tokens_per_request + 1,
+            self._config.kv_cache_prediction_granularity,
+        )
+        X = pd.DataFrame(
+            {"batch_size": decode_batch_size, "kv_cache_size": kv_cache_size_range}
+        )
+
+        predictions = self._models["attn_decode"].predict(X)
+        if decode_batch_size > 1:
+            predictions *= 1 + self._attention_decode_batching_overhead_fraction
+        self._attn_decode_table[decode_batch_size] = predictions
+
+    def _predict_attention_prefill_tile(
+        self, kv_cache_bucket: int, prefill_chunk_size: int
+    ) -> None:
+        prefill_chunk_size_range = self._get_prediction_tile(
+            prefill_chunk_size, 1, self._config.prediction_max_prefill_chunk_size
+        )
+        X = pd.DataFrame(
+            {
+                "kv_cache_size": kv_cache_bucket
+                * self._config.kv_cache_prediction_granularity,
+                "prefill_chunk_size_squared": prefill_chunk_size_range**2,
+            }
+        )
+
+        self._attn_prefill_table[kv_cache_bucket, prefill_chunk_size_range] = (
+            self._models["attn_prefill"].predict(X)
+        )
+
+    def _get_num_tokens_predictions(self, num_tokens: int) -> List[float]:
+        predictions = self._num_tokens_table[num_tokens].tolist()
+        if math.isnan(predictions[0]):
+            self._predict_num_tokens_tile(num_tokens)
+            predictions = self._num_tokens_table[num_tokens].tolist()
+
+        return predictions
+
+    def _get_batch_decode_attention_params(
+        self, batch: Batch
+    ) -> Tuple[int, Tuple[int, ...]]:
+        # the decode batch size and the kv cache buckets (kv cache sizes rounded up to
+        # the prediction granularity) the decode attention time is averaged over
+        if batch._decode_params is not None:
+            return batch._decode_params
+
+        features = batch.features
+        if not features.num_decodes:
+            batch._decode_params = (0, ())
             return batch._decode_params
 
-        decode_batch_size = len(decode_kv_cache_sizes)
-        decode_avg_kv_cache_size = int(np.mean(decode_kv_cache_sizes))
+        decode_batch_size = features.num_decodes
+        granularity = self._config.kv_cache_prediction_granularity
         decode_avg_kv_cache_size = (
-            (
-                decode_avg_kv_cache_size
-                + self._config.kv_cache_prediction_granularity
-                - 1
+            features.decode_kv_cache_size_sum // decode_batch_size
+        )
+        kv_cache_buckets = (
+            (decode_avg_kv_cache_size + granularity - 1) // granularity,
+        )
+        if self._config.per_request_decode_attention:
+            # the mean of the per-request predictions is approximated by the mean of
+            # the predictions one standard deviation below and above the mean kv cache
+            # size, which is exact for costs up to quadratic in the kv cache size
+            mean = features.decode_kv_cache_size_sum / decode_batch_size
+            variance = (
+                features.decode_kv_cache_size_sq_sum / decode_batch_size - mean * mean
             )
-            // self._config.kv_cache_prediction_granularity
-        ) * self._config.kv_cache_prediction_granularity
+            std = math.sqrt(max(variance, 0))
+            low_kv_cache_bucket = math.ceil(max(mean - std, 0) / granularity)
+            high_kv_cache_bucket = min(
+                math.ceil((mean + std) / granularity),
+                self._attn_decode_table.shape[1] - 1,
+            )
+            if low_kv_cache_bucket != high_kv_cache_bucket:
+                kv_cache_buckets = (low_kv_cache_bucket, high_kv_cache_bucket)
 
-        batch._decode_params = (decode_batch_size, decode_avg_kv_cache_size)
+        batch._decode_params = (decode_batch_size, kv_cache_buckets)
 
         return batch._decode_params
 
     def _get_batch_prefill_attention_params(
         self, batch: Batch
     ) -> List[Tuple[int, int]]:
-        if hasattr(batch, "_prefill_params"):
+        if batch._prefill_params is not None:
             return batch._prefill_params
 
-        prefill_params = []
+        granularity = self._config.kv_cache_prediction_granularity
+        prefill_params = [
+            (
+                (kv_cache_size + granularity - 1) // granularity * granularity,
+                prefill_chunk_size,
+            )
+            for kv_cache_size, prefill_chunk_size in batch.features.prefill_chunks
+        ]
 
-        for request, num_tokens_to_process in zip(batch.requests, batch.num_tokens):
-            if request._is_prefill_complete:
-                continue
+        batch._prefill_params = prefill_params
 
-            prefill_chunk_size = num_tokens_to_process
-            kv_cache_size = (
-                (
-                    request.num_processed_tokens
-                    + self._config.kv_cache_prediction_granularity
-                    - 1
-                )
-                // self._config.kv_cache_prediction_granularity
-            ) * self._config.kv_cache_prediction_granularity
+        return prefill_params
 
-            prefill_params.append((kv_cache_size, prefill_chunk_size))
+    def _get_batch_prefill_attention_features(
+        self, batch: Batch
+    ) -> Tuple[bool, int, int]:
+        # the prefills of a batch are predicted as a single prefill with the summed kv
+        # cache size and the root of the summed squared chunk sizes
+        prefill_params = self._get_batch_prefill_attention_params(batch)
 
-        batch._prefill_params = prefill_params
+        if len(prefill_params) == 0:
+            return False, 0, 0
 
-        return prefill_params
+        kv_cache_sizes, prefill_chunk_sizes = zip(*prefill_params)
+
+        agg_kv_cache_size = sum(kv_cache_sizes)
+        agg_prefill_chunk_size = sum([x ** 2 for x in prefill_chunk_sizes]) ** 0.5
+
+        return (
+            len(prefill_params) > 1,
+            agg_kv_cache_size,
+            round(agg_prefill_chunk_size),
+        )
+
+    def _get_batch_features(self, batch: Batch) -> Tuple:
+        return (
+            batch._total_num_tokens,
+            batch.size,
+            self._get_batch_decode_attention_params(batch),
+            self._get_batch_prefill_attention_features(batch),
+        )
+
+    def _get_execution_time(self, batch: Batch, pipeline_stage: int) -> ExecutionTime:
+        (
+            attention_rope_execution_time,
+            attention_layer_pre_proj_execution_time,
+            attention_layer_post_proj_execution_time,
+            mlp_layer_up_proj_execution_time,
+            mlp_layer_down_proj_execution_time,
+            mlp_layer_act_execution_time,
+            attn_norm_time,
+            mlp_norm_time,
+            add_time,
+            tensor_parallel_communication_time,
+            pipeline_parallel_communication_time,
+        ) = self._get_num_tokens_predictions(batch._total_num_tokens_rounded)
+
+        if pipeline_stage == self._replica_config.num_pipeline_stages - 1:
+            pipeline_parallel_communication_time = 0
+
+        return ExecutionTime(
+            self._num_layers_per_pipeline_stage,
+            attention_rope_execution_time,
+            self._get_attention_kv_cache_save_execution_time(batch),
+            self._get_attention_decode_execution_time(batch),
+            self._get_attention_prefill_execution_time(batch),
+            attention_layer_pre_proj_execution_time,
+            attention_layer_post_proj_execution_time,
+            mlp_layer_up_proj_execution_time,
+            mlp_layer_down_proj_execution_time,
+            mlp_layer_act_execution_time,
+            attn_norm_time,
+            mlp_norm_time,
+            add_time,
+            tensor_parallel_communication_time,
+            pipeline_parallel_communication_time,
+            *self._batch_size_table[batch.size].tolist(),
+        )
+
+    def _get_num_tokens_prediction(self, batch: Batch, model_name: str) -> float:
+        return self._get_num_tokens_predictions(batch._total_num_tokens_rounded)[
+            NUM_TOKENS_MODEL_COLUMNS[model_name]
+        ]
+
+    def _get_batch_size_prediction(self, batch: Batch, model_name: str) -> float:
+        return self._batch_size_table.item(
+            batch.size, BATCH_SIZE_MODEL_COLUMNS[model_name]
+        )
 
     def _get_attention_layer_pre_proj_execution_time(self, batch: Batch) -> float:
-        return self._predictions["attn_pre_proj"][(batch._total_num_tokens_rounded,)]
+        return self._get_num_tokens_prediction(batch, "attn_pre_proj")
 
     def _get_attention_layer_post_proj_execution_time(self, batch: Batch) -> float:
-        return self._predictions["attn_post_proj"][(batch._total_num_tokens_rounded,)]
+        return self._get_num_tokens_prediction(batch, "attn_post_proj")
 
     def _get_mlp_layer_up_proj_execution_time(self, batch: Batch) -> float:
-        return self._predictions["mlp_up_proj"][(batch._total_num_tokens_rounded,)]
+        return self._get_num_tokens_prediction(batch, "mlp_up_proj")
 
     def _get_mlp_layer_down_proj_execution_time(self, batch: Batch) -> float:
-        return self._predictions["mlp_down_proj"][(batch._total_num_tokens_rounded,)]
+        return self._get_num_tokens_prediction(batch, "mlp_down_proj")
 
     def _get_mlp_layer_act_execution_time(self, batch: Batch) -> float:
-        return self._predictions["mlp_act"][(batch._total_num_tokens_rounded,)]
+        return self._get_num_tokens_prediction(batch, "mlp_act")
 
     def _get_attn_norm_layer_act_execution_time(self, batch: Batch) -> float:
-        return self._predictions["input_layernorm"][(batch._total_num_tokens_rounded,)]
+        return self._get_num_tokens_prediction(batch, "input_layernorm")
 
     def _get_mlp_norm_layer_act_execution_time(self, batch: Batch) -> float:
-        if not self._model_config.post_attn_norm:
-            return 0
-
-        return self._predictions["post_attention_layernorm"][
-            (batch._total_num_tokens_rounded,)
-        ]
+        # zero without post attention norm
+        return self._get_num_tokens_prediction(batch, "post_attention_layernorm")
 
     def _get_add_layer_act_execution_time(self, batch: Batch) -> float:
-        return self._predictions["add"][(batch._total_num_tokens_rounded,)]
+        return self._get_num_tokens_prediction(batch, "add")
 
     def _get_tensor_parallel_communication_time(self, batch: Batch) -> float:
-        return (
-            self._predictions["all_reduce"][(batch._total_num_tokens_rounded,)]
-            + self._config.nccl_cpu_launch_overhead_ms
-            + self._config.nccl_cpu_skew_overhead_per_device_ms
-            * self._replica_config.tensor_parallel_size ** 1.25
-        )
+        # includes the nccl cpu overheads
+        return self._get_num_tokens_prediction(batch, "all_reduce")
 
     def _get_pipeline_parallel_communication_time(self, batch: Batch) -> float:
-        try:
-            return self._predictions["send_recv"][(batch._total_num_tokens_rounded,)]
-        except KeyError as e:
-            logger.error(f"Failed to get send_recv prediction for batch {batch}")
-            raise e
+        return self._get_num_tokens_prediction(batch, "send_recv")
 
     def _get_attention_rope_execution_time(self, batch: Batch) -> float:
-        return self._predictions["attn_rope"][(batch._total_num_tokens_rounded,)]
+        return self._get_num_tokens_prediction(batch, "attn_rope")
 
     def _get_attention_kv_cache_save_execution_time(self, batch: Batch) -> float:
         # don't use round up to the nearest multiple of 8 here, because we want to
         # predict the execution time for the exact number of tokens
-        num_tokens = sum(batch.num_tokens)
+        prediction = self._attn_kv_cache_save_table.item(batch._total_num_tokens)
+        if math.isnan(prediction):
+            self._predict_num_tokens_tile(batch._total_num_tokens)
+            prediction = self._attn_kv_cache_save_table.item(batch._total_num_tokens)
 
-        return self._predictions["attn_kv_cache_save"][(num_tokens,)]
+        return prediction
 
     def _get_attention_decode_execution_time(self, batch: Batch) -> float:
         (
             decode_batch_size,
-            decode_avg_kv_cache_size,
+            kv_cache_buckets,
         ) = self._get_batch_decode_attention_params(batch)
         if decode_batch_size == 0:
             return 0
 
-        return self._predictions["attn_decode"][
-            (decode_batch_size, decode_avg_kv_cache_size)
-        ] * (
-            1
-            + self._attention_decode_batching_overhead_fraction
-            * int(decode_batch_size > 1)
+        # the mean of the predictions for a batch of this size over the kv cache
+        # buckets, the predictions include the batching overhead
+        prediction = self._get_mean_decode_prediction(
+            decode_batch_size, kv_cache_buckets
         )
+        if math.isnan(prediction):
+            self._predict_attention_decode_row(decode_batch_size)
+            prediction = self._get_mean_decode_prediction(
+                decode_batch_size, kv_cache_buckets
+            )
+
+        return prediction
+
+    def _get_mean_decode_prediction(
+        self, decode_batch_size: int, kv_cache_buckets: Tuple[int, ...]
+    ) -> float:
+        if len(kv_cache_buckets) == 1:
+            return self._attn_decode_table.item(decode_batch_size, kv_cache_buckets[0])
+
+        low_kv_cache_bucket, high_kv_cache_bucket = kv_cache_buckets
+        return (
+            self._attn_decode_table.item(decode_batch_size, low_kv_cache_bucket)
+            + self._attn_decode_table.item(decode_batch_size, high_kv_cache_bucket)
+        ) / 2
 
     def _get_attention_prefill_execution_time(self, batch: Batch) -> float:
-        prefill_params = self._get_batch_prefill_attention_params(batch)
+        (
+            is_batched_prefill,
+            agg_kv_cache_size,
+            agg_prefill_chunk_size,
+        ) = self._get_batch_prefill_attention_features(batch)
 
-        if len(prefill_params) == 0:
+        if agg_prefill_chunk_size == 0:
             return 0
 
-        kv_cache_sizes, prefill_chunk_sizes = zip(*prefill_params)
-
-        agg_kv_cache_size = sum(kv_cache_sizes)
-        agg_prefill_chunk_size = sum([x ** 2 for x in prefill_chunk_sizes]) ** 0.5
+        kv_cache_bucket = (
+            agg_kv_cache_size // self._config.kv_cache_prediction_granularity
+        )
+        prediction = self._attn_prefill_table.item(
+            kv_cache_bucket, agg_prefill_chunk_size
+        )
+        if math.isnan(prediction):
+            self._predict_attention_prefill_tile(
+                kv_cache_bucket, agg_prefill_chunk_size
+            )
+            prediction = self._attn_prefill_table.item(
+                kv_cache_bucket, agg_prefill_chunk_size
+            )
 
-        return self._predictions["attn_prefill"][
-            (agg_kv_cache_size, round(agg_prefill_chunk_size) ** 2)
-        ] * (
+        return prediction * (
             1
             + self._attention_prefill_batching_overhead_fraction
-            * int(len(prefill_params) > 1)
+            * int(is_batched_prefill)
         )
 
     def _get_schedule_time(self, batch: Batch) -> float:
-        if self._config.skip_cpu_overhead_modeling:
-            return 0
-
-        return self._predictions["schedule"][(batch.size,)]
+        # zero when the cpu overheads are not modeled
+        return self._get_batch_size_prediction(batch, "schedule")
 
     def _get_sampler_e2e_time(self, batch: Batch) -> float:
-        if self._config.skip_cpu_overhead_modeling:
-            return 0
-
-        return self._predictions["sampler_e2e"][(batch.size,)]
+        return self._get_batch_size_prediction(batch, "sampler_e2e")
 
     def _get_prepare_inputs_e2e_time(self, batch: Batch) -> float:
-        if self._config.skip_cpu_overhead_modeling:
-            return 0
-
-        return self._predictions["prepare_inputs_e2e"][(batch.size,)]
+        return self._get_batch_size_prediction(batch, "prepare_inputs_e2e")
 
     def _get_process_model_outputs_time(self, batch: Batch) -> float:
-        if self._config.skip_cpu_overhead_modeling:
-            return 0
-
-        return self._predictions["process_model_outputs"][(batch.size,)]
+        return self._get_batch_size_prediction(batch, "process_model_outputs")
 
     def _get_ray_comm_time(self, batch: Batch) -> float:
-        if self._config.skip_cpu_overhead_modeling:
-            return 0
-
-        return self._predictions["ray_comm_time"][(batch.size,)]
+        return self._get_batch_size_prediction(batch, "ray_comm_time")
 
     def to_dict(self) -> dict:
         return {
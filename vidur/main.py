@@ -1,4 +1,5 @@
 from vidur.config import SimulationConfig
+from vidur.sharded_simulator import ShardedSimulator
 from vidur.simulator import Simulator
 from vidur.utils.random import set_seeds
 
@@ -6,9 +7,16 @@ from vidur.utils.random import set_seeds
 def main() -> None:
     config: SimulationConfig = SimulationConfig.create_from_cli_args()
 
-    set_seeds(config.seed)
+    if config.resume_from:
+        # the checkpoint carries the config of the original run
+        simulator = Simulator.from_checkpoint(config.resume_from)
+    else:
+        set_seeds(config.seed)
+        if config.num_shards > 1:
+            simulator = ShardedSimulator(config)
+        else:
+            simulator = Simulator(config)
 
-    simulator = Simulator(config)
     simulator.run()
 
 
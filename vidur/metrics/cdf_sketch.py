@@ -36,6 +36,10 @@ class CDFSketch:
         self._last_data = data
         self._sketch.add(data)
 
+    # add the datapoints of another sketch
+    def merge(self, other: "CDFSketch") -> None:
+        self._sketch.merge(other._sketch)
+
     # add a new datapoint as an incremental (delta) update to
     # recently collected datapoint
     def put_delta(self, delta: float) -> None:
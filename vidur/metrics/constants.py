@@ -68,6 +68,12 @@ class RequestMetricsHistogram(enum.Enum):
     REQUEST_NUM_RESTARTS = "request_num_restarts"
 
 
+class RequestCensoringMetrics(enum.Enum):
+    # requests still in flight when a simulation is truncated at the time limit
+    REQUEST_CENSORED_TIME = "request_censored_time"
+    REQUEST_CENSORED_NUM_PROCESSED_TOKENS = "request_censored_num_processed_tokens"
+
+
 class BatchMetricsCountDistribution(enum.Enum):
     BATCH_NUM_TOKENS = "batch_num_tokens"
     BATCH_NUM_PREFILL_TOKENS = "batch_num_prefill_tokens"
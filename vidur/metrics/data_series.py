@@ -58,6 +58,20 @@ class DataSeries:
         self._last_data_y = data_y
         self._data_series.append((data_x, data_y))
 
+    # add a batch of x, y datapoints
+    def put_many(self, data_x: np.ndarray, data_y: np.ndarray) -> None:
+        if len(data_x) == 0:
+            return
+        self._data_series.extend(zip(data_x.tolist(), data_y.tolist()))
+        self._last_data_y = self._data_series[-1][1]
+
+    # add the datapoints of another data series, sorted by x if the series is ordered
+    def merge(self, other: "DataSeries", sort: bool = False) -> None:
+        self._data_series.extend(other._data_series)
+        if sort:
+            self._data_series.sort(key=lambda data_point: data_point[0])
+        self._last_data_y = self._data_series[-1][1] if len(self._data_series) else 0
+
     # get most recently collected y datapoint
     def _peek_y(self):
         return self._last_data_y
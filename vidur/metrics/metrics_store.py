@@ -2,12 +2,13 @@ import os
 from functools import reduce
 from typing import Dict, List
 
+import numpy as np
 import pandas as pd
 import plotly_express as px
 import wandb
 
 from vidur.config import SimulationConfig
-from vidur.entities import Batch, BatchStage, ExecutionTime, Request
+from vidur.entities import Batch, BatchStage, ExecutionTime, Request, RequestTable
 from vidur.logger import init_logger
 from vidur.metrics.cdf_sketch import CDFSketch
 from vidur.metrics.constants import (
@@ -16,6 +17,7 @@ from vidur.metrics.constants import (
     BatchMetricsTimeDistribution,
     CpuOperationMetrics,
     OperationMetrics,
+    RequestCensoringMetrics,
     RequestCompletionMetricsTimeSeries,
     RequestMetricsHistogram,
     RequestMetricsTimeDistributions,
@@ -101,6 +103,16 @@ class MetricsStore:
                 self._config.store_plots,
             )
 
+        self._request_censoring_metrics: Dict[RequestCensoringMetrics, DataSeries] = {}
+        for metric_name in RequestCensoringMetrics:
+            self._request_censoring_metrics[metric_name] = DataSeries(
+                REQUEST_ID_STR,
+                metric_name.value,
+                self._config.subsamples,
+                self._config.save_table_to_wandb,
+                self._config.store_plots,
+            )
+
         # Initialise batch metrics
         self._batch_metrics_count_distribution: Dict[
             BatchMetricsCountDistribution, CDFSketch
@@ -201,6 +213,9 @@ class MetricsStore:
                 self._config.store_plots,
             )
 
+        # per request scalars are only turned into data series at the end of the run
+        self._request_table = RequestTable() if self._config.use_request_table else None
+
         # per replica metrics
         self._replica_memory_usage = {}
         # per replica stage metrics
@@ -416,6 +431,28 @@ class MetricsStore:
         for dataseries in self._request_metrics_time_distributions.values():
             dataseries.plot_cdf(base_plot_path, dataseries._y_name, TIME_STR)
 
+    def _store_request_censoring_metrics(self, base_plot_path: str):
+        if not self._config.store_request_metrics:
+            return
+
+        # only written for simulations which were truncated with requests in flight
+        censored_time = self._request_censoring_metrics[
+            RequestCensoringMetrics.REQUEST_CENSORED_TIME
+        ]
+        if not len(censored_time):
+            return
+
+        self._save_as_csv(
+            dataseries_list=list(self._request_censoring_metrics.values()),
+            key_to_join=REQUEST_ID_STR,
+            base_path=self._config.output_dir,
+            file_name="request_censoring_metrics",
+        )
+
+        for dataseries in self._request_censoring_metrics.values():
+            y_axis_label = TIME_STR if dataseries is censored_time else COUNT_STR
+            dataseries.plot_cdf(base_plot_path, dataseries._y_name, y_axis_label)
+
     def _store_batch_metrics(self, base_plot_path: str):
         if not self._config.store_batch_metrics:
             return
@@ -529,7 +566,10 @@ class MetricsStore:
         dir_plot_path = f"{self._config.output_dir}/plots"
         os.makedirs(dir_plot_path, exist_ok=True)
 
+        self._flush_request_table()
+
         self._store_request_metrics(dir_plot_path)
+        self._store_request_censoring_metrics(dir_plot_path)
         self._store_batch_metrics(dir_plot_path)
         self._store_completion_metrics(dir_plot_path)
         self._store_operation_metrics(dir_plot_path)
@@ -541,6 +581,10 @@ class MetricsStore:
         if not self._config.store_request_metrics:
             return
 
+        if self._request_table is not None:
+            self._request_table.on_request_arrival(request)
+            return
+
         self._request_completion_metrics_time_series[
             RequestCompletionMetricsTimeSeries.REQUEST_ARRIVAL
         ].put(time, 1)
@@ -563,11 +607,27 @@ class MetricsStore:
             ].put(request.id, request.arrived_at - self._last_request_arrived_at)
         self._last_request_arrived_at = request.arrived_at
 
+    @if_write_metrics
+    def on_request_censored(self, time: float, request: Request) -> None:
+        if not self._config.store_request_metrics:
+            return
+
+        self._request_censoring_metrics[
+            RequestCensoringMetrics.REQUEST_CENSORED_TIME
+        ].put(request.id, time - request.arrived_at)
+        self._request_censoring_metrics[
+            RequestCensoringMetrics.REQUEST_CENSORED_NUM_PROCESSED_TOKENS
+        ].put(request.id, request.num_processed_tokens)
+
     @if_write_metrics
     def _on_request_end(self, time: float, request: Request) -> None:
         if not self._config.store_request_metrics:
             return
 
+        if self._request_table is not None:
+            self._request_table.on_request_end(request)
+            return
+
         self._request_completion_metrics_time_series[
             RequestCompletionMetricsTimeSeries.REQUEST_COMPLETION
         ].put(request.completed_at, 1)
@@ -631,6 +691,116 @@ class MetricsStore:
             RequestMetricsHistogram.REQUEST_NUM_RESTARTS
         ].put(request.id, request.num_restarts)
 
+    def _flush_request_table(self) -> None:
+        # vectorized counterpart of on_request_arrival and _on_request_end, the data
+        # series are filled in the order in which the requests arrived / completed
+        if self._request_table is None or not len(self._request_table):
+            return
+
+        table = self._request_table
+        self._request_table = RequestTable()
+
+        request_ids = table.request_ids
+
+        arrived = np.flatnonzero(table["arrived"])
+        arrived = arrived[np.argsort(table["arrival_order"][arrived])]
+        arrived_ids = request_ids[arrived]
+        arrived_at = table["arrived_at"][arrived]
+        prefill_tokens = table["arrival_num_prefill_tokens"][arrived]
+        decode_tokens = table["arrival_num_decode_tokens"][arrived]
+        inter_arrival_delay = table["inter_arrival_delay"][arrived]
+        has_inter_arrival_delay = ~np.isnan(inter_arrival_delay)
+
+        self._request_completion_metrics_time_series[
+            RequestCompletionMetricsTimeSeries.REQUEST_ARRIVAL
+        ].put_many(arrived_at, np.ones_like(arrived_ids))
+        self._request_metrics_histogram[
+            RequestMetricsHistogram.REQUEST_NUM_TOKENS
+        ].put_many(arrived_ids, prefill_tokens + decode_tokens)
+        self._request_metrics_histogram[
+            RequestMetricsHistogram.REQUEST_PREFILL_TOKENS
+        ].put_many(arrived_ids, prefill_tokens)
+        self._request_metrics_histogram[
+            RequestMetricsHistogram.REQUEST_DECODE_TOKENS
+        ].put_many(arrived_ids, decode_tokens)
+        self._request_metrics_histogram[
+            RequestMetricsHistogram.REQUEST_PD_RATIO
+        ].put_many(arrived_ids, prefill_tokens / decode_tokens)
+        self._request_metrics_histogram[
+            RequestMetricsHistogram.REQUEST_INTER_ARRIVAL_DELAY
+        ].put_many(
+            arrived_ids[has_inter_arrival_delay],
+            inter_arrival_delay[has_inter_arrival_delay],
+        )
+
+        completed = np.flatnonzero(table["completed"])
+        completed = completed[np.argsort(table["completion_order"][completed])]
+        completed_ids = request_ids[completed]
+        arrived_at = table["arrived_at"][completed]
+        prefill_tokens = table["num_prefill_tokens"][completed]
+        decode_tokens = table["num_decode_tokens"][completed]
+        scheduled_at = table["scheduled_at"][completed]
+        completed_at = table["completed_at"][completed]
+        prefill_completed_at = table["prefill_completed_at"][completed]
+        execution_time = table["execution_time"][completed]
+        model_execution_time = table["model_execution_time"][completed]
+        preempted_time = table["preempted_time"][completed]
+        scheduling_delay = table["scheduling_delay"][completed]
+        e2e_time = completed_at - arrived_at
+
+        self._request_completion_metrics_time_series[
+            RequestCompletionMetricsTimeSeries.REQUEST_COMPLETION
+        ].put_many(completed_at, np.ones_like(completed_ids))
+
+        self._request_metrics_time_distributions[
+            RequestMetricsTimeDistributions.REQUEST_E2E_TIME
+        ].put_many(completed_ids, e2e_time)
+        self._request_metrics_time_distributions[
+            RequestMetricsTimeDistributions.REQUEST_E2E_TIME_NORMALIZED
+        ].put_many(completed_ids, e2e_time / decode_tokens)
+        self._request_metrics_time_distributions[
+            RequestMetricsTimeDistributions.REQUEST_EXECUTION_TIME
+        ].put_many(completed_ids, execution_time)
+        self._request_metrics_time_distributions[
+            RequestMetricsTimeDistributions.REQUEST_EXECUTION_TIME_NORMALIZED
+        ].put_many(completed_ids, execution_time / decode_tokens)
+        self._request_metrics_time_distributions[
+            RequestMetricsTimeDistributions.REQUEST_MODEL_EXECUTION_TIME
+        ].put_many(completed_ids, model_execution_time)
+        self._request_metrics_time_distributions[
+            RequestMetricsTimeDistributions.REQUEST_MODEL_EXECUTION_TIME_NORMALIZED
+        ].put_many(completed_ids, model_execution_time / decode_tokens)
+        self._request_metrics_time_distributions[
+            RequestMetricsTimeDistributions.REQUEST_PREEMPTION_TIME
+        ].put_many(completed_ids, preempted_time)
+        self._request_metrics_time_distributions[
+            RequestMetricsTimeDistributions.REQUEST_SCHEDULING_DELAY
+        ].put_many(completed_ids, scheduling_delay)
+        self._request_metrics_time_distributions[
+            RequestMetricsTimeDistributions.REQUEST_EXECUTION_PLUS_PREEMPTION_TIME
+        ].put_many(completed_ids, execution_time + preempted_time)
+        self._request_metrics_time_distributions[
+            RequestMetricsTimeDistributions.REQUEST_EXECUTION_PLUS_PREEMPTION_TIME_NORMALIZED
+        ].put_many(completed_ids, (execution_time + preempted_time) / decode_tokens)
+        self._request_metrics_time_distributions[
+            RequestMetricsTimeDistributions.PREFILL_TIME_E2E
+        ].put_many(completed_ids, prefill_completed_at - arrived_at)
+        self._request_metrics_time_distributions[
+            RequestMetricsTimeDistributions.PREFILL_TIME_EXECUTION_PLUS_PREEMPTION
+        ].put_many(completed_ids, prefill_completed_at - scheduled_at)
+        self._request_metrics_time_distributions[
+            RequestMetricsTimeDistributions.PREFILL_TIME_EXECUTION_PLUS_PREEMPTION_NORMALIZED
+        ].put_many(
+            completed_ids, (prefill_completed_at - scheduled_at) / prefill_tokens
+        )
+        self._request_metrics_time_distributions[
+            RequestMetricsTimeDistributions.DECODE_TIME_EXECUTION_PLUS_PREEMPTION_NORMALIZED
+        ].put_many(completed_ids, (completed_at - prefill_completed_at) / decode_tokens)
+
+        self._request_metrics_histogram[
+            RequestMetricsHistogram.REQUEST_NUM_RESTARTS
+        ].put_many(completed_ids, table["num_restarts"][completed])
+
     def _update_per_token_execution_times(
         self, time: float, request: Request, batch: Batch
     ) -> None:
@@ -910,3 +1080,72 @@ class MetricsStore:
             self._replica_mfu[replica_id][stage_idx].put(0, 0)
 
         self._num_replicas += 1
+
+    def merge(self, other: "MetricsStore", replica_ids: List[int]) -> None:
+        # adds the metrics of a store which recorded a disjoint set of requests,
+        # batches and replicas, e.g. a simulation shard. Arrivals and autoscaling
+        # events are recorded by this store only.
+        merged_metrics = [
+            (
+                self._request_metrics_time_distributions,
+                other._request_metrics_time_distributions,
+            ),
+            (
+                self._token_metrics_time_distribution,
+                other._token_metrics_time_distribution,
+            ),
+            (self._request_metrics_histogram, other._request_metrics_histogram),
+            (self._request_censoring_metrics, other._request_censoring_metrics),
+            (
+                self._batch_metrics_count_distribution,
+                other._batch_metrics_count_distribution,
+            ),
+            (
+                self._batch_metrics_count_distribution_per_batch,
+                other._batch_metrics_count_distribution_per_batch,
+            ),
+            (
+                self._batch_metrics_time_distribution,
+                other._batch_metrics_time_distribution,
+            ),
+            (
+                self._batch_metrics_time_distribution_per_batch,
+                other._batch_metrics_time_distribution_per_batch,
+            ),
+            (self._operation_metrics, other._operation_metrics),
+            (self._operation_metrics_per_batch, other._operation_metrics_per_batch),
+            (self._cpu_operation_metrics, other._cpu_operation_metrics),
+            (
+                self._cpu_operation_metrics_per_batch,
+                other._cpu_operation_metrics_per_batch,
+            ),
+        ]
+        for metrics, other_metrics in merged_metrics:
+            for metric_name, metric in metrics.items():
+                metric.merge(other_metrics[metric_name])
+
+        # the time series are accumulated in time order
+        for metrics, other_metrics in [
+            (
+                self._request_completion_metrics_time_series,
+                other._request_completion_metrics_time_series,
+            ),
+            (
+                self._token_completion_metrics_time_series,
+                other._token_completion_metrics_time_series,
+            ),
+        ]:
+            for metric_name, metric in metrics.items():
+                metric.merge(other_metrics[metric_name], sort=True)
+
+        if self._request_table is not None:
+            self._request_table.merge_completions(other._request_table)
+
+        for replica_id in replica_ids:
+            if replica_id not in other._replica_memory_usage:
+                continue
+            self._replica_memory_usage[replica_id] = other._replica_memory_usage[
+                replica_id
+            ]
+            self._replica_busy_time[replica_id] = other._replica_busy_time[replica_id]
+            self._replica_mfu[replica_id] = other._replica_mfu[replica_id]
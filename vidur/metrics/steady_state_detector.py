@@ -0,0 +1,109 @@
+import math
+from collections import deque
+from typing import List, Optional
+
+import numpy as np
+from scipy.stats import t
+
+from vidur.config import SteadyStateDetectorConfig
+from vidur.entities import Request
+from vidur.types import SimulationStopReason
+
+
+class SteadyStateDetector:
+    """
+    Online convergence check on the stream of request scheduling delays. The tracked
+    quantile is estimated on the second half of the samples (the first half is
+    treated as warm-up). Scheduling delays are strongly autocorrelated, so the
+    confidence interval comes from the spread of the quantile over contiguous
+    batches of samples rather than from the samples themselves - a drifting quantile
+    widens the interval instead of hiding in it. The simulation has converged once
+    the interval is tight enough and the estimate stopped moving. A number of
+    in-flight requests which keeps growing from check to check means arrivals
+    outpace the cluster and the run is unstable.
+    """
+
+    def __init__(self, config: SteadyStateDetectorConfig) -> None:
+        self._config = config
+        self._t = t.ppf((1 + config.confidence) / 2, config.num_batches - 1)
+
+        self._scheduling_delays: List[float] = []
+        self._next_check = config.check_interval
+        self._num_in_flight_requests = deque(maxlen=config.unstable_num_checks + 1)
+
+        self._estimate = None
+        self._lower = None
+        self._upper = None
+
+    def on_requests_completed(self, requests: List[Request]) -> None:
+        for request in requests:
+            self._scheduling_delays.append(request.scheduling_delay)
+
+    def should_check(self) -> bool:
+        return len(self._scheduling_delays) >= self._next_check
+
+    def check(self, num_in_flight_requests: int) -> Optional[SimulationStopReason]:
+        num_samples = len(self._scheduling_delays)
+        # estimating the quantiles is linear in the number of samples, so the checks
+        # get sparser as the sample grows
+        self._next_check = num_samples + max(
+            self._config.check_interval, num_samples // 20
+        )
+
+        if num_samples < self._config.min_samples:
+            return None
+
+        self._num_in_flight_requests.append(num_in_flight_requests)
+        if self._is_unstable():
+            return SimulationStopReason.UNSTABLE
+
+        previous_estimate = self._estimate
+        self._update_estimate()
+
+        tolerance = max(
+            self._config.relative_tolerance * self._estimate,
+            self._config.absolute_tolerance,
+        )
+        if (
+            previous_estimate is not None
+            and (self._upper - self._lower) / 2 <= tolerance
+            and abs(self._estimate - previous_estimate) <= tolerance
+        ):
+            return SimulationStopReason.STEADY_STATE
+
+        return None
+
+    def _is_unstable(self) -> bool:
+        history = self._num_in_flight_requests
+        if len(history) < history.maxlen:
+            return False
+
+        return all(history[i] < history[i + 1] for i in range(len(history) - 1))
+
+    def _update_estimate(self) -> None:
+        samples = np.asarray(
+            self._scheduling_delays[len(self._scheduling_delays) // 2 :]
+        )
+        quantile = self._config.quantile
+        num_batches = self._config.num_batches
+
+        batch_quantiles = [
+            np.quantile(batch, quantile)
+            for batch in np.array_split(samples, num_batches)
+        ]
+        half_width = float(
+            self._t * np.std(batch_quantiles, ddof=1) / math.sqrt(num_batches)
+        )
+
+        self._estimate = float(np.quantile(samples, quantile))
+        self._lower = self._estimate - half_width
+        self._upper = self._estimate + half_width
+
+    def to_dict(self) -> dict:
+        return {
+            "quantile": self._config.quantile,
+            "num_samples": len(self._scheduling_delays),
+            "scheduling_delay_quantile": self._estimate,
+            "scheduling_delay_quantile_lower": self._lower,
+            "scheduling_delay_quantile_upper": self._upper,
+        }
@@ -1,6 +1,6 @@
 import json
 from abc import ABC, abstractmethod
-from typing import List
+from typing import Iterator, List
 
 from vidur.config import BaseRequestGeneratorConfig
 from vidur.entities import Request
@@ -17,3 +17,11 @@ class BaseRequestGenerator(ABC):
     def generate(self) -> List[Request]:
         requests = self.generate_requests()
         return requests
+
+    def stream(self) -> Iterator[Request]:
+        """
+        Yields requests in non-decreasing order of arrival time. Generators that can
+        produce requests incrementally should override this so that the simulator
+        does not need to materialize the whole workload upfront.
+        """
+        yield from self.generate()
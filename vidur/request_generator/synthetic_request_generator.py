@@ -1,4 +1,4 @@
-from typing import List
+from typing import Iterator, List
 
 from vidur.config import SyntheticRequestGeneratorConfig
 from vidur.entities import Request
@@ -48,38 +48,36 @@ class SyntheticRequestGenerator(BaseRequestGenerator):
             num_decode_tokens=int(decode_tokens),
         )
 
-    def _generate_requests(self) -> List[Request]:
-        requests = []
-
+    def _generate_requests_lazily(self) -> Iterator[Request]:
         current_time = 0
+        num_generated_requests = 0
 
-        # first priority is duration
-        if self.config.duration is not None:
-            while current_time < self.config.duration:
-                request = self._generate_next_request(current_time)
-                current_time = request.arrived_at
-                requests.append(request)
-        elif self.config.num_requests is not None:
-            for _ in range(self.config.num_requests):
-                request = self._generate_next_request(current_time)
-                current_time = request.arrived_at
-                requests.append(request)
-        else:
-            assert (
-                self.config.interval_generator_config.get_type()
-                == RequestIntervalGeneratorType.TRACE
-            )
-
-            while True:
-                request = self._generate_next_request(current_time)
-                if request is None:
+        while True:
+            # first priority is duration
+            if self.config.duration is not None:
+                if current_time >= self.config.duration:
                     break
-                current_time = request.arrived_at
-                requests.append(request)
+            elif self.config.num_requests is not None:
+                if num_generated_requests >= self.config.num_requests:
+                    break
+            else:
+                assert (
+                    self.config.interval_generator_config.get_type()
+                    == RequestIntervalGeneratorType.TRACE
+                )
 
-        return requests
+            request = self._generate_next_request(current_time)
+            if request is None:
+                break
 
-    def generate_requests(self) -> List[Request]:
+            current_time = request.arrived_at
+            num_generated_requests += 1
+            yield request
+
+    def _generate_requests(self) -> List[Request]:
+        return list(self._generate_requests_lazily())
+
+    def _validate_config(self) -> None:
         assert (
             self.config.duration
             or self.config.num_requests
@@ -87,6 +85,9 @@ class SyntheticRequestGenerator(BaseRequestGenerator):
             == RequestIntervalGeneratorType.TRACE
         )
 
+    def generate_requests(self) -> List[Request]:
+        self._validate_config()
+
         set_seeds(self.config.seed)
 
         requests = self._generate_requests()
@@ -102,3 +103,26 @@ class SyntheticRequestGenerator(BaseRequestGenerator):
             ]
 
         return requests
+
+    def stream(self) -> Iterator[Request]:
+        if (
+            self.config.interval_generator_config.get_type()
+            == RequestIntervalGeneratorType.TRACE
+        ):
+            # inter-request times read from a trace are not guaranteed to be
+            # non-negative, so we need to sort the whole workload upfront
+            yield from self.generate_requests()
+            return
+
+        self._validate_config()
+
+        set_seeds(self.config.seed)
+
+        # all other interval generators produce monotonically increasing arrivals
+        for request in self._generate_requests_lazily():
+            if (
+                self.config.duration is not None
+                and request.arrived_at >= self.config.duration
+            ):
+                return
+            yield request
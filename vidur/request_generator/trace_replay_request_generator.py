@@ -1,5 +1,5 @@
 import logging
-from typing import List
+from typing import Iterator, List
 
 import pandas as pd
 
@@ -61,6 +61,21 @@ class TraceReplayRequestGenerator(BaseRequestGenerator):
             <= config.max_tokens
         )
 
+        # requests that share a prompt prefix have the same (optional) prefix_id, the
+        # prefix can not be longer than the scaled prompt
+        if "prefix_id" in self.trace_df:
+            self.trace_df["prefix_id"] = self.trace_df["prefix_id"].astype(object)
+            self.trace_df.loc[self.trace_df["prefix_id"].isna(), "prefix_id"] = None
+            self.trace_df["num_prefix_tokens"] = (
+                (self.trace_df["num_prefix_tokens"] * config.prefill_scale_factor)
+                .fillna(0)
+                .astype(int)
+                .clip(lower=0, upper=self.trace_df["num_prefill_tokens"])
+            )
+        else:
+            self.trace_df["prefix_id"] = None
+            self.trace_df["num_prefix_tokens"] = 0
+
         # rescale the time to change QPS
         self.trace_df["arrived_at"] = (
             self.trace_df["arrived_at"] * config.time_scale_factor
@@ -77,16 +92,37 @@ class TraceReplayRequestGenerator(BaseRequestGenerator):
             f"Prompt/decode token ratio stats\n:{pd_ratio.describe(percentiles=[0.25, 0.5, 0.75, 0.9, 0.95, 0.99])}"
         )
 
-    def generate_requests(self) -> List[Request]:
-        requests = []
-
-        for _, row in self.trace_df.iterrows():
-            request = Request(
-                arrived_at=row["arrived_at"],
-                num_prefill_tokens=row["num_prefill_tokens"],
-                num_decode_tokens=row["num_decode_tokens"],
+    def _get_requests(self, trace_df: pd.DataFrame) -> Iterator[Request]:
+        for (
+            arrived_at,
+            num_prefill_tokens,
+            num_decode_tokens,
+            prefix_id,
+            num_prefix_tokens,
+        ) in trace_df[
+            [
+                "arrived_at",
+                "num_prefill_tokens",
+                "num_decode_tokens",
+                "prefix_id",
+                "num_prefix_tokens",
+            ]
+        ].itertuples(
+            index=False, name=None
+        ):
+            yield Request(
+                arrived_at=arrived_at,
+                num_prefill_tokens=num_prefill_tokens,
+                num_decode_tokens=num_decode_tokens,
+                prefix_id=prefix_id,
+                num_prefix_tokens=num_prefix_tokens,
             )
 
-            requests.append(request)
+    def stream(self) -> Iterator[Request]:
+        # stable sort so that requests with the same arrival time keep their trace order
+        yield from self._get_requests(
+            self.trace_df.sort_values("arrived_at", kind="stable")
+        )
 
-        return requests
+    def generate_requests(self) -> List[Request]:
+        return list(self._get_requests(self.trace_df))
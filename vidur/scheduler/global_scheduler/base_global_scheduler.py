@@ -1,29 +1,48 @@
 from abc import ABC, abstractmethod
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 from vidur.config import SimulationConfig
 from vidur.entities import Replica, Request
-from vidur.execution_time_predictor import ExecutionTimePredictorRegistry
+from vidur.execution_time_predictor import (
+    BaseExecutionTimePredictor,
+    ExecutionTimePredictorRegistry,
+)
 from vidur.scheduler.replica_scheduler.replica_scheduler_registry import (
     ReplicaSchedulerRegistry,
 )
+from vidur.scheduler.utils.kv_cache_transfer_time_predictor import (
+    KVCacheTransferTimePredictor,
+)
+from vidur.types import ReplicaRole
 
 
 class BaseGlobalScheduler(ABC):
-    def __init__(self, config: SimulationConfig, replicas: Dict[int, Replica]):
+    # whether schedule reads the state of the replica schedulers (e.g. their number
+    # of pending requests), the sharded simulator synchronizes the replica shards
+    # before every scheduling pass of such a scheduler
+    reads_replica_state = True
+
+    def __init__(
+        self,
+        config: SimulationConfig,
+        replicas: Dict[int, Replica],
+        execution_time_predictor: Optional[BaseExecutionTimePredictor] = None,
+    ):
         self._config = config
         self._replicas = replicas
         self._replicas_to_free = set()
 
         self._num_replicas = len(self._replicas)
 
-        self._execution_time_predictor = ExecutionTimePredictorRegistry.get(
-            config.execution_time_predictor_config.get_type(),
-            predictor_config=config.execution_time_predictor_config,
-            replica_config=config.cluster_config.replica_config,
-            replica_scheduler_config=config.cluster_config.replica_scheduler_config,
-            metrics_config=config.metrics_config,
-        )
+        if execution_time_predictor is None:
+            execution_time_predictor = ExecutionTimePredictorRegistry.get(
+                config.execution_time_predictor_config.get_type(),
+                predictor_config=config.execution_time_predictor_config,
+                replica_config=config.cluster_config.replica_config,
+                replica_scheduler_config=config.cluster_config.replica_scheduler_config,
+                metrics_config=config.metrics_config,
+            )
+        self._execution_time_predictor = execution_time_predictor
         self._replica_schedulers = {
             replica_id: ReplicaSchedulerRegistry.get(
                 config.cluster_config.replica_scheduler_config.get_type(),
@@ -38,6 +57,23 @@ class BaseGlobalScheduler(ABC):
         }
         self._request_queue = []
 
+        if config.cluster_config.is_disaggregated:
+            self._kv_cache_transfer_time_predictor = KVCacheTransferTimePredictor(
+                config.cluster_config.replica_config,
+                next(iter(replicas.values())),
+                config.execution_time_predictor_config.send_recv_input_file,
+            )
+        else:
+            self._kv_cache_transfer_time_predictor = None
+
+    def take_over(self, scheduler: "BaseGlobalScheduler") -> None:
+        # continue the work of another global scheduler, e.g. when a forked simulation
+        # switches to a different scheduling policy
+        self._replica_schedulers = scheduler._replica_schedulers
+        self._request_queue = scheduler._request_queue
+        self._replicas_to_free = scheduler._replicas_to_free
+        self._num_replicas = scheduler._num_replicas
+
     def sort_requests(self) -> None:
         self._request_queue.sort(key=lambda request: request._arrived_at)
 
@@ -52,6 +88,38 @@ class BaseGlobalScheduler(ABC):
             stage_id
         )
 
+    def get_schedulable_replica_ids(self) -> List[int]:
+        # new requests start with their prefill, in a disaggregated cluster they are
+        # only routed to the prefill pool
+        return sorted(
+            replica_id
+            for replica_id in self._replica_schedulers
+            if not self.check_replica_to_free(replica_id)
+            and self._replicas[replica_id].role != ReplicaRole.DECODE
+        )
+
+    def get_kv_cache_transfer_time(self, request: Request) -> float:
+        return self._kv_cache_transfer_time_predictor.get_transfer_time(request)
+
+    def schedule_decode(self, request: Request) -> int:
+        """
+        Picks the decode replica a request continues on once its kv cache is
+        transferred from the prefill replica, the one with the fewest outstanding
+        requests.
+        """
+        decode_replica_ids = [
+            replica_id
+            for replica_id in sorted(self._replica_schedulers)
+            if not self.check_replica_to_free(replica_id)
+            and self._replicas[replica_id].role == ReplicaRole.DECODE
+        ]
+        return min(
+            decode_replica_ids,
+            key=lambda replica_id: self.get_replica_scheduler(
+                replica_id
+            ).num_outstanding_requests,
+        )
+
     def is_empty(self) -> bool:
         return len(self._request_queue) == 0 and all(
             replica_scheduler.is_empty()
@@ -47,10 +47,7 @@ class LORGlobalScheduler(BaseGlobalScheduler):
         self.sort_requests()
         req_mappings = []
         
-        schedulable_replicas = sorted([
-            rep_id for rep_id in self._replica_schedulers
-            if not self.check_replica_to_free(rep_id)
-        ])
+        schedulable_replicas = self.get_schedulable_replica_ids()
 
         if not schedulable_replicas:
             return req_mappings
@@ -5,6 +5,8 @@ from vidur.scheduler.global_scheduler.base_global_scheduler import BaseGlobalSch
 
 
 class RoundRobinGlobalScheduler(BaseGlobalScheduler):
+    reads_replica_state = False
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self._request_counter = 0
@@ -23,10 +25,7 @@ class RoundRobinGlobalScheduler(BaseGlobalScheduler):
 
         request_mapping = []
         
-        schedulable_replicas = sorted([
-            rep_id for rep_id in self._replica_schedulers
-            if not self.check_replica_to_free(rep_id)
-        ])
+        schedulable_replicas = self.get_schedulable_replica_ids()
         
         if not schedulable_replicas:
             return request_mapping
@@ -1,5 +1,7 @@
 from abc import ABC, abstractmethod
-from typing import List
+from collections import deque
+from math import ceil
+from typing import Deque, Hashable, List, Sequence, Tuple
 
 from vidur.config import (
     BaseReplicaSchedulerConfig,
@@ -10,7 +12,10 @@ from vidur.entities import Batch, Replica, Request
 from vidur.execution_time_predictor import BaseExecutionTimePredictor
 from vidur.logger import init_logger
 from vidur.scheduler.replica_stage_scheduler import ReplicaStageScheduler
+from vidur.scheduler.utils.block_allocator import BlockAllocator
 from vidur.scheduler.utils.memory_planner import MemoryPlanner
+from vidur.scheduler.utils.request_queue import ArrivalOrderedRequestQueue
+from vidur.types import PreemptionMode, ReplicaRole
 
 logger = init_logger(__name__)
 
@@ -29,6 +34,7 @@ class BaseReplicaScheduler(ABC):
         self._replica_config = replica_config
         self._request_generator_config = request_generator_config
         self._replica_id = replica.id
+        self._replica_role = replica.role
         self._num_stages = num_stages
 
         self._max_blocks_per_sequence = (
@@ -50,9 +56,46 @@ class BaseReplicaScheduler(ABC):
             f"Obtained max batch size of {self._max_batch_size} for replica {self._replica_id}"
         )
 
-        self._request_queue = []
+        self._watermark_blocks = int(
+            self._config.watermark_blocks_fraction * self._config.num_blocks
+        )
+
+        # only vLLM and Sarathi swap out preempted requests and cache prefixes, see
+        # _init_kv_cache_reuse
+        self._preemption_mode = PreemptionMode.RECOMPUTE
+        self._enable_prefix_caching = False
+        self._num_cpu_blocks = 0
+        self._kv_cache_block_memory = (
+            memory_planner.get_kv_cache_memory_per_device_per_block(
+                self._config.block_size
+            )
+        )
+        # every device moves its part of a block over its own PCIe link
+        self._block_swap_time = self._kv_cache_block_memory / (
+            replica.pcie_bandwidth_gbps * 1e9
+        )
+
+        # waiting requests in FIFO order, restarted requests are put back in front
+        self._request_queue: Deque[Request] = deque()
+        # running requests that are not part of a scheduled batch, in the order they
+        # were added (vLLM and Sarathi sort them by arrival)
+        self._preempted_requests = ArrivalOrderedRequestQueue()
+        self._block_allocator = BlockAllocator(self._config.num_blocks)
+        # number of used blocks, shared prefix blocks are only counted once
         self._num_allocated_blocks = 0
+        # request id -> number of blocks in its block table
         self._allocation_map = {}
+        # requests whose kv cache is swapped out to CPU memory
+        self._swapped_requests = ArrivalOrderedRequestQueue()
+        # request id -> number of blocks in CPU memory and the keys of the computed
+        # prefix blocks at the start of its block table
+        self._swap_map = {}
+        self._num_swapped_blocks = 0
+        # blocks moved between the devices and CPU memory for the next batch
+        self._num_blocks_to_swap = 0
+        # requests of a prefill replica whose kv cache is to be sent to a decode
+        # replica, they keep their blocks until the transfer completes
+        self._prefilled_requests: List[Request] = []
 
         self._replica_stage_schedulers = {
             stage_id: ReplicaStageScheduler(
@@ -64,10 +107,22 @@ class BaseReplicaScheduler(ABC):
             for stage_id in range(num_stages)
         }
 
+    def _init_kv_cache_reuse(self) -> None:
+        self._preemption_mode = PreemptionMode.from_str(self._config.preemption_mode)
+        self._enable_prefix_caching = self._config.enable_prefix_caching
+        # the swap space and the PCIe bandwidth are both in decimal GB
+        self._num_cpu_blocks = int(
+            self._config.swap_space_gb * 1e9 // self._kv_cache_block_memory
+        )
+
     @property
     def num_pending_requests(self) -> int:
         return len(self._request_queue)
 
+    @property
+    def num_outstanding_requests(self) -> int:
+        return self.num_pending_requests + len(self._allocation_map)
+
     @property
     def replica_id(self) -> int:
         return self._replica_id
@@ -84,6 +139,7 @@ class BaseReplicaScheduler(ABC):
         return (
             self.num_pending_requests == 0
             and len(self._allocation_map) == 0
+            and not self._swapped_requests
             and all(
                 stage_scheduler.is_empty()
                 for stage_scheduler in self._replica_stage_schedulers.values()
@@ -96,7 +152,9 @@ class BaseReplicaScheduler(ABC):
         if request.is_prefill_complete:
             return 1
 
-        return request.num_prefill_tokens
+        return request.num_prefill_tokens - self._get_num_prefix_cache_hit_tokens(
+            request
+        )
 
     def add_request(self, request: Request) -> None:
         self._request_queue.append(request)
@@ -104,11 +162,89 @@ class BaseReplicaScheduler(ABC):
     def get_replica_stage_scheduler(self, stage_id: int):
         return self._replica_stage_schedulers[stage_id]
 
+    def pop_prefilled_requests(self) -> List[Request]:
+        prefilled_requests = self._prefilled_requests
+        self._prefilled_requests = []
+        return prefilled_requests
+
+    def _is_handed_off(self, request: Request) -> bool:
+        # the decode of a request runs on a decode replica in a disaggregated cluster
+        return self._replica_role == ReplicaRole.PREFILL and request.is_prefill_complete
+
     def can_allocate(self, num_blocks: int) -> bool:
         return self._config.num_blocks - self._num_allocated_blocks >= num_blocks
 
-    def allocate(self, request_id: int, num_blocks: int) -> None:
-        self._num_allocated_blocks += num_blocks
+    def _get_prefix_block_keys(self, request: Request) -> List[Tuple[Hashable, int]]:
+        if not self._enable_prefix_caching or request.prefix_id is None:
+            return []
+
+        # the kv cache of a request handed off by a prefill replica is received whole
+        if request.is_prefill_complete:
+            return []
+
+        num_prefix_blocks = request.num_prefix_tokens // self._config.block_size
+        return [(request.prefix_id, i) for i in range(num_prefix_blocks)]
+
+    def _get_num_initial_blocks(self, request: Request) -> int:
+        # a request handed off by a prefill replica arrives with the kv cache of its
+        # prompt, the first decode token is added to it
+        return ceil(
+            max(request.num_prefill_tokens, request.num_processed_tokens)
+            / self._config.block_size
+        )
+
+    def _get_num_new_blocks(self, request: Request, num_blocks: int) -> int:
+        # the cached blocks of a shared prefix do not need to be allocated again
+        return self._block_allocator.get_num_new_blocks(
+            num_blocks, self._get_prefix_block_keys(request)
+        )
+
+    def _get_num_prefix_cache_hit_tokens(self, request: Request) -> int:
+        """
+        Number of prompt tokens of a new request whose kv cache has been computed in
+        the prefix cache. At least the last prompt token is always computed.
+        """
+        if request.id in self._allocation_map or request.prefix_id is None:
+            return 0
+
+        prefix_block_keys = self._get_prefix_block_keys(request)
+        if not prefix_block_keys:
+            return 0
+
+        num_cached_blocks = self._block_allocator.get_num_cached_prefix_blocks(
+            prefix_block_keys
+        )
+        return min(
+            num_cached_blocks * self._config.block_size,
+            request.num_prefill_tokens - 1,
+        )
+
+    def _mark_prefix_computed(self, request: Request) -> None:
+        # the prefix blocks become cache hits once the processed tokens cover them
+        if request.prefix_id is None or request.has_started_decode:
+            return
+
+        num_computed_blocks = (
+            min(request.num_processed_tokens, request.num_prefix_tokens)
+            // self._config.block_size
+        )
+        if num_computed_blocks:
+            self._block_allocator.mark_computed(request.id, num_computed_blocks)
+
+    def _allocate_new_request(self, request: Request, num_blocks: int) -> None:
+        num_cache_hit_tokens = self._get_num_prefix_cache_hit_tokens(request)
+        self.allocate(request.id, num_blocks, self._get_prefix_block_keys(request))
+        if num_cache_hit_tokens:
+            request.on_prefix_cache_hit(num_cache_hit_tokens)
+
+    def allocate(
+        self,
+        request_id: int,
+        num_blocks: int,
+        prefix_block_keys: Sequence[Hashable] = (),
+    ) -> None:
+        self._block_allocator.allocate(request_id, num_blocks, prefix_block_keys)
+        self._num_allocated_blocks = self._block_allocator.num_used_blocks
         if request_id not in self._allocation_map:
             self._allocation_map[request_id] = num_blocks
         else:
@@ -118,14 +254,73 @@ class BaseReplicaScheduler(ABC):
 
     def free(self, *request_ids: List[int]) -> None:
         for request_id in request_ids:
-            num_blocks = self._allocation_map.pop(request_id)
-            self._num_allocated_blocks -= num_blocks
+            self._allocation_map.pop(request_id)
+            self._block_allocator.free(request_id)
 
-        assert self._num_allocated_blocks >= 0
+        self._num_allocated_blocks = self._block_allocator.num_used_blocks
 
     def free_batch(self, batch: Batch) -> None:
         self.free(*batch.request_ids)
 
+    def _preempt_request(self, request: Request) -> None:
+        num_blocks = self._allocation_map[request.id]
+
+        if (
+            self._preemption_mode == PreemptionMode.SWAP
+            and self._num_swapped_blocks + num_blocks <= self._num_cpu_blocks
+        ):
+            # the kv cache is kept in CPU memory, the request resumes where it stopped
+            prefix_block_keys = self._block_allocator.get_computed_prefix_block_keys(
+                request.id
+            )
+            self.free(request.id)
+            self._swap_map[request.id] = (num_blocks, prefix_block_keys)
+            self._num_swapped_blocks += num_blocks
+            self._num_blocks_to_swap += num_blocks
+            self._swapped_requests.append(request)
+            return
+
+        # the request starts over and recomputes its kv cache
+        request.restart()
+        self.free(request.id)
+        self._request_queue.appendleft(request)
+
+    def _swap_in_requests(self) -> None:
+        # swapped out requests resume in arrival order once the blocks are available
+        self._swapped_requests.sort()
+        while self._swapped_requests:
+            if len(self._allocation_map) == self._config.batch_size_cap:
+                break
+
+            request = self._swapped_requests.peekleft()
+            num_blocks, prefix_block_keys = self._swap_map[request.id]
+            num_new_blocks = self._block_allocator.get_num_new_blocks(
+                num_blocks, prefix_block_keys
+            )
+            if (
+                self._config.num_blocks - self._num_allocated_blocks - num_new_blocks
+                < self._watermark_blocks
+            ):
+                break
+
+            self._swapped_requests.popleft()
+            del self._swap_map[request.id]
+            self._num_swapped_blocks -= num_blocks
+            # the prefix blocks that are still cached are shared again instead of
+            # being copied back
+            self._num_blocks_to_swap += (
+                num_blocks
+                - self._block_allocator.get_num_cached_prefix_blocks(prefix_block_keys)
+            )
+            self.allocate(request.id, num_blocks, prefix_block_keys)
+            self._block_allocator.mark_computed(request.id, len(prefix_block_keys))
+            self._preempted_requests.append(request)
+
+    def _get_kv_cache_swap_time(self) -> float:
+        swap_time = self._num_blocks_to_swap * self._block_swap_time
+        self._num_blocks_to_swap = 0
+        return swap_time
+
     @abstractmethod
     def on_batch_end(self, batch: Batch) -> None:
         pass
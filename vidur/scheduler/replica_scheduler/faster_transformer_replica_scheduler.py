@@ -1,4 +1,6 @@
-from vidur.entities.batch import Batch
+from collections import deque
+
+from vidur.entities.batch import Batch, BatchFeatures
 from vidur.scheduler.replica_scheduler.base_replica_scheduler import (
     BaseReplicaScheduler,
 )
@@ -8,7 +10,7 @@ class FasterTransformerReplicaScheduler(BaseReplicaScheduler):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
-        self._preempted_batches = []
+        self._preempted_batches = deque()
         self._num_running_batches = 0
         self._pending_free_map = {}
 
@@ -25,6 +27,7 @@ class FasterTransformerReplicaScheduler(BaseReplicaScheduler):
     def _generate_next_batch_from_preempted(self, preempted_batch: Batch) -> Batch:
         requests = []
         num_tokens = []
+        features = BatchFeatures()
 
         for request in preempted_batch.requests:
             if request.completed:
@@ -32,19 +35,21 @@ class FasterTransformerReplicaScheduler(BaseReplicaScheduler):
             next_num_tokens = self._get_request_next_num_tokens(request)
             requests.append(request)
             num_tokens.append(next_num_tokens)
+            features.add_request(request, next_num_tokens)
 
         if not requests:
             return
 
-        return Batch(self._replica_id, requests, num_tokens)
+        return Batch(self._replica_id, requests, num_tokens, features)
 
     def _get_next_batch(self) -> Batch:
         if self._preempted_batches:
-            preempted_batch = self._preempted_batches.pop(0)
+            preempted_batch = self._preempted_batches.popleft()
             return self._generate_next_batch_from_preempted(preempted_batch)
 
         requests = []
         num_tokens = []
+        features = BatchFeatures()
 
         while self._request_queue:
             if len(requests) == self._max_batch_size:
@@ -53,13 +58,14 @@ class FasterTransformerReplicaScheduler(BaseReplicaScheduler):
             if not self.can_allocate(self._max_blocks_per_sequence):
                 break
 
-            request = self._request_queue.pop(0)
+            request = self._request_queue.popleft()
             self.allocate(request.id, self._max_blocks_per_sequence)
             next_num_tokens = self._get_request_next_num_tokens(request)
             requests.append(request)
             num_tokens.append(next_num_tokens)
+            features.add_request(request, next_num_tokens)
 
         if not requests:
             return
 
-        return Batch(self._replica_id, requests, num_tokens)
+        return Batch(self._replica_id, requests, num_tokens, features)
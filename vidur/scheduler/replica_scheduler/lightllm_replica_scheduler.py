@@ -1,8 +1,8 @@
-from typing import List, Tuple
+from typing import Tuple
 
 import numpy as np
 
-from vidur.entities.batch import Batch, Request
+from vidur.entities.batch import Batch, BatchFeatures, Request
 from vidur.scheduler.replica_scheduler.base_replica_scheduler import (
     BaseReplicaScheduler,
 )
@@ -12,7 +12,6 @@ class LightLLMReplicaScheduler(BaseReplicaScheduler):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
 
-        self._preempted_requests: List[Request] = []
         self._num_running_batches = 0
         self._max_micro_batch_size = self._config.batch_size_cap // self._num_stages
         assert (
@@ -73,6 +72,7 @@ class LightLLMReplicaScheduler(BaseReplicaScheduler):
     def _get_prefill_batch(self) -> Batch:
         requests = []
         num_tokens = []
+        features = BatchFeatures()
         num_batch_tokens = 0
 
         self.cache_len_list = [
@@ -96,27 +96,29 @@ class LightLLMReplicaScheduler(BaseReplicaScheduler):
             if not self._can_allocate_request(request):
                 break
 
-            request = self._request_queue.pop(0)
+            request = self._request_queue.popleft()
 
             self._allocate_request(request)
             requests.append(request)
             num_tokens.append(next_num_tokens)
+            features.add_request(request, next_num_tokens)
             num_batch_tokens += next_num_tokens
 
         if requests:
-            return Batch(self._replica_id, requests, num_tokens)
+            return Batch(self._replica_id, requests, num_tokens, features)
 
         return
 
     def _get_decode_batch(self) -> Batch:
         requests = []
         num_tokens = []
+        features = BatchFeatures()
 
         # all preempted_requests will have prefill completed
         while self._preempted_requests:
             assert len(requests) < self._max_micro_batch_size
 
-            request = self._preempted_requests.pop(0)
+            request = self._preempted_requests.popleft()
 
             assert self.can_allocate(1)
             self._allocate_request(request)
@@ -124,11 +126,12 @@ class LightLLMReplicaScheduler(BaseReplicaScheduler):
             next_num_tokens = self._get_request_next_num_tokens(request)
             requests.append(request)
             num_tokens.append(next_num_tokens)
+            features.add_request(request, next_num_tokens)
 
         if not requests:
             return
 
-        return Batch(self._replica_id, requests, num_tokens)
+        return Batch(self._replica_id, requests, num_tokens, features)
 
     def _can_decode(self):
         return self.can_allocate(len(self._preempted_requests))
@@ -1,6 +1,4 @@
-from math import ceil
-
-from vidur.entities.batch import Batch, Request
+from vidur.entities.batch import Batch, BatchFeatures, Request
 from vidur.scheduler.replica_scheduler.base_replica_scheduler import (
     BaseReplicaScheduler,
 )
@@ -9,22 +7,19 @@ from vidur.scheduler.replica_scheduler.base_replica_scheduler import (
 class SarathiReplicaScheduler(BaseReplicaScheduler):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        self._init_kv_cache_reuse()
 
         # sarathi config
         self._num_running_batches = 0
-        self._preempted_requests = []
         # For vLLM and its derivatives, we only need to set a loose max batch size
         # Memory requirements are handled explicitly by the scheduler
         self._max_micro_batch_size = self._config.batch_size_cap // self._num_stages
-        self._watermark_blocks = int(
-            self._config.watermark_blocks_fraction * self._config.num_blocks
-        )
 
     def _can_allocate_request(self, request: Request) -> bool:
         if request.id not in self._allocation_map:
             # new request
-            num_required_blocks = ceil(
-                request.num_prefill_tokens / self._config.block_size
+            num_required_blocks = self._get_num_new_blocks(
+                request, self._get_num_initial_blocks(request)
             )
             return (
                 self._config.num_blocks
@@ -39,10 +34,8 @@ class SarathiReplicaScheduler(BaseReplicaScheduler):
     def _allocate_request(self, request: Request) -> None:
         if request.id not in self._allocation_map:
             # new request
-            num_required_blocks = ceil(
-                request.num_prefill_tokens / self._config.block_size
-            )
-            self.allocate(request.id, num_required_blocks)
+            num_required_blocks = self._get_num_initial_blocks(request)
+            self._allocate_new_request(request, num_required_blocks)
             return
 
         num_tokens_reserved = self._allocation_map[request.id] * self._config.block_size
@@ -61,8 +54,11 @@ class SarathiReplicaScheduler(BaseReplicaScheduler):
         self._num_running_batches -= 1
 
         for request in batch.requests:
+            self._mark_prefix_computed(request)
             if request.completed:
                 self.free(request.id)
+            elif self._is_handed_off(request):
+                self._prefilled_requests.append(request)
             else:
                 self._preempted_requests.append(request)
 
@@ -75,7 +71,9 @@ class SarathiReplicaScheduler(BaseReplicaScheduler):
             return 1
 
         next_num_tokens = min(
-            request.num_prefill_tokens - request.num_processed_tokens,
+            request.num_prefill_tokens
+            - request.num_processed_tokens
+            - self._get_num_prefix_cache_hit_tokens(request),
             self._config.chunk_size - num_batch_tokens,
         )
 
@@ -86,18 +84,21 @@ class SarathiReplicaScheduler(BaseReplicaScheduler):
     def _get_next_batch(self) -> Batch:
         requests = []
         num_tokens = []
+        features = BatchFeatures()
         skipped_requests = []
         running_prefills = []
         contains_prefill = False
         num_batch_tokens = 0
 
+        self._swap_in_requests()
+
         # preempted requests could contain multiple requests which have
         # partial prefills completed, so we need to be careful
         while self._preempted_requests:
             if len(requests) == self._max_micro_batch_size:
                 break
 
-            request = self._preempted_requests.pop(0)
+            request = self._preempted_requests.popleft()
 
             if not request.is_prefill_complete:
                 running_prefills.append(request)
@@ -113,14 +114,10 @@ class SarathiReplicaScheduler(BaseReplicaScheduler):
 
             while not self._can_allocate_request(request):
                 if self._preempted_requests:
-                    victim_request = self._preempted_requests.pop(-1)
-                    victim_request.restart()
-                    self.free(victim_request.id)
-                    self._request_queue = [victim_request] + self._request_queue
+                    victim_request = self._preempted_requests.pop()
+                    self._preempt_request(victim_request)
                 else:
-                    request.restart()
-                    self.free(request.id)
-                    self._request_queue = [request] + self._request_queue
+                    self._preempt_request(request)
                     break
             else:
                 self._allocate_request(request)
@@ -128,6 +125,7 @@ class SarathiReplicaScheduler(BaseReplicaScheduler):
                 num_batch_tokens += next_num_tokens
                 requests.append(request)
                 num_tokens.append(next_num_tokens)
+                features.add_request(request, next_num_tokens)
 
         for request in running_prefills:
             assert not request.is_prefill_complete
@@ -144,16 +142,16 @@ class SarathiReplicaScheduler(BaseReplicaScheduler):
             num_batch_tokens += next_num_tokens
             requests.append(request)
             num_tokens.append(next_num_tokens)
+            features.add_request(request, next_num_tokens)
 
         # re-add the skipped requests, but make sure that we add them to the
         # front of the queue so that they are scheduled first and we maintain FIFO ordering
-        self._preempted_requests = skipped_requests + self._preempted_requests
-        self._preempted_requests = sorted(
-            self._preempted_requests, key=lambda req: req.arrived_at
-        )
+        self._preempted_requests.extendleft(skipped_requests)
+        self._preempted_requests.sort()
         skipped_requests = []
 
-        while self._request_queue:
+        # new requests are only admitted once all the swapped out requests resumed
+        while self._request_queue and not self._swapped_requests:
             if len(self._allocation_map) == self._config.batch_size_cap:
                 break
 
@@ -170,7 +168,7 @@ class SarathiReplicaScheduler(BaseReplicaScheduler):
             if next_num_tokens == 0:
                 break
 
-            request = self._request_queue.pop(0)
+            request = self._request_queue.popleft()
 
             self._allocate_request(request)
 
@@ -179,8 +177,15 @@ class SarathiReplicaScheduler(BaseReplicaScheduler):
             num_batch_tokens += next_num_tokens
             requests.append(request)
             num_tokens.append(next_num_tokens)
+            features.add_request(request, next_num_tokens)
 
         if not requests:
             return
 
-        return Batch(self._replica_id, requests, num_tokens)
+        return Batch(
+            self._replica_id,
+            requests,
+            num_tokens,
+            features,
+            self._get_kv_cache_swap_time(),
+        )
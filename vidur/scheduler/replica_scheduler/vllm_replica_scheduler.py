@@ -1,7 +1,4 @@
-from math import ceil
-from typing import List
-
-from vidur.entities.batch import Batch, Request
+from vidur.entities.batch import Batch, BatchFeatures, Request
 from vidur.scheduler.replica_scheduler.base_replica_scheduler import (
     BaseReplicaScheduler,
 )
@@ -10,30 +7,30 @@ from vidur.scheduler.replica_scheduler.base_replica_scheduler import (
 class VLLMReplicaScheduler(BaseReplicaScheduler):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
+        self._init_kv_cache_reuse()
 
-        self._preempted_requests: List[Request] = []
         self._num_running_batches = 0
         # For vLLM and its derivatives, we only need to set a loose max batch size
         # Memory requirements are handled explicitly by the scheduler
         self._max_micro_batch_size = self._config.batch_size_cap // self._num_stages
-        self._watermark_blocks = int(
-            self._config.watermark_blocks_fraction * self._config.num_blocks
-        )
 
     def on_batch_end(self, batch: Batch) -> None:
         self._num_running_batches -= 1
 
         for request in batch.requests:
+            self._mark_prefix_computed(request)
             if request.completed:
                 self.free(request.id)
+            elif self._is_handed_off(request):
+                self._prefilled_requests.append(request)
             else:
                 self._preempted_requests.append(request)
 
     def _can_allocate_request(self, request: Request) -> bool:
         if request.id not in self._allocation_map:
             # new request
-            num_required_blocks = ceil(
-                (request.num_prefill_tokens) / self._config.block_size
+            num_required_blocks = self._get_num_new_blocks(
+                request, self._get_num_initial_blocks(request)
             )
             return (
                 self._config.num_blocks
@@ -48,10 +45,8 @@ class VLLMReplicaScheduler(BaseReplicaScheduler):
     def _allocate_request(self, request: Request) -> None:
         if request.id not in self._allocation_map:
             # new request
-            num_required_blocks = ceil(
-                (request.num_prefill_tokens) / self._config.block_size
-            )
-            self.allocate(request.id, num_required_blocks)
+            num_required_blocks = self._get_num_initial_blocks(request)
+            self._allocate_new_request(request, num_required_blocks)
             return
 
         num_tokens_reserved = self._allocation_map[request.id] * self._config.block_size
@@ -68,9 +63,13 @@ class VLLMReplicaScheduler(BaseReplicaScheduler):
     def _get_next_batch(self) -> Batch:
         requests = []
         num_tokens = []
+        features = BatchFeatures()
         num_batch_tokens = 0
 
-        while self._request_queue:
+        self._swap_in_requests()
+
+        # new requests are only admitted once all the swapped out requests resumed
+        while self._request_queue and not self._swapped_requests:
             request = self._request_queue[0]
 
             next_num_tokens = self._get_request_next_num_tokens(request)
@@ -89,43 +88,53 @@ class VLLMReplicaScheduler(BaseReplicaScheduler):
             if len(requests) == self._max_micro_batch_size:
                 break
 
-            request = self._request_queue.pop(0)
+            request = self._request_queue.popleft()
 
             self._allocate_request(request)
             requests.append(request)
             num_tokens.append(next_num_tokens)
+            features.add_request(request, next_num_tokens)
             num_batch_tokens += next_num_tokens
 
         if requests:
-            return Batch(self._replica_id, requests, num_tokens)
+            return Batch(
+                self._replica_id,
+                requests,
+                num_tokens,
+                features,
+                self._get_kv_cache_swap_time(),
+            )
 
-        # Safer to sort preempted_requests to maintain FIFO order
-        self._preempted_requests.sort(key=lambda r: r.arrived_at)
+        # sort preempted_requests by arrival to maintain FIFO order
+        self._preempted_requests.sort()
         # all preempted_requests will have prefill completed
         while self._preempted_requests:
             if len(requests) == self._max_micro_batch_size:
                 break
 
-            request = self._preempted_requests.pop(0)
+            request = self._preempted_requests.popleft()
 
             while not self._can_allocate_request(request):
                 if self._preempted_requests:
-                    victim_request = self._preempted_requests.pop(-1)
-                    victim_request.restart()
-                    self.free(victim_request.id)
-                    self._request_queue = [victim_request] + self._request_queue
+                    victim_request = self._preempted_requests.pop()
+                    self._preempt_request(victim_request)
                 else:
-                    request.restart()
-                    self.free(request.id)
-                    self._request_queue = [request] + self._request_queue
+                    self._preempt_request(request)
                     break
             else:
                 self._allocate_request(request)
                 next_num_tokens = self._get_request_next_num_tokens(request)
                 requests.append(request)
                 num_tokens.append(next_num_tokens)
+                features.add_request(request, next_num_tokens)
 
         if not requests:
             return
 
-        return Batch(self._replica_id, requests, num_tokens)
+        return Batch(
+            self._replica_id,
+            requests,
+            num_tokens,
+            features,
+            self._get_kv_cache_swap_time(),
+        )
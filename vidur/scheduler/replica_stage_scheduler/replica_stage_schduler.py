@@ -1,3 +1,4 @@
+from collections import deque
 from typing import Tuple
 
 from vidur.entities import Batch, BatchStage, ExecutionTime
@@ -17,7 +18,7 @@ class ReplicaStageScheduler:
         self._is_last_stage = is_last_stage
         self._execution_time_predictor = execution_time_predictor
 
-        self._batch_queue = []
+        self._batch_queue = deque()
         self._is_busy = False
 
     @property
@@ -38,12 +39,12 @@ class ReplicaStageScheduler:
             return None, None, None
 
         self._is_busy = True
-        batch = self._batch_queue.pop(0)
+        batch = self._batch_queue.popleft()
         execution_time = self._execution_time_predictor.get_execution_time(
             batch,
             self._stage_id,
         )
-        total_execution_time = execution_time.total_time
+        total_execution_time = execution_time.total_time + batch.kv_cache_swap_time
         model_execution_time = execution_time.model_time
         batch_stage = BatchStage(
             batch.id,
@@ -53,6 +54,7 @@ class ReplicaStageScheduler:
             model_execution_time,
             batch.requests,
             batch.num_tokens,
+            batch.features,
         )
 
         return batch, batch_stage, execution_time
@@ -0,0 +1,188 @@
+from collections import OrderedDict
+from typing import Dict, Hashable, List, Sequence, Set
+
+
+class BlockAllocator:
+    """
+    Paged KV cache of a replica. Blocks are handed out from a free list and every
+    request has a block table with the blocks that hold its tokens. The full blocks
+    of a shared prompt prefix are identified by a prefix block key, and requests
+    whose prefix blocks are already in the cache map them into their block table
+    instead of allocating new ones. A prefix block is only a cache hit once the kv
+    cache of its tokens has been computed, until then the requests mapping it compute
+    it themselves. Shared blocks are reference counted. Once the last request using a
+    prefix block is freed, the block stays cached until it is evicted, least recently
+    released first, because no free block is left.
+    """
+
+    def __init__(self, num_blocks: int) -> None:
+        self._num_blocks = num_blocks
+        # blocks are taken lazily from [_num_touched_blocks, num_blocks) once the free
+        # list of released blocks is empty, so that large caches are cheap to create
+        self._free_blocks: List[int] = []
+        self._num_touched_blocks = 0
+        self._block_tables: Dict[int, List[int]] = {}
+        # shared prefix blocks
+        self._prefix_blocks: Dict[Hashable, int] = {}
+        self._prefix_block_keys: Dict[int, Hashable] = {}
+        self._ref_counts: Dict[int, int] = {}
+        # prefix blocks whose kv cache has been computed
+        self._computed_blocks: Set[int] = set()
+        # cached prefix blocks that no request uses, in the order they were released
+        self._evictable_blocks: "OrderedDict[int, None]" = OrderedDict()
+
+    @property
+    def num_blocks(self) -> int:
+        return self._num_blocks
+
+    @property
+    def num_free_blocks(self) -> int:
+        # cached blocks without users can be evicted, so they count as free
+        return (
+            self._num_blocks
+            - self._num_touched_blocks
+            + len(self._free_blocks)
+            + len(self._evictable_blocks)
+        )
+
+    @property
+    def num_used_blocks(self) -> int:
+        return self._num_blocks - self.num_free_blocks
+
+    @property
+    def num_shared_blocks(self) -> int:
+        return len(self._prefix_blocks) - len(self._evictable_blocks)
+
+    @property
+    def num_evictable_blocks(self) -> int:
+        return len(self._evictable_blocks)
+
+    def get_block_table(self, request_id: int) -> List[int]:
+        return self._block_tables[request_id]
+
+    def get_num_cached_prefix_blocks(
+        self, prefix_block_keys: Sequence[Hashable]
+    ) -> int:
+        num_cached_blocks = 0
+        for key in prefix_block_keys:
+            if self._prefix_blocks.get(key) not in self._computed_blocks:
+                break
+            num_cached_blocks += 1
+        return num_cached_blocks
+
+    def get_computed_prefix_block_keys(self, request_id: int) -> List[Hashable]:
+        # keys of the computed prefix blocks at the start of the block table
+        prefix_block_keys = []
+        for block in self._block_tables[request_id]:
+            if block not in self._computed_blocks:
+                break
+            prefix_block_keys.append(self._prefix_block_keys[block])
+        return prefix_block_keys
+
+    def get_num_new_blocks(
+        self, num_blocks: int, prefix_block_keys: Sequence[Hashable] = ()
+    ) -> int:
+        """
+        Number of free blocks a new request with num_blocks blocks needs, the prefix
+        blocks that are in use by other requests do not have to be allocated again.
+        Reusing a cached block without users takes it from the free blocks.
+        """
+        num_new_blocks = num_blocks
+        for key in prefix_block_keys[:num_blocks]:
+            block = self._prefix_blocks.get(key)
+            if block is None:
+                break
+            if block not in self._evictable_blocks:
+                num_new_blocks -= 1
+        return num_new_blocks
+
+    def allocate(
+        self,
+        request_id: int,
+        num_blocks: int,
+        prefix_block_keys: Sequence[Hashable] = (),
+    ) -> None:
+        """
+        Appends num_blocks blocks to the block table of the request. The first
+        allocation of a request can map the blocks of its shared prefix, they are
+        identified by prefix_block_keys.
+        """
+        if request_id in self._block_tables:
+            assert not prefix_block_keys
+            self._block_tables[request_id].extend(self._take_blocks(num_blocks))
+            return
+
+        block_table = []
+        for key in prefix_block_keys[:num_blocks]:
+            block = self._prefix_blocks.get(key)
+            if block is None:
+                block = self._take_blocks(1)[0]
+                self._prefix_blocks[key] = block
+                self._prefix_block_keys[block] = key
+                self._ref_counts[block] = 0
+            elif block in self._evictable_blocks:
+                del self._evictable_blocks[block]
+                self._ref_counts[block] = 0
+            self._ref_counts[block] += 1
+            block_table.append(block)
+
+        block_table.extend(self._take_blocks(num_blocks - len(block_table)))
+        self._block_tables[request_id] = block_table
+
+    def mark_computed(self, request_id: int, num_blocks: int) -> None:
+        """
+        Marks the prefix blocks among the first num_blocks blocks of the block table
+        of the request as computed.
+        """
+        for block in self._block_tables[request_id][:num_blocks]:
+            if block not in self._prefix_block_keys:
+                break
+            self._computed_blocks.add(block)
+
+    def free(self, request_id: int) -> int:
+        """
+        Releases the blocks of the request, prefix blocks become evictable once their
+        last user is freed. Returns the number of blocks in the block table of the
+        request.
+        """
+        block_table = self._block_tables.pop(request_id)
+
+        # the end of a prefix is released first, so that it is also evicted first
+        for block in reversed(block_table):
+            if block not in self._ref_counts:
+                self._free_blocks.append(block)
+                continue
+
+            self._ref_counts[block] -= 1
+            if not self._ref_counts[block]:
+                del self._ref_counts[block]
+                self._evictable_blocks[block] = None
+
+        return len(block_table)
+
+    def _take_blocks(self, num_blocks: int) -> List[int]:
+        assert num_blocks <= self.num_free_blocks
+
+        num_reused_blocks = min(num_blocks, len(self._free_blocks))
+        blocks = self._free_blocks[len(self._free_blocks) - num_reused_blocks :]
+        del self._free_blocks[len(self._free_blocks) - num_reused_blocks :]
+
+        num_untouched_blocks = min(
+            num_blocks - num_reused_blocks,
+            self._num_blocks - self._num_touched_blocks,
+        )
+        blocks.extend(
+            range(
+                self._num_touched_blocks,
+                self._num_touched_blocks + num_untouched_blocks,
+            )
+        )
+        self._num_touched_blocks += num_untouched_blocks
+
+        while len(blocks) < num_blocks:
+            block, _ = self._evictable_blocks.popitem(last=False)
+            del self._prefix_blocks[self._prefix_block_keys.pop(block)]
+            self._computed_blocks.discard(block)
+            blocks.append(block)
+
+        return blocks
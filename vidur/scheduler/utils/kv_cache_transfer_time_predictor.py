@@ -0,0 +1,42 @@
+import numpy as np
+import pandas as pd
+
+from vidur.config import ReplicaConfig
+from vidur.entities import Replica, Request
+from vidur.scheduler.utils.memory_planner import MemoryPlanner
+
+
+class KVCacheTransferTimePredictor:
+    """
+    Time to send the kv cache of a request from a prefill replica to a decode replica
+    of a disaggregated cluster. The replicas of the two pools run on different nodes,
+    every device of the prefill replica sends its part of the kv cache to the matching
+    device of the decode replica. The time is interpolated from the profiled send_recv
+    times between two nodes and extrapolated linearly beyond the largest message.
+    Transfers do not contend for the network.
+    """
+
+    def __init__(
+        self, replica_config: ReplicaConfig, replica: Replica, send_recv_input_file: str
+    ) -> None:
+        self._kv_cache_memory_per_token = MemoryPlanner(
+            replica_config, replica
+        ).get_kv_cache_memory_per_device_per_block(1)
+
+        df = pd.read_csv(
+            send_recv_input_file.replace(
+                "{NETWORK_DEVICE}", replica_config.network_device
+            )
+        )
+        df = df[(df["collective"] == "send_recv") & (df["devices_per_node"] == 1)]
+        times = df.groupby("size")["time_stats.send_recv.median"].median()
+        self._sizes = times.index.to_numpy(dtype=float)
+        # profiled in ms
+        self._times = times.to_numpy() * 1e-3
+
+    def get_transfer_time(self, request: Request) -> float:
+        size = request.num_prefill_tokens * self._kv_cache_memory_per_token
+        if size <= self._sizes[-1]:
+            return float(np.interp(size, self._sizes, self._times))
+
+        return self._times[-1] * size / self._sizes[-1]
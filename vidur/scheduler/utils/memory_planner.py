@@ -17,6 +17,16 @@ class MemoryPlanner:
             * self._replica.max_request_tokens
         )
 
+    def get_kv_cache_memory_per_device_per_block(self, block_size: int) -> int:
+        return (
+            2  # 2 bytes per float
+            * 2  # one for key, one for value
+            * self._replica.attention_head_dim
+            * self._replica.kv_heads_per_tensor_parallel_worker
+            * self._replica.num_layers_per_pipeline_stage
+            * block_size
+        )
+
     def _get_parameter_memory_per_device(self) -> int:
         return 2 * self._param_counter.get_num_parameters_per_device()
 
@@ -0,0 +1,65 @@
+from collections import deque
+from itertools import count
+from typing import Deque, Iterable, Iterator, Tuple
+
+from vidur.entities import Request
+
+
+class ArrivalOrderedRequestQueue:
+    """
+    FIFO queue of the preempted (running) requests of a replica, which is sorted by
+    arrival time on demand. Requests arriving at the same time keep their queue order,
+    i.e. sorting is stable. The requests are mostly added in arrival order, so sorting
+    is free unless an older request was added after a newer one. The requests at both
+    ends (next to schedule and next victim) are removed in constant time.
+    """
+
+    def __init__(self) -> None:
+        # (arrived_at, position, request), the positions follow the queue order
+        self._entries: Deque[Tuple[float, int, Request]] = deque()
+        self._back_positions = count()
+        self._front_positions = count(-1, -1)
+        self._is_sorted = True
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __bool__(self) -> bool:
+        return bool(self._entries)
+
+    def __iter__(self) -> Iterator[Request]:
+        return (request for _, _, request in self._entries)
+
+    def append(self, request: Request) -> None:
+        entry = (request.arrived_at, next(self._back_positions), request)
+        if self._entries and entry[0] < self._entries[-1][0]:
+            self._is_sorted = False
+        self._entries.append(entry)
+
+    def extend(self, requests: Iterable[Request]) -> None:
+        for request in requests:
+            self.append(request)
+
+    def extendleft(self, requests: Iterable[Request]) -> None:
+        # the requests are added to the front in the given order
+        for request in reversed(list(requests)):
+            entry = (request.arrived_at, next(self._front_positions), request)
+            if self._entries and entry[0] > self._entries[0][0]:
+                self._is_sorted = False
+            self._entries.appendleft(entry)
+
+    def peekleft(self) -> Request:
+        return self._entries[0][2]
+
+    def popleft(self) -> Request:
+        return self._entries.popleft()[2]
+
+    def pop(self) -> Request:
+        return self._entries.pop()[2]
+
+    def sort(self) -> None:
+        if self._is_sorted:
+            return
+
+        self._entries = deque(sorted(self._entries))
+        self._is_sorted = True
@@ -0,0 +1,330 @@
+import multiprocessing
+from collections import Counter
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from vidur.config import SimulationConfig
+from vidur.events import BaseEvent
+from vidur.logger import init_logger
+from vidur.sharding import ReplicaSchedulerProxy, ReplicaShard
+from vidur.simulator import Simulator
+from vidur.types import EventType
+
+logger = init_logger(__name__)
+
+# events of a single replica, processed by the shard the replica belongs to
+REPLICA_EVENT_TYPES = {
+    EventType.REPLICA_SCHEDULE,
+    EventType.BATCH_STAGE_ARRIVAL,
+    EventType.REPLICA_STAGE_SCHEDULE,
+    EventType.BATCH_STAGE_END,
+    EventType.BATCH_END,
+}
+
+
+class ShardedSimulator(Simulator):
+    """
+    Parallel discrete event simulation across replicas. The replica schedulers and
+    their events are partitioned over num_shards worker processes, request arrivals,
+    routing and autoscaling stay in this coordinating process. Replicas only interact
+    through the global scheduler and the autoscaler, so the shards can safely process
+    their events up to the next coordinator event which reads the replica state - a
+    scheduling pass of a global scheduler which reads it or an autoscaler event. The
+    synchronization is conservative and never has to roll back. Everything else the
+    coordinator does in the meantime (arrivals, routing of a round robin scheduler)
+    reaches the shards as timestamped commands, which they apply in simulated time
+    order. After every time window the coordinator receives the replica state its
+    decisions are based on.
+    """
+
+    def __init__(self, config: SimulationConfig) -> None:
+        assert config.num_shards > 1, "Sharded simulation requires num_shards > 1"
+        assert (
+            not config.checkpoint_interval
+        ), "Checkpointing is not supported in sharded simulations"
+        assert (
+            not config.steady_state_detector_config.enable
+        ), "Steady state detection is not supported in sharded simulations"
+        # requests move between the replicas of a disaggregated cluster
+        assert (
+            not config.cluster_config.is_disaggregated
+        ), "Disaggregated clusters are not supported in sharded simulations"
+        # batch ids are offset per shard
+        assert (
+            not config.metrics_config.min_batch_index
+            and not config.metrics_config.max_batch_index
+        ), "Batch index ranges are not supported in sharded simulations"
+
+        super().__init__(config)
+
+        self._shard_connections = None
+        self._shard_processes = None
+        # commands of the coordinator event being handled, e.g. from the proxies
+        self._shard_commands: List[List[Tuple]] = []
+        # commands not yet sent to the shards, keyed by the (time, event type) of the
+        # coordinator event they come from
+        self._shard_pending_commands: List[List[Tuple]] = []
+        self._shard_next_event_keys: List[Tuple[float, float]] = []
+        # replica id -> shard id of the replicas currently in the cluster
+        self._replica_shards: Dict[int, int] = {}
+        # replicas marked to be freed which the shards know about
+        self._marked_replicas = set()
+
+    def _run_events(self, until: float = float("inf")) -> None:
+        if self._shard_connections is None:
+            self._start_shards()
+
+        stop_time = min(until, self._truncation_time, self._time_limit)
+
+        while self._active_requests and not self._terminate:
+            if not self._event_queue:
+                self._advance_shards((stop_time, float("inf")))
+                break
+
+            event = self._event_queue.get()
+            if event._time > stop_time:
+                self._event_queue.put(event)
+                self._advance_shards((stop_time, float("inf")))
+                break
+
+            if self._reads_replica_state(event):
+                self._advance_shards((event._time, event._event_type))
+                if not self._active_requests:
+                    self._event_queue.put(event)
+                    break
+
+            self._handle_event(event)
+
+        next_event_time = min(
+            self._get_next_event_time(),
+            *(event_key[0] for event_key in self._shard_next_event_keys),
+        )
+        if self._active_requests and next_event_time != float("inf"):
+            if next_event_time > self._truncation_time:
+                self._collect_shard_requests()
+                self._truncate()
+            elif next_event_time > self._time_limit:
+                self._set_time(next_event_time)
+            else:
+                # paused, the shards are kept running
+                return
+
+        self._finish_shards()
+
+    def _reads_replica_state(self, event: BaseEvent) -> bool:
+        if event._event_type == EventType.REQUEST_ARRIVAL:
+            return False
+
+        if event._event_type == EventType.GLOBAL_SCHEDULE:
+            return self._scheduler.reads_replica_state
+
+        # the autoscaler events
+        return True
+
+    def _handle_event(self, event: BaseEvent) -> None:
+        super()._handle_event(event)
+
+        if event._event_type in (
+            EventType.REPLICA_SCALE_UP,
+            EventType.REPLICA_SCALE_DOWN,
+        ):
+            self._sync_replica_set()
+
+        event_key = (event._time, event._event_type)
+        for commands, pending_commands in zip(
+            self._shard_commands, self._shard_pending_commands
+        ):
+            pending_commands.extend((event_key, *command) for command in commands)
+            # the proxies hold on to the command lists
+            commands.clear()
+
+    def _add_event(self, event: BaseEvent) -> None:
+        if event._event_type in REPLICA_EVENT_TYPES:
+            # coalesced by the shard
+            shard_id = self._replica_shards[event._replica_id]
+            self._shard_commands[shard_id].append(("add_event", event))
+            return
+
+        super()._add_event(event)
+
+    def _get_next_event_time(self) -> float:
+        if not self._event_queue:
+            return float("inf")
+
+        event = self._event_queue.get()
+        self._event_queue.put(event)
+        return event._time
+
+    def _start_shards(self) -> None:
+        num_shards = self._config.num_shards
+        replica_ids = sorted(self._scheduler._replica_schedulers)
+
+        logger.info(
+            f"Starting {num_shards} simulation shards for {len(replica_ids)} replicas"
+        )
+
+        # the shards are forked with the state of the coordinator, including the
+        # replica schedulers and the execution time predictor
+        context = multiprocessing.get_context("fork")
+        self._shard_connections = []
+        self._shard_processes = []
+        for shard_id, shard_replica_ids in enumerate(
+            np.array_split(replica_ids, num_shards)
+        ):
+            shard_replica_ids = shard_replica_ids.tolist()
+            shard = ReplicaShard(
+                shard_id, self._config, self._scheduler, shard_replica_ids
+            )
+            connection, shard_connection = context.Pipe()
+            process = context.Process(
+                target=shard.run, args=(shard_connection,), daemon=True
+            )
+            process.start()
+            shard_connection.close()
+
+            self._shard_connections.append(connection)
+            self._shard_processes.append(process)
+            self._shard_commands.append([])
+            self._shard_pending_commands.append([])
+            self._shard_next_event_keys.append((float("inf"), float("inf")))
+            for replica_id in shard_replica_ids:
+                self._replica_shards[replica_id] = shard_id
+
+        for replica_id, shard_id in self._replica_shards.items():
+            self._scheduler._replica_schedulers[replica_id] = ReplicaSchedulerProxy(
+                replica_id, self._shard_commands[shard_id]
+            )
+        self._marked_replicas = set(self._scheduler._replicas_to_free)
+
+    def _call_shards(self, method: str, shard_args: Dict[int, Tuple]) -> Dict[int, Any]:
+        # send to all shards before waiting on any, so that they work in parallel
+        for shard_id, args in shard_args.items():
+            self._shard_connections[shard_id].send((method, args))
+
+        results = {}
+        for shard_id in shard_args:
+            succeeded, result = self._shard_connections[shard_id].recv()
+            if not succeeded:
+                raise RuntimeError(f"Simulation shard {shard_id} failed:\n{result}")
+            results[shard_id] = result
+
+        return results
+
+    def _call_all_shards(self, method: str) -> Dict[int, Any]:
+        return self._call_shards(
+            method, {shard_id: () for shard_id in range(len(self._shard_connections))}
+        )
+
+    def _advance_shards(self, until: Tuple[float, float]) -> None:
+        # processes the shard events up to the (time, event type) key until, shards
+        # without new commands or events in the window can not change, they are skipped
+        shard_args = {
+            shard_id: (until, commands)
+            for shard_id, commands in enumerate(self._shard_pending_commands)
+            if commands or self._shard_next_event_keys[shard_id] < until
+        }
+        sync_states = self._call_shards("advance", shard_args)
+        for shard_id in shard_args:
+            self._shard_pending_commands[shard_id] = []
+
+        ended_batches = []
+        freed_replicas = []
+        for shard_id, sync_state in sync_states.items():
+            (
+                time,
+                next_event_key,
+                replica_states,
+                completed_request_ids,
+                shard_ended_batches,
+                shard_freed_replicas,
+            ) = sync_state
+
+            self._time = max(self._time, time)
+            self._shard_next_event_keys[shard_id] = next_event_key
+
+            for replica_id, (num_pending_requests, is_empty) in replica_states.items():
+                self._scheduler.get_replica_scheduler(replica_id).on_sync(
+                    num_pending_requests, is_empty
+                )
+
+            for request_id in completed_request_ids:
+                del self._active_requests[request_id]
+
+            ended_batches.extend(shard_ended_batches)
+            freed_replicas.extend(shard_freed_replicas)
+
+        if self._autoscaler is None:
+            return
+
+        # replay the autoscaler calls of the batch end events in simulated time order
+        for batch in sorted(ended_batches, key=lambda batch: batch.completed_at):
+            self._autoscaler.on_batch_end(batch)
+
+        for time, replica_id in sorted(freed_replicas):
+            self._scheduler.get_replica_scheduler(replica_id).on_sync(0, True)
+            self._autoscaler.free_replica_with_id(replica_id)
+            self._metric_store.on_autoscaling_event(
+                time, self._autoscaler.num_replicas, self._autoscaler.cost_per_hour
+            )
+            del self._replica_shards[replica_id]
+            self._marked_replicas.discard(replica_id)
+
+    def _sync_replica_set(self) -> None:
+        # hands the changes of the autoscaler to the replica set on to the shards
+        replica_schedulers = self._scheduler._replica_schedulers
+
+        added_replica_ids = replica_schedulers.keys() - self._replica_shards.keys()
+        if added_replica_ids:
+            shard_sizes = Counter(self._replica_shards.values())
+        for replica_id in sorted(added_replica_ids):
+            shard_id = min(
+                range(len(self._shard_connections)),
+                key=lambda shard_id: shard_sizes[shard_id],
+            )
+            shard_sizes[shard_id] += 1
+
+            self._replica_shards[replica_id] = shard_id
+            self._shard_commands[shard_id].append(
+                ("add_replica", self._cluster.replicas[replica_id])
+            )
+            replica_schedulers[replica_id] = ReplicaSchedulerProxy(
+                replica_id, self._shard_commands[shard_id]
+            )
+
+        for replica_id in self._replica_shards.keys() - replica_schedulers.keys():
+            # an empty replica freed right away
+            shard_id = self._replica_shards.pop(replica_id)
+            self._shard_commands[shard_id].append(("free_replica", replica_id))
+            self._marked_replicas.discard(replica_id)
+
+        for replica_id in self._scheduler._replicas_to_free - self._marked_replicas:
+            shard_id = self._replica_shards[replica_id]
+            self._shard_commands[shard_id].append(("mark_replica_to_free", replica_id))
+            self._marked_replicas.add(replica_id)
+
+    def _collect_shard_requests(self) -> None:
+        # the coordinator only holds stale copies of the requests routed to the shards
+        for requests in self._call_all_shards("get_requests").values():
+            for request in requests:
+                self._active_requests[request.id] = request
+
+    def _finish_shards(self) -> None:
+        for (
+            metric_store,
+            replica_ids,
+            event_trace,
+            event_chrome_trace,
+            num_coalesced_events,
+        ) in self._call_all_shards("finish").values():
+            self._metric_store.merge(metric_store, replica_ids)
+            self._event_trace.extend(event_trace)
+            self._event_chrome_trace.extend(event_chrome_trace)
+            self._num_coalesced_events += num_coalesced_events
+
+        self._event_trace.sort(key=lambda event: event["time"])
+
+        for process in self._shard_processes:
+            process.join()
+
+        logger.info(f"Simulation shards finished at: {self._time}s")
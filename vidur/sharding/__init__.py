@@ -0,0 +1,4 @@
+from vidur.sharding.replica_scheduler_proxy import ReplicaSchedulerProxy
+from vidur.sharding.replica_shard import ReplicaShard
+
+__all__ = [ReplicaSchedulerProxy, ReplicaShard]
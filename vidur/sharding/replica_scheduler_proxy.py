@@ -0,0 +1,38 @@
+from typing import List, Tuple
+
+from vidur.entities import Request
+
+
+class ReplicaSchedulerProxy:
+    """
+    Stand-in for a replica scheduler which lives in a shard process. It mirrors the
+    state the global scheduler and the autoscaler read, as of the last time the
+    shards were synchronized, and queues the routed requests for the shard.
+    """
+
+    def __init__(self, replica_id: int, shard_commands: List[Tuple]) -> None:
+        self._replica_id = replica_id
+        self._shard_commands = shard_commands
+
+        self._num_pending_requests = 0
+        self._is_empty = True
+
+    @property
+    def replica_id(self) -> int:
+        return self._replica_id
+
+    @property
+    def num_pending_requests(self) -> int:
+        return self._num_pending_requests
+
+    def is_empty(self) -> bool:
+        return self._is_empty
+
+    def add_request(self, request: Request) -> None:
+        self._shard_commands.append(("add_request", self._replica_id, request))
+        self._num_pending_requests += 1
+        self._is_empty = False
+
+    def on_sync(self, num_pending_requests: int, is_empty: bool) -> None:
+        self._num_pending_requests = num_pending_requests
+        self._is_empty = is_empty
@@ -0,0 +1,240 @@
+import copy
+import traceback
+from collections import deque
+from multiprocessing.connection import Connection
+from typing import Any, Dict, List, Tuple
+
+from vidur.config import SimulationConfig
+from vidur.config.utils import get_all_subclasses
+from vidur.entities import Batch, Replica, Request
+from vidur.entities.base_entity import BaseEntity
+from vidur.event_queue import EventQueueRegistry
+from vidur.events import BaseEvent
+from vidur.metrics import MetricsStore
+from vidur.scheduler import BaseGlobalScheduler
+from vidur.types import EventType
+
+# entities created in different shards (batches, batch stages) must not share ids,
+# batch ids key the per batch metrics
+SHARD_ID_STRIDE = 10**12
+
+
+class ReplicaShard:
+    """
+    Simulates the replica schedulers of a subset of the replicas in a worker process.
+    The shard processes the replica level events (replica schedule, batch stages and
+    batch ends) of its replicas in the time windows handed out by the coordinating
+    ShardedSimulator, and reports back what the global scheduler and the autoscaler
+    read. Towards the replica events the shard stands in for the autoscaler, whose
+    calls are replayed on the real one in the coordinator.
+    """
+
+    def __init__(
+        self,
+        shard_id: int,
+        config: SimulationConfig,
+        scheduler: BaseGlobalScheduler,
+        replica_ids: List[int],
+    ) -> None:
+        self._shard_id = shard_id
+        self._config = config
+        self._scheduler = scheduler
+        # every replica the shard has simulated, including freed ones
+        self._replica_ids = list(replica_ids)
+
+        self._time = 0
+        self._event_queue = None
+        self._pending_coalescing_keys = set()
+        self._num_coalesced_events = 0
+        self._metric_store = None
+        self._requests: Dict[int, Request] = {}
+
+        # reported to the coordinator at the end of every window
+        self._completed_request_ids: List[int] = []
+        self._ended_batches: List[Batch] = []
+        self._freed_replicas: List[Tuple[float, int]] = []
+
+        self._event_trace = []
+        self._event_chrome_trace = []
+
+    @property
+    def num_replicas(self) -> int:
+        return len(self._scheduler._replica_schedulers)
+
+    @property
+    def cost_per_hour(self) -> float:
+        # the autoscaling metrics are recorded by the coordinator
+        return 0
+
+    def run(self, connection: Connection) -> None:
+        self._init_worker()
+
+        while True:
+            method, args = connection.recv()
+            try:
+                result = getattr(self, method)(*args)
+            except BaseException:
+                connection.send((False, traceback.format_exc()))
+                return
+
+            connection.send((True, result))
+            if method == "finish":
+                return
+
+    def _init_worker(self) -> None:
+        # the worker is forked from the coordinator with all replica schedulers
+        self._scheduler._replica_schedulers = {
+            replica_id: self._scheduler._replica_schedulers[replica_id]
+            for replica_id in self._replica_ids
+        }
+
+        # read all counters before setting any, subclasses which have not handed out
+        # ids yet inherit the counter of their base class
+        entity_classes = [BaseEntity] + get_all_subclasses(BaseEntity)
+        id_offset = (self._shard_id + 1) * SHARD_ID_STRIDE
+        id_counters = {cls: cls._next_id + id_offset for cls in entity_classes}
+        for cls, next_id in id_counters.items():
+            cls._next_id = next_id
+
+        self._event_queue = EventQueueRegistry.get(
+            self._config.event_queue_config.get_type(),
+            self._config.event_queue_config,
+        )
+
+        config = copy.deepcopy(self._config)
+        # only the coordinator logs to wandb
+        config.metrics_config.wandb_project = None
+        self._metric_store = MetricsStore(config)
+
+    def advance(
+        self, until: Tuple[float, float], commands: List[Tuple]
+    ) -> Tuple[Any, ...]:
+        # the commands are ordered by the (time, event type) of the coordinator events
+        # they come from and are applied in between the events of the shard that the
+        # coordinator events would have been interleaved with in a serial simulation.
+        # All of them precede until, the key of the coordinator event the shards are
+        # synchronized for. Coordinator and replica events never share an event type.
+        commands = deque(commands)
+        while commands or self._event_queue:
+            event = self._event_queue.get() if self._event_queue else None
+            if commands and (
+                event is None or commands[0][0] < (event._time, event._event_type)
+            ):
+                if event is not None:
+                    self._event_queue.put(event)
+                self._apply_command(*commands.popleft())
+                continue
+
+            if (event._time, event._event_type) >= until:
+                self._event_queue.put(event)
+                break
+
+            self._time = event._time
+
+            if event.coalescing_key is not None:
+                self._pending_coalescing_keys.remove(event.coalescing_key)
+
+            new_events = event.handle_event(self._scheduler, self._metric_store, self)
+            for new_event in new_events:
+                self._add_event(new_event)
+
+            if event._event_type == EventType.BATCH_END:
+                for request in event._batch.completed_requests:
+                    del self._requests[request.id]
+                    self._completed_request_ids.append(request.id)
+
+            if self._config.metrics_config.write_json_trace:
+                self._event_trace.append(event.to_dict())
+
+            if self._config.metrics_config.enable_chrome_trace:
+                chrome_trace = event.to_chrome_trace()
+                if chrome_trace:
+                    self._event_chrome_trace.append(chrome_trace)
+
+        replica_states = {
+            replica_id: (
+                replica_scheduler.num_pending_requests,
+                replica_scheduler.is_empty(),
+            )
+            for replica_id, replica_scheduler in self._scheduler._replica_schedulers.items()
+        }
+        sync_state = (
+            self._time,
+            self._get_next_event_key(),
+            replica_states,
+            self._completed_request_ids,
+            self._ended_batches,
+            self._freed_replicas,
+        )
+
+        self._completed_request_ids = []
+        self._ended_batches = []
+        self._freed_replicas = []
+
+        return sync_state
+
+    def get_requests(self) -> List[Request]:
+        # the requests routed to the shard which have not completed yet
+        return list(self._requests.values())
+
+    def finish(self) -> Tuple[MetricsStore, List[int], List[dict], List[dict], int]:
+        # only the recorded metrics are merged by the coordinator, the config is not
+        # sent back
+        metric_store = copy.copy(self._metric_store)
+        metric_store._simulation_config = None
+        metric_store._config = None
+
+        return (
+            metric_store,
+            self._replica_ids,
+            self._event_trace,
+            self._event_chrome_trace,
+            self._num_coalesced_events,
+        )
+
+    def on_batch_end(self, batch: Batch) -> None:
+        # the autoscaler only looks at the batch itself, its requests are not shipped
+        ended_batch = copy.copy(batch)
+        ended_batch._requests = []
+        self._ended_batches.append(ended_batch)
+
+    def free_replica_with_id(self, replica_id: int) -> None:
+        self._scheduler.free_replica_with_id(replica_id)
+        self._freed_replicas.append((self._time, replica_id))
+
+    def _get_next_event_key(self) -> Tuple[float, float]:
+        if not self._event_queue:
+            return (float("inf"), float("inf"))
+
+        event = self._event_queue.get()
+        self._event_queue.put(event)
+        return (event._time, event._event_type)
+
+    def _apply_command(self, key: Tuple[float, int], command: str, *args) -> None:
+        self._time = max(self._time, key[0])
+        getattr(self, f"_{command}")(*args)
+
+    def _add_event(self, event: BaseEvent) -> None:
+        coalescing_key = event.coalescing_key
+        if coalescing_key is not None:
+            if coalescing_key in self._pending_coalescing_keys:
+                self._num_coalesced_events += 1
+                return
+            self._pending_coalescing_keys.add(coalescing_key)
+
+        self._event_queue.put(event)
+
+    def _add_request(self, replica_id: int, request: Request) -> None:
+        self._scheduler.get_replica_scheduler(replica_id).add_request(request)
+        self._requests[request.id] = request
+
+    def _add_replica(self, replica: Replica) -> None:
+        self._scheduler.add_replica(replica)
+        self._metric_store.add_replica(replica.id)
+        self._replica_ids.append(replica.id)
+
+    def _free_replica(self, replica_id: int) -> None:
+        self._scheduler.free_replica_with_id(replica_id)
+
+    def _mark_replica_to_free(self, replica_id: int) -> None:
+        self._scheduler._replicas_to_free.add(replica_id)
@@ -1,18 +1,33 @@
 import atexit
-import heapq
 import json
-from typing import List
+from typing import Any, Dict, Hashable, List, Optional
 
-from vidur.types import EventType
+from vidur.types import EventType, SimulationStopReason
 from vidur.autoscaler.autoscaler_registry import AutoscalerRegistry
 from vidur.config import SimulationConfig
-from vidur.entities import Cluster
+from vidur.config.utils import dataclass_to_dict, get_dict_diff
+from vidur.entities import Cluster, Request
+from vidur.entities.base_entity import BaseEntity
+from vidur.event_queue import EventQueueRegistry
 from vidur.events import AutoscaleTunerEvent, BaseEvent, RequestArrivalEvent
+from vidur.execution_time_predictor import (
+    BaseExecutionTimePredictor,
+    ExecutionTimePredictorRegistry,
+)
 from vidur.logger import init_logger
 from vidur.metrics import MetricsStore
+from vidur.metrics.steady_state_detector import SteadyStateDetector
 from vidur.request_generator import RequestGeneratorRegistry
 from vidur.scheduler import BaseGlobalScheduler, GlobalSchedulerRegistry
 from vidur.types.autoscaler_type import AutoscalerType
+from vidur.utils.checkpoint import (
+    get_id_counters,
+    get_random_state,
+    load_checkpoint,
+    save_checkpoint,
+    set_id_counters,
+    set_random_state,
+)
 
 logger = init_logger(__name__)
 
@@ -20,25 +35,51 @@ logger = init_logger(__name__)
 class Simulator:
     def __init__(self, config: SimulationConfig) -> None:
         self._config: SimulationConfig = config
+        # the replica schedulers fill in derived parts of the config (e.g. the number
+        # of kv cache blocks), what-if variants are checked against the config as given
+        self._given_config_dict = self._get_variant_config_dict(config)
 
         self._time = 0
         self._terminate = False
+        self._stop_reason = SimulationStopReason.COMPLETED
         self._time_limit = self._config.time_limit
         if not self._time_limit:
             self._time_limit = float("inf")
+        # when truncating, nothing after the time limit is generated or simulated
+        self._truncation_time = (
+            self._time_limit if self._config.truncate_at_time_limit else float("inf")
+        )
 
-        self._active_requests = set()
-        self._event_queue = []
+        # requests that have been pulled from the request stream but not yet completed
+        self._active_requests: Dict[int, Request] = {}
+        self._num_streamed_requests = 0
+        self._request_stream = None
+        self._event_queue = EventQueueRegistry.get(
+            self._config.event_queue_config.get_type(),
+            self._config.event_queue_config,
+        )
+        # coalescing keys of the events currently pending in the event queue
+        self._pending_coalescing_keys = set()
+        self._num_coalesced_events = 0
 
         self._event_trace = []
         self._event_chrome_trace = []
 
+        self._checkpoint_interval = self._config.checkpoint_interval
+        self._next_checkpoint_time = self._checkpoint_interval or float("inf")
+
         self._cluster = Cluster(
             self._config.cluster_config,
             self._config.metrics_config,
             self._config.request_generator_config,
         )
         self._metric_store = MetricsStore(self._config)
+        if self._config.steady_state_detector_config.enable:
+            self._steady_state_detector = SteadyStateDetector(
+                self._config.steady_state_detector_config
+            )
+        else:
+            self._steady_state_detector = None
         self._request_generator = RequestGeneratorRegistry.get(
             self._config.request_generator_config.get_type(),
             self._config.request_generator_config,
@@ -49,6 +90,12 @@ class Simulator:
             self._cluster.replicas,
         )
 
+        # the pools of a disaggregated cluster have a fixed size
+        assert (
+            not self._config.cluster_config.is_disaggregated
+            or self._config.autoscaler_config.get_type() == AutoscalerType.DISABLED
+        ), "Autoscaling is not supported in disaggregated clusters"
+
         if self._config.autoscaler_config.get_type() == AutoscalerType.DISABLED:
             self._autoscaler = None
         else:
@@ -74,38 +121,205 @@ class Simulator:
     def metric_store(self) -> MetricsStore:
         return self._metric_store
 
+    @property
+    def checkpoint_path(self) -> str:
+        return f"{self._config.metrics_config.output_dir}/checkpoint.pkl"
+
+    @classmethod
+    def from_checkpoint(cls, path: str) -> "Simulator":
+        logger.info(f"Resuming simulation from checkpoint: {path}")
+
+        # every reference to the predictor is stored as a persistent id, build it once
+        # from the config in the checkpoint header
+        execution_time_predictors = {}
+
+        def load_persistent_id(config: SimulationConfig, persistent_id: str) -> Any:
+            assert persistent_id == "execution_time_predictor"
+            if persistent_id not in execution_time_predictors:
+                execution_time_predictors[persistent_id] = (
+                    cls._build_execution_time_predictor(config)
+                )
+            return execution_time_predictors[persistent_id]
+
+        checkpoint = load_checkpoint(path, load_persistent_id)
+        simulator = checkpoint["simulator"]
+
+        # the request stream is a generator, a new request generator replays it up to
+        # where the checkpoint was taken - the ids of the replayed requests are
+        # restored with the counters below
+        simulator._request_generator = RequestGeneratorRegistry.get(
+            simulator._config.request_generator_config.get_type(),
+            simulator._config.request_generator_config,
+        )
+        simulator._request_stream = simulator._request_generator.stream()
+        for _ in range(simulator._num_streamed_requests):
+            next(simulator._request_stream)
+
+        set_id_counters(checkpoint["id_counters"])
+        set_random_state(checkpoint["random_state"])
+
+        atexit.register(simulator._write_output)
+
+        logger.info(f"Resumed simulation at: {simulator._time}s")
+
+        return simulator
+
     def run(self) -> None:
+        logger.info(f"Starting simulation with cluster: {self._cluster}")
+
+        self._run_events()
+
+        assert (
+            self._scheduler.is_empty() or not self._active_requests or self._terminate
+        )
+
+        self._metric_store.on_autoscaling_event(
+            self._time, 0, self._cluster.cost_per_hour
+        )
+
         logger.info(
-            f"Starting simulation with cluster: {self._cluster} and {len(self._event_queue)} requests"
+            f"Simulation ended at: {self._time}s, coalesced {self._num_coalesced_events} redundant events"
         )
 
-        while self._event_queue and self._active_requests and not self._terminate:
-            _, event = heapq.heappop(self._event_queue)
-            self._set_time(event._time)
-            new_events = event.handle_event(
-                self._scheduler, self._metric_store, self._autoscaler
+        execution_time_predictor = self._scheduler._execution_time_predictor
+        if execution_time_predictor.num_cache_hits:
+            logger.info(
+                f"Execution time cache hit rate: {execution_time_predictor.cache_hit_rate:.2%}"
+                f" ({execution_time_predictor.num_cache_misses} predicted batches)"
+            )
+
+    def run_until(self, time: float) -> None:
+        # processes all events up to the given time, the simulation can be resumed
+        # (or forked) from there with run
+        logger.info(f"Running simulation with cluster: {self._cluster} until: {time}s")
+
+        self._run_events(time)
+
+        logger.info(f"Simulation paused at: {self._time}s")
+
+    @staticmethod
+    def _get_variant_config_dict(config: SimulationConfig) -> dict:
+        # the parts of the config a what-if variant can not change
+        config_dict = dataclass_to_dict(config)
+        config_dict.pop("__flat_config__", None)
+        config_dict.pop("autoscaler_config")
+        config_dict["cluster_config"].pop("global_scheduler_config")
+        config_dict["metrics_config"].pop("output_dir")
+        return config_dict
+
+    def check_variant_config(self, config: SimulationConfig) -> None:
+        # a variant can only change what apply_variant_config switches over, anything
+        # else would silently run with the config of the shared prefix
+        diff = get_dict_diff(
+            self._given_config_dict, self._get_variant_config_dict(config)
+        )
+        assert not diff, (
+            "A what-if variant can only change the global scheduler, autoscaler and"
+            f" output dir of the shared config, found changes in: {diff}"
+        )
+
+    def apply_variant_config(self, config: SimulationConfig) -> None:
+        # switches a paused simulation over to the global scheduler, autoscaler and
+        # output directory of a what-if variant, the rest of the state (cluster,
+        # in-flight requests, metrics) is carried over from the shared prefix
+        self.check_variant_config(config)
+
+        self._config.metrics_config.output_dir = config.metrics_config.output_dir
+        self._cluster._output_dir = config.metrics_config.output_dir
+
+        global_scheduler_config = config.cluster_config.global_scheduler_config
+        if (
+            global_scheduler_config
+            != self._config.cluster_config.global_scheduler_config
+        ):
+            self._config.cluster_config.global_scheduler_config = (
+                global_scheduler_config
             )
-            self._add_events(new_events)
+            scheduler = GlobalSchedulerRegistry.get(
+                global_scheduler_config.get_type(),
+                self._config,
+                self._cluster.replicas,
+                self._scheduler._execution_time_predictor,
+            )
+            scheduler.take_over(self._scheduler)
+            self._scheduler = scheduler
+            if self._autoscaler is not None:
+                self._autoscaler._scheduler = scheduler
+
+        autoscaler_config = config.autoscaler_config
+        if autoscaler_config != self._config.autoscaler_config:
+            assert (
+                autoscaler_config.get_type() != AutoscalerType.DISABLED
+                or self._autoscaler is None
+            ), "The autoscaler can not be disabled in a forked simulation"
+
+            self._config.autoscaler_config = autoscaler_config
+            if autoscaler_config.get_type() != AutoscalerType.DISABLED:
+                autoscaler = AutoscalerRegistry.get(
+                    autoscaler_config.get_type(),
+                    autoscaler_config,
+                    self._cluster,
+                    self._scheduler,
+                    self._metric_store,
+                )
+                if self._autoscaler is None:
+                    self._add_event(AutoscaleTunerEvent(self._time))
+                else:
+                    # scale events of the previous autoscaler are still in flight
+                    autoscaler._num_pending_scale_ups = (
+                        self._autoscaler._num_pending_scale_ups
+                    )
+                    autoscaler._num_pending_scale_downs = (
+                        self._autoscaler._num_pending_scale_downs
+                    )
+                self._autoscaler = autoscaler
+
+        self._config.write_config_to_file()
+
+    def _run_events(self, until: float = float("inf")) -> None:
+        stop_time = min(until, self._truncation_time)
 
-            if event._event_type == EventType.BATCH_END:
-                for request in event._batch.completed_requests:
-                    self._active_requests.remove(request.id)
+        while self._event_queue and self._active_requests and not self._terminate:
+            event = self._event_queue.get()
+            if event._time > stop_time:
+                self._event_queue.put(event)
+                if event._time > self._truncation_time:
+                    self._truncate()
+                return
 
-            if self._config.metrics_config.write_json_trace:
-                self._event_trace.append(event.to_dict())
+            self._handle_event(event)
 
-            if self._config.metrics_config.enable_chrome_trace:
-                chrome_trace = event.to_chrome_trace()
-                if chrome_trace:
-                    self._event_chrome_trace.append(chrome_trace)
+    def _handle_event(self, event: BaseEvent) -> None:
+        self._set_time(event._time)
 
-        assert self._scheduler.is_empty() or not self._active_requests or self._terminate
-        
-        self._metric_store.on_autoscaling_event(
-            self._time, 0, self._cluster.cost_per_hour
+        if event.coalescing_key is not None:
+            self._pending_coalescing_keys.remove(event.coalescing_key)
+
+        if event._event_type == EventType.REQUEST_ARRIVAL:
+            self._add_next_request_arrival()
+
+        new_events = event.handle_event(
+            self._scheduler, self._metric_store, self._autoscaler
         )
+        self._add_events(new_events)
+
+        if event._event_type == EventType.BATCH_END:
+            completed_requests = event._batch.completed_requests
+            for request in completed_requests:
+                del self._active_requests[request.id]
+            if self._steady_state_detector is not None:
+                self._check_steady_state(completed_requests)
+
+        if self._config.metrics_config.write_json_trace:
+            self._event_trace.append(event.to_dict())
+
+        if self._config.metrics_config.enable_chrome_trace:
+            chrome_trace = event.to_chrome_trace()
+            if chrome_trace:
+                self._event_chrome_trace.append(chrome_trace)
 
-        logger.info(f"Simulation ended at: {self._time}s")
+        if self._time >= self._next_checkpoint_time:
+            self._write_checkpoint()
 
     def _write_output(self) -> None:
         logger.info("Writing output")
@@ -122,31 +336,138 @@ class Simulator:
             self._write_chrome_trace()
             logger.info("Chrome event trace written")
 
+        self._write_stop_reason()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        # the generators have advanced past the streamed requests, they are rebuilt
+        # from the config on resume
+        state["_request_stream"] = None
+        state["_request_generator"] = None
+        return state
+
+    def _get_persistent_id(self, obj: Any) -> Optional[Hashable]:
+        # the execution time predictor is rebuilt from the (cached) models on resume
+        if isinstance(obj, BaseExecutionTimePredictor):
+            return "execution_time_predictor"
+        return None
+
+    @staticmethod
+    def _build_execution_time_predictor(
+        config: SimulationConfig,
+    ) -> BaseExecutionTimePredictor:
+        return ExecutionTimePredictorRegistry.get(
+            config.execution_time_predictor_config.get_type(),
+            predictor_config=config.execution_time_predictor_config,
+            replica_config=config.cluster_config.replica_config,
+            replica_scheduler_config=config.cluster_config.replica_scheduler_config,
+            metrics_config=config.metrics_config,
+        )
+
+    def _write_checkpoint(self) -> None:
+        while self._next_checkpoint_time <= self._time:
+            self._next_checkpoint_time += self._checkpoint_interval
+
+        checkpoint = {
+            "simulator": self,
+            "id_counters": get_id_counters(BaseEntity, BaseEvent),
+            "random_state": get_random_state(),
+        }
+        save_checkpoint(
+            self.checkpoint_path, checkpoint, self._get_persistent_id, self._config
+        )
+
+        logger.info(f"Checkpoint written at: {self._time}s to {self.checkpoint_path}")
+
     def _add_event(self, event: BaseEvent) -> None:
-        heapq.heappush(self._event_queue, (event._priority_number, event))
+        coalescing_key = event.coalescing_key
+        if coalescing_key is not None:
+            if coalescing_key in self._pending_coalescing_keys:
+                self._num_coalesced_events += 1
+                return
+            self._pending_coalescing_keys.add(coalescing_key)
+
+        self._event_queue.put(event)
 
     def _add_events(self, events: List[BaseEvent]) -> None:
         for event in events:
             self._add_event(event)
 
-    def _init_event_queue(self) -> None:
-        requests = self._request_generator.generate()
+    def _add_next_request_arrival(self) -> None:
+        request = next(self._request_stream, None)
+        if request is None:
+            return
 
-        for request in requests:
-            self._add_event(RequestArrivalEvent(request.arrived_at, request))
-            self._active_requests.add(request.id)
+        if request.arrived_at > self._truncation_time:
+            # arrivals are sorted, none of the remaining requests will be simulated
+            self._request_stream = iter(())
+            return
+
+        self._add_event(RequestArrivalEvent(request.arrived_at, request))
+        self._active_requests[request.id] = request
+        self._num_streamed_requests += 1
+
+    def _init_event_queue(self) -> None:
+        # requests are pulled lazily, the event queue holds at most one pending arrival
+        self._request_stream = self._request_generator.stream()
+        self._add_next_request_arrival()
 
         if self._autoscaler is not None:
             self._add_event(AutoscaleTunerEvent(0))
 
+    def _check_steady_state(self, completed_requests: List[Request]) -> None:
+        self._steady_state_detector.on_requests_completed(completed_requests)
+        if not self._steady_state_detector.should_check():
+            return
+
+        stop_reason = self._steady_state_detector.check(len(self._active_requests))
+        if stop_reason is not None:
+            self._stop(stop_reason)
+
+    def _truncate(self) -> None:
+        logger.info(
+            f"Time limit reached: {self._time_limit}s truncating the simulation."
+        )
+
+        self._time = self._time_limit
+        self._stop(SimulationStopReason.TIME_LIMIT)
+
+    def _stop(self, stop_reason: SimulationStopReason) -> None:
+        # requests still in flight when the simulation is stopped early are censored
+        logger.info(
+            f"Stopping the simulation at: {self._time}s ({stop_reason}) with"
+            f" {len(self._active_requests)} requests in flight."
+        )
+
+        self._stop_reason = stop_reason
+        self._terminate = True
+
+        for request in self._active_requests.values():
+            self._metric_store.on_request_censored(self._time, request)
+
     def _set_time(self, time: float) -> None:
         self._time = time
         if self._time > self._time_limit:
             logger.info(
                 f"Time limit reached: {self._time_limit}s terminating the simulation."
             )
+            self._stop_reason = SimulationStopReason.TIME_LIMIT
             self._terminate = True
 
+    def _write_stop_reason(self) -> None:
+        stop_reason_file = f"{self._config.metrics_config.output_dir}/stop_reason.json"
+
+        stop_reason = {
+            "stop_reason": str(self._stop_reason),
+            "time": self._time,
+            "num_requests_in_flight": len(self._active_requests),
+        }
+        if self._steady_state_detector is not None:
+            stop_reason.update(self._steady_state_detector.to_dict())
+
+        with open(stop_reason_file, "w") as f:
+            json.dump(stop_reason, f)
+
     def _write_event_trace(self) -> None:
         trace_file = f"{self._config.metrics_config.output_dir}/event_trace.json"
         with open(trace_file, "w") as f:
@@ -2,18 +2,23 @@ from vidur.types.activation_type import ActivationType
 from vidur.types.autoscaler_type import AutoscalerType
 from vidur.types.base_int_enum import BaseIntEnum
 from vidur.types.device_sku_type import DeviceSKUType
+from vidur.types.event_queue_type import EventQueueType
 from vidur.types.event_type import EventType
 from vidur.types.execution_time_predictor_type import ExecutionTimePredictorType
 from vidur.types.global_scheduler_type import GlobalSchedulerType
 from vidur.types.node_sku_type import NodeSKUType
 from vidur.types.norm_type import NormType
+from vidur.types.preemption_mode import PreemptionMode
+from vidur.types.replica_role import ReplicaRole
 from vidur.types.replica_scheduler_type import ReplicaSchedulerType
 from vidur.types.request_generator_type import RequestGeneratorType
 from vidur.types.request_interval_generator_type import RequestIntervalGeneratorType
 from vidur.types.request_length_generator_type import RequestLengthGeneratorType
+from vidur.types.simulation_stop_reason import SimulationStopReason
 
 __all__ = [
     EventType,
+    EventQueueType,
     ExecutionTimePredictorType,
     GlobalSchedulerType,
     RequestGeneratorType,
@@ -26,4 +31,7 @@ __all__ = [
     ActivationType,
     BaseIntEnum,
     AutoscalerType,
+    SimulationStopReason,
+    PreemptionMode,
+    ReplicaRole,
 ]
@@ -0,0 +1,6 @@
+from vidur.types.base_int_enum import BaseIntEnum
+
+
+class EventQueueType(BaseIntEnum):
+    HEAP = 1
+    CALENDAR = 2
@@ -14,3 +14,4 @@ class EventType(BaseIntEnum):
     AUTOSCALE_TUNER = 8
     REPLICA_SCALE_UP = 9
     REPLICA_SCALE_DOWN = 10
+    REQUEST_HANDOFF = 11
@@ -0,0 +1,6 @@
+from vidur.types.base_int_enum import BaseIntEnum
+
+
+class PreemptionMode(BaseIntEnum):
+    RECOMPUTE = 1
+    SWAP = 2
@@ -0,0 +1,7 @@
+from vidur.types.base_int_enum import BaseIntEnum
+
+
+class ReplicaRole(BaseIntEnum):
+    MIXED = 1
+    PREFILL = 2
+    DECODE = 3
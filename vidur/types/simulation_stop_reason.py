@@ -0,0 +1,8 @@
+from vidur.types.base_int_enum import BaseIntEnum
+
+
+class SimulationStopReason(BaseIntEnum):
+    COMPLETED = 1
+    TIME_LIMIT = 2
+    STEADY_STATE = 3
+    UNSTABLE = 4
@@ -0,0 +1,83 @@
+import os
+import pickle
+import random
+from typing import Any, Callable, Dict, Hashable, Optional
+
+import numpy as np
+
+from vidur.config.utils import get_all_subclasses
+
+
+class _CheckpointPickler(pickle.Pickler):
+    def __init__(self, file, get_persistent_id: Callable[[Any], Optional[Hashable]]):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self._get_persistent_id = get_persistent_id
+
+    def persistent_id(self, obj: Any) -> Optional[Hashable]:
+        return self._get_persistent_id(obj)
+
+
+class _CheckpointUnpickler(pickle.Unpickler):
+    def __init__(self, file, load_persistent_id: Callable[[Hashable], Any]):
+        super().__init__(file)
+        self._load_persistent_id = load_persistent_id
+
+    def persistent_load(self, persistent_id: Hashable) -> Any:
+        return self._load_persistent_id(persistent_id)
+
+
+def get_id_counters(*base_classes: type) -> Dict[type, int]:
+    # generate_id increments the counter on the subclass it is called on, so every
+    # subclass which has handed out ids carries its own counter
+    return {
+        cls: cls.__dict__["_next_id"]
+        for base_class in base_classes
+        for cls in [base_class] + get_all_subclasses(base_class)
+        if "_next_id" in cls.__dict__
+    }
+
+
+def set_id_counters(id_counters: Dict[type, int]) -> None:
+    for cls, next_id in id_counters.items():
+        cls._next_id = next_id
+
+
+def get_random_state() -> Dict[str, Any]:
+    return {"random": random.getstate(), "numpy": np.random.get_state()}
+
+
+def set_random_state(random_state: Dict[str, Any]) -> None:
+    random.setstate(random_state["random"])
+    np.random.set_state(random_state["numpy"])
+
+
+def save_checkpoint(
+    path: str,
+    state: Any,
+    get_persistent_id: Callable[[Any], Optional[Hashable]] = lambda obj: None,
+    header: Any = None,
+) -> None:
+    """
+    Pickles the header and the state to path. Objects of the state for which
+    get_persistent_id returns an id are stored by reference only and rebuilt on load
+    from the header, which is loaded first. The checkpoint is written to a temporary
+    file first, so a crash while writing leaves the previous one intact.
+    """
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump(header, f, protocol=pickle.HIGHEST_PROTOCOL)
+        _CheckpointPickler(f, get_persistent_id).dump(state)
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(
+    path: str,
+    load_persistent_id: Callable[
+        [Any, Hashable], Any
+    ] = lambda header, persistent_id: None,
+) -> Any:
+    with open(path, "rb") as f:
+        header = pickle.load(f)
+        return _CheckpointUnpickler(
+            f, lambda persistent_id: load_persistent_id(header, persistent_id)
+        ).load()
@@ -20,22 +20,17 @@ class MFUCalculator:
         self._device_flops = replica_config.device_config.fp16_tflops * 2 ** 40
 
     def _get_mlp_flops(self, batch_stage: BatchStage) -> float:
-        num_tokens = sum(batch_stage.num_tokens)
+        num_tokens = batch_stage.features.total_num_tokens
         return 2 * num_tokens * self._num_params_per_device
 
     def _get_attention_flops(self, batch_stage: BatchStage) -> float:
-        total_flops = 0
-        for request, num_tokens in zip(batch_stage.requests, batch_stage.num_tokens):
-            total_flops += (
-                4  # for number of ops in attention
-                * self._num_layers_per_device
-                * self._num_heads_per_device
-                * self._head_dimension
-                * num_tokens  # q length
-                * (num_tokens + request.num_processed_tokens)  # kv length
-            )
-
-        return total_flops
+        return (
+            4  # for number of ops in attention
+            * self._num_layers_per_device
+            * self._num_heads_per_device
+            * self._head_dimension
+            * batch_stage.features.attention_work  # q length * kv length
+        )
 
     def get_mfu(self, batch_stage: BatchStage) -> float:
         mlp_flops = self._get_mlp_flops(batch_stage)
@@ -0,0 +1,120 @@
+import atexit
+import os
+import shlex
+from argparse import ArgumentDefaultsHelpFormatter, ArgumentParser
+from typing import List, Optional
+
+from vidur.config import SimulationConfig
+from vidur.logger import init_logger
+from vidur.simulator import Simulator
+from vidur.utils.checkpoint import get_random_state, set_random_state
+from vidur.utils.random import set_seeds
+
+logger = init_logger(__name__)
+
+
+def _run_variant(simulator: Simulator, variant_config: SimulationConfig) -> None:
+    simulator.apply_variant_config(variant_config)
+    simulator.run()
+    simulator._write_output()
+
+
+def run_what_if(
+    config: SimulationConfig,
+    variant_configs: List[SimulationConfig],
+    fork_time: float,
+    max_parallel: Optional[int] = None,
+) -> None:
+    """
+    Simulates the shared prefix of a set of what-if variants once, up to fork_time,
+    and then forks one child process per variant which switches over to the global
+    scheduler and autoscaler of its variant config and runs to completion. The
+    children start from a copy-on-write image of the paused simulator. The variant
+    configs may differ from the shared config only in the global scheduler,
+    autoscaler and output dir.
+    """
+    assert hasattr(os, "fork"), "What-if forking requires os.fork"
+
+    max_parallel = max_parallel or os.cpu_count()
+
+    set_seeds(config.seed)
+
+    simulator = Simulator(config)
+    # the prefix on its own is not a complete run, only the variants write output
+    atexit.unregister(simulator._write_output)
+    # fail before simulating the prefix rather than in the forked children
+    for variant_config in variant_configs:
+        simulator.check_variant_config(variant_config)
+    simulator.run_until(fork_time)
+    # the random module reseeds itself in forked children, requests are still being
+    # generated lazily after the fork
+    random_state = get_random_state()
+
+    pending_variants = list(enumerate(variant_configs))
+    running_variants = {}
+    failed_variants = []
+
+    while pending_variants or running_variants:
+        while pending_variants and len(running_variants) < max_parallel:
+            variant_id, variant_config = pending_variants.pop(0)
+            pid = os.fork()
+            if pid == 0:
+                exit_code = 0
+                try:
+                    set_random_state(random_state)
+                    _run_variant(simulator, variant_config)
+                except BaseException:
+                    logger.exception(f"What-if variant {variant_id} failed")
+                    exit_code = 1
+                finally:
+                    # skip the atexit handlers and cleanup inherited from the parent
+                    os._exit(exit_code)
+
+            logger.info(
+                f"Forked what-if variant {variant_id} at: {simulator._time}s,"
+                f" output dir: {variant_config.metrics_config.output_dir}"
+            )
+            running_variants[pid] = variant_id
+
+        pid, status = os.wait()
+        variant_id = running_variants.pop(pid)
+        if os.waitstatus_to_exitcode(status) != 0:
+            failed_variants.append(variant_id)
+
+    if failed_variants:
+        raise RuntimeError(f"What-if variants {sorted(failed_variants)} failed")
+
+
+def main() -> None:
+    parser = ArgumentParser(formatter_class=ArgumentDefaultsHelpFormatter)
+    parser.add_argument(
+        "--fork_time",
+        type=float,
+        required=True,
+        help="Simulated time in seconds up to which the shared prefix is simulated.",
+    )
+    parser.add_argument(
+        "--variant",
+        action="append",
+        required=True,
+        help="Quoted simulator arguments of a variant, applied on top of the shared arguments. Can be repeated.",
+    )
+    parser.add_argument(
+        "--max_parallel",
+        type=int,
+        default=None,
+        help="Maximum number of variants simulated in parallel, defaults to the number of cpus.",
+    )
+    args, shared_args = parser.parse_known_args()
+
+    config = SimulationConfig.create_from_cli_args(shared_args)
+    variant_configs = [
+        SimulationConfig.create_from_cli_args(shared_args + shlex.split(variant_args))
+        for variant_args in args.variant
+    ]
+
+    run_what_if(config, variant_configs, args.fork_time, args.max_parallel)
+
+
+if __name__ == "__main__":
+    main()